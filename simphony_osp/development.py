@@ -1,13 +1,29 @@
 """Developer tools."""
 
-from simphony_osp.interfaces.interface import BufferType
+from simphony_osp.interfaces.interface import (
+    BufferType,
+    CachePolicy,
+    ComputeJob,
+)
 from simphony_osp.interfaces.interface import Interface as Wrapper
+from simphony_osp.interfaces.interface import (
+    JobStatus,
+    LFUCachePolicy,
+    LRUCachePolicy,
+    TTLCachePolicy,
+)
 from simphony_osp.interfaces.remote.common import get_hash
 from simphony_osp.ontology.operations import Operations, find_operations
 
 __all__ = [
     "BufferType",
+    "CachePolicy",
+    "ComputeJob",
+    "JobStatus",
+    "LFUCachePolicy",
+    "LRUCachePolicy",
     "Operations",
+    "TTLCachePolicy",
     "Wrapper",
     "find_operations",
     "get_hash",
@@ -1,4 +1,5 @@
 """The data space store connects SimPhoNy to a data space."""
+
 import os
 import pathlib
 from base64 import b64encode
@@ -10,6 +11,9 @@ from rdflib.term import Identifier
 
 from simphony_osp.interfaces.interface import Interface
 from simphony_osp.interfaces.remote.common import get_hash
+from simphony_osp.interfaces.sqlalchemy.interface import count_triples
+from simphony_osp.utils.datatypes import Pattern
+from simphony_osp.utils.other import copy_hash_file
 
 
 class DataspaceInterface(Interface):
@@ -19,6 +23,8 @@ class DataspaceInterface(Interface):
 
     _database_path: Optional[Path] = None
     _files_path: Optional[Path] = None
+    _hashes_path: Optional[Path] = None
+    _digests_path: Optional[Path] = None
 
     _uri: Optional[str] = None
 
@@ -27,6 +33,10 @@ class DataspaceInterface(Interface):
 
     entity_tracking: bool = False
 
+    partial_commits: bool = True
+
+    thread_safe_files: bool = True
+
     def open(self, configuration: str, create: bool = False):
         """Open the specified dataspace."""
         path = pathlib.Path(configuration).absolute()
@@ -50,11 +60,15 @@ class DataspaceInterface(Interface):
 
         os.makedirs(path, exist_ok=True)
         os.makedirs(path / "files", exist_ok=True)
+        os.makedirs(path / "hashes", exist_ok=True)
+        os.makedirs(path / "digests", exist_ok=True)
         self.base = Graph("SQLAlchemy", identifier=self._identifier)
         self.base.open(uri, create=create)
         self._uri = uri
         self._database_path = path / "database.db"
         self._files_path = path / "files"
+        self._hashes_path = path / "hashes"
+        self._digests_path = path / "digests"
 
     def close(self):
         """Close the dataspace."""
@@ -64,6 +78,8 @@ class DataspaceInterface(Interface):
             self.base = None
             self._database_path = None
             self._files_path = None
+            self._hashes_path = None
+            self._digests_path = None
 
     def commit(self):
         """Commit pending changes to the triple store."""
@@ -75,15 +91,37 @@ class DataspaceInterface(Interface):
         """The base graph does not need to be populated. Nothing to do."""
         pass
 
+    def count(self, pattern: Pattern) -> int:
+        """Count the triples matching a pattern using a `COUNT` query."""
+        return count_triples(self.base, pattern)
+
     def save(self, key: str, file: BinaryIO) -> None:
-        """Save a file."""
+        """Save a file.
+
+        The contents are hashed while they are copied. Files are hard linked
+        to the `hashes` folder under the hash of their contents, so that
+        files with the same contents are stored only once: when the hash is
+        already there, the copy is replaced by a link to it. The hash of
+        each file is kept in the `digests` folder, so that deleting the file
+        does not require hashing it again.
+        """
         file_name = b64encode(bytes(key, encoding="UTF-8")).decode("UTF-8")
-        buf_size = 1024
-        with open(self._files_path / file_name, "wb") as new_file:
-            data = True
-            while data:
-                data = file.read(buf_size)
-                new_file.write(data)
+        path = self._files_path / file_name
+        if path.exists():
+            self.delete(key)
+        file_hash = copy_hash_file(file, path)
+        hash_path = self._hashes_path / file_hash
+        try:
+            os.link(path, hash_path)
+        except FileExistsError:
+            link_path = self._files_path / f"{file_name}.link"
+            try:
+                os.link(hash_path, link_path)
+                os.replace(link_path, path)
+            except FileNotFoundError:
+                # The stored contents were deleted meanwhile, keep the copy.
+                os.link(path, hash_path)
+        (self._digests_path / file_name).write_text(file_hash)
 
     def load(self, key: str) -> BinaryIO:
         """Load a file."""
@@ -91,14 +129,35 @@ class DataspaceInterface(Interface):
         return open(self._files_path / file_name, "rb")
 
     def delete(self, key: str) -> None:
-        """Delete a file."""
+        """Delete a file.
+
+        The contents are removed from the `hashes` folder when no other
+        file is linked to them.
+        """
         file_name = b64encode(bytes(key, encoding="UTF-8")).decode("UTF-8")
-        (self._files_path / file_name).unlink()
+        path = self._files_path / file_name
+        digest_path = self._digests_path / file_name
+        file_hash = self._digest(file_name)
+        path.unlink()
+        self._unlink(digest_path)
+        if file_hash is None:
+            return
+        # Decide from the link in the `hashes` folder after unlinking, so
+        # that it is removed when files with the same contents are deleted
+        # in parallel.
+        hash_path = self._hashes_path / file_hash
+        try:
+            if hash_path.stat().st_nlink == 1:
+                hash_path.unlink()
+        except FileNotFoundError:
+            pass
 
     def hash(self, key: str) -> str:
         """Hash a file."""
         file_name = b64encode(bytes(key, encoding="UTF-8")).decode("UTF-8")
-        return get_hash(str(self._files_path / file_name))
+        return self._digest(file_name) or get_hash(
+            str(self._files_path / file_name)
+        )
 
     def rename(self, key: str, new_key: str) -> None:
         """Rename a file."""
@@ -107,5 +166,26 @@ class DataspaceInterface(Interface):
             "UTF-8"
         )
         (self._files_path / file_name).rename(self._files_path / new_file_name)
+        try:
+            (self._digests_path / file_name).rename(
+                self._digests_path / new_file_name
+            )
+        except FileNotFoundError:
+            pass
+
+    def _digest(self, file_name: str) -> Optional[str]:
+        """Get the hash of a stored file saved by `save`, if any."""
+        try:
+            return (self._digests_path / file_name).read_text()
+        except FileNotFoundError:
+            return None
+
+    @staticmethod
+    def _unlink(path: Path) -> None:
+        """Remove a file if it exists."""
+        try:
+            path.unlink()
+        except FileNotFoundError:
+            pass
 
     # ↑ ----- ↑
@@ -1,21 +1,33 @@
 """Universal interface for wrapper developers."""
+
 from __future__ import annotations
 
 import logging
+import sqlite3
+import time
 from abc import ABC, abstractmethod
 from base64 import b64encode
+from collections import OrderedDict, deque
 from collections.abc import Collection
+from concurrent.futures import CancelledError, Future, ThreadPoolExecutor
+from contextlib import suppress
+from copy import deepcopy
 from datetime import datetime, timedelta
 from enum import IntEnum
-from itertools import chain
+from functools import partial, wraps
+from itertools import chain, groupby, product
 from pathlib import Path
 from tempfile import TemporaryDirectory
+from threading import Event, RLock, Thread
 from typing import (
     TYPE_CHECKING,
     BinaryIO,
+    Callable,
+    Deque,
     Dict,
     Iterable,
     Iterator,
+    List,
     Optional,
     Set,
     Tuple,
@@ -24,14 +36,18 @@ from typing import (
 
 from rdflib import RDF, BNode, Graph, URIRef
 from rdflib.graph import ModificationException, ReadOnlyGraphAggregate
+from rdflib.plugins.sparql import prepareQuery
+from rdflib.plugins.sparql.parserutils import CompValue
+from rdflib.plugins.sparql.sparql import Query
 from rdflib.plugins.stores.memory import SimpleMemory
 from rdflib.query import Result
 from rdflib.store import Store
 from rdflib.term import Node
+from rdflib.util import from_n3
 
 from simphony_osp.session.session import Session
 from simphony_osp.utils.datatypes import Pattern, Triple
-from simphony_osp.utils.other import take
+from simphony_osp.utils.other import copy_file, map_file, take
 from simphony_osp.utils.simphony_namespace import simphony_namespace
 
 if TYPE_CHECKING:
@@ -40,8 +56,12 @@ if TYPE_CHECKING:
 __all__ = [
     "BufferType",
     "BufferedSimpleMemoryStore",
+    "CachePolicy",
     "Interface",
     "InterfaceDriver",
+    "LFUCachePolicy",
+    "LRUCachePolicy",
+    "TTLCachePolicy",
 ]
 
 logger = logging.getLogger(__name__)
@@ -190,637 +210,2144 @@ class BufferedSimpleMemoryStore(SimpleMemory):
         }
 
 
-class CacheSizeException(RuntimeError):
-    """Raised when  triples do not fit in the cache of `InterfaceDriver`."""
+class TripleIndex:
+    """Set of triples indexed by subject and predicate.
 
+    Offers the subset of the API of RDFLib graphs that the `InterfaceDriver`
+    uses for its buffers. Several indexes may share a dictionary counting in
+    how many of them each triple is contained.
+    """
 
-class InterfaceDriver(Store):
-    """RDFLib store acting as intermediary between SimPhoNy and wrappers.
+    _index: Dict[Node, Dict[Node, Set[Node]]]
+    """Objects of the triples, indexed by subject and predicate."""
 
-    Offers a triplestore interface for SimPhoNy to interact with wrappers.
+    _length: int = 0
+    """Number of triples in the set."""
 
-     SimPhoNy <--> InterfaceDriver <--> Interface
+    _counter: Optional[Dict[Triple, int]] = None
+    """Shared count of the indexes each triple is contained in."""
 
-    The store is transaction aware (needs a commit action to save the changes
-    to the wrapper). Otherwise, one would have to update an entity
-    every time a single triple from the entity is added.
-    """
+    def __init__(self, counter: Optional[Dict[Triple, int]] = None):
+        """Initialize an empty set of triples.
 
-    interface: Interface
-    """The interface that the driver controls."""
+        Args:
+            counter: Dictionary shared with other indexes counting in how
+                many of them each triple is contained.
+        """
+        self._index = dict()
+        self._counter = counter
 
-    _buffer_caught: Dict[BufferType, Graph]
-    """Holds triples that should not be added to the interface's base graph."""
+    def __contains__(self, triple: Triple) -> bool:
+        """Whether a triple is contained in the set."""
+        s, p, o = triple
+        return o in self._index.get(s, dict()).get(p, ())
 
-    _buffer_uncaught: Dict[BufferType, Graph]
-    """Holds triples that should be added to the interface's base graph."""
+    def __iter__(self) -> Iterator[Triple]:
+        """Iterate over the triples in the set."""
+        return self.triples((None, None, None))
 
-    _queue: Dict[URIRef, Optional[BinaryIO]]
-    """Holds handles of files to be uploaded, URIs of files to be deleted."""
+    def __len__(self) -> int:
+        """Number of triples in the set."""
+        return self._length
 
-    _ontology: Optional[Session]
-    """Ontology to be used on the session's shown to the wrapper developer."""
+    def add(self, triple: Triple) -> None:
+        """Add a triple to the set."""
+        s, p, o = triple
+        objects = self._index.setdefault(s, dict()).setdefault(p, set())
+        if o in objects:
+            return
+        objects.add(o)
+        self._length += 1
+        if self._counter is not None:
+            self._counter[triple] = self._counter.get(triple, 0) + 1
+
+    def remove(self, triple_pattern: Pattern) -> None:
+        """Remove the triples matching a pattern from the set."""
+        for triple in list(self.triples(triple_pattern)):
+            s, p, o = triple
+            predicates = self._index[s]
+            objects = predicates[p]
+            objects.discard(o)
+            if not objects:
+                del predicates[p]
+                if not predicates:
+                    del self._index[s]
+            self._length -= 1
+            if self._counter is not None:
+                self._counter[triple] -= 1
+                if not self._counter[triple]:
+                    del self._counter[triple]
+
+    def triples(self, triple_pattern: Pattern) -> Iterator[Triple]:
+        """Iterate over the triples matching a pattern."""
+        s_p, p_p, o_p = triple_pattern
+        if s_p is None:
+            subjects = self._index.items()
+        elif s_p in self._index:
+            subjects = ((s_p, self._index[s_p]),)
+        else:
+            subjects = ()
+        for s, predicates in subjects:
+            if p_p is None:
+                predicates = predicates.items()
+            elif p_p in predicates:
+                predicates = ((p_p, predicates[p_p]),)
+            else:
+                predicates = ()
+            for p, objects in predicates:
+                if o_p is None:
+                    yield from ((s, p, o) for o in objects)
+                elif o_p in objects:
+                    yield s, p, o_p
 
-    _cache: Graph
-    """Holds cached triples when the interface's cache is enabled."""
+    def subjects(self) -> Iterator[Node]:
+        """Iterate over the subject of each triple, like RDFLib graphs."""
+        return (s for s, _, _ in self)
 
-    _cached_patterns: Dict[Pattern, datetime]
-    """Holds currently cached patterns and the time they were cached."""
+    def has_subject(self, subject: Node) -> bool:
+        """Whether any triple of the set has the given subject."""
+        return subject in self._index
 
-    _cache_size: int = 100000
-    """Maximum size of the cache in triples."""
+    def graph(self) -> Graph:
+        """Copy the triples to a new RDFLib graph."""
+        graph = Graph(SimpleMemory())
+        graph.addN((s, p, o, graph) for s, p, o in self)
+        return graph
 
-    _cache_time: timedelta = timedelta(seconds=0.3)
-    """Maximum time to spend in caching after making a request.
 
-    When a request for triples involving a specific subject is made,
-    the caching algorithm asks for all the triples involving the subject.
-    This call is not subject to a time limit.
+class DeltaOverlay:
+    """Uncommitted changes of the `InterfaceDriver`.
 
-    However, in a second stage, if the interface is merely based on a base
-    graph (meaning requests can be made using SPARQL), the algorithm will
-    also try to cache the children of the such subject, the parent objects,
-    and all of its neighbors. Since these operations can take a lot of extra
-    time, this parameter fixes a time limit for the cumulative time it
-    takes to perform all of these requests. When such caching operations
-    take longer than this time, they are interrupted.
+    Holds the triples added and deleted since the last commit, both those
+    caught by the interface (see the `add` and `remove` methods of
+    `Interface`) and those that are not, indexed by subject and predicate.
+
+    Reading triples through the overlay costs a single hash lookup per
+    triple, and nothing at all for subjects that have not been changed.
     """
 
-    _cache_step: int = 100
-    """Number of triples to fetch at once when filling the cache.
+    caught: Dict[BufferType, TripleIndex]
+    """Triples caught by the interface (added and deleted)."""
 
-    Since SimPhoNy is single-threaded software, the queries described above
-    (on the docstring of `_cache_time`) are blocking. This means that if one
-    tries to fetch too many items at once from the interface, it may take
-    significantly longer than the `_cache_time` to do so, but the operation
-    cannot be canceled until all the items have been fetched.
-
-    That is the reason behind this parameter: if it is small enough, one can
-    check how long has the caching algorithm been running at smaller
-    intervals. Please note that this assumes that asking the interface to
-    yield one triple takes a much smaller amount of time than `_cache_time`.
-    This is not necessarily always the case (for example if the underlying
-    interface produces triples in chunks).
-    """
+    uncaught: Dict[BufferType, TripleIndex]
+    """Triples not caught by the interface (added and deleted)."""
 
-    _file_cache: Optional[TemporaryDirectory] = None
-    """Holds files that are accessed while queued.
+    removed: Set[Pattern]
+    """Patterns whose removal produced the uncaught deleted triples."""
 
-    Files are queued as byte streams (which can be exhausted). Therefore,
-    if a user needs to access a file before it is committed, the byte stream
-    needs to be copied somewhere to be committed later. This also applies
-    when files need to be accessed during commit by a wrapper (as they are
-    truly sent to the wrapper after the `commit` method has finished).
+    touched: Dict[Node, Optional[bool]]
+    """Subjects of the changed triples (only tracked on request).
+
+    Each one is mapped to whether it had any triples before the changes,
+    or to `None` while it is not known.
     """
 
-    # RDFLib
-    # ↓ -- ↓
+    sizes: Dict[Node, int]
+    """Number of triples some of the touched subjects had before the
+    changes, when known."""
+
+    _changed: Dict[Triple, int]
+    """Number of buffers each added or deleted triple is contained in."""
+
+    def __init__(self):
+        """Initialize an overlay without changes."""
+        self._changed = dict()
+        self.removed = set()
+        self.touched = dict()
+        self.sizes = dict()
+        self.caught = {
+            buffer_type: TripleIndex(self._changed)
+            for buffer_type in BufferType
+        }
+        self.uncaught = {
+            buffer_type: TripleIndex(self._changed)
+            for buffer_type in BufferType
+        }
 
-    context_aware: bool = False
-    formula_aware: bool = False
-    transaction_aware: bool = True
-    graph_aware: bool = False
+    def __len__(self) -> int:
+        """Number of changes (a triple may count more than once)."""
+        return sum(
+            len(buffer[buffer_type])
+            for buffer in (self.uncaught, self.caught)
+            for buffer_type in BufferType
+        )
 
-    def __init__(
-        self,
-        *args,
-        interface: Interface,
-        ontology: Optional[Session] = None,
-        **kwargs,
-    ):
-        """Initialize the InterfaceDriver.
+    def track(self, subject: Node, exists: Optional[bool] = None) -> None:
+        """Record a subject of the changed triples.
 
-        The initialization assigns an interface to the store and creates
-        buffers. Then the usual RDFLib's store initialization follows.
+        Args:
+            subject: The subject of a changed triple.
+            exists: Whether the subject had any triples before the changes,
+                if known.
         """
-        if not isinstance(interface, Interface):
-            raise ValueError("No valid interface provided.")
-
-        interface.close()
-        self.interface = interface
+        if exists is not None or subject not in self.touched:
+            self.touched[subject] = exists
 
-        self._buffer_uncaught = {
-            buffer_type: Graph(SimpleMemory()) for buffer_type in BufferType
-        }
-        self._buffer_caught = {
-            buffer_type: Graph(SimpleMemory()) for buffer_type in BufferType
-        }
+    def merge(self, other: DeltaOverlay) -> None:
+        """Move the changes from an older overlay to this one.
 
-        self._ontology = ontology
-        self._queue = dict()
-        self._cache = Graph("SimpleMemory")
-        self._cached_patterns = dict()
-        super().__init__(*args, **kwargs)
+        The changes from this overlay take precedence over those of the
+        older overlay for the triples that both changed.
+        """
+        changed = set(self._changed)
+        for name in ("uncaught", "caught"):
+            for buffer_type in BufferType:
+                index = getattr(self, name)[buffer_type]
+                for triple in getattr(other, name)[buffer_type]:
+                    if triple not in changed:
+                        index.add(triple)
+        self.removed |= other.removed
+        # What existed before the changes is best known by the older overlay.
+        self.touched.update(other.touched)
+        self.sizes.update(other.sizes)
+        other.__init__()
+
+    def split(self, size: int) -> Iterator[DeltaOverlay]:
+        """Move the changes to smaller overlays.
+
+        The changes of each subject are moved together, therefore, an
+        overlay may hold more than `size` changes when a subject has many
+        of them.
 
-    def open(self, configuration: str, create: bool = False) -> None:
-        """Asks the interface to open the data source."""
-        # Reset buffers
-        self._buffer_uncaught = {
-            buffer_type: Graph(SimpleMemory()) for buffer_type in BufferType
-        }
-        self._buffer_caught = {
-            buffer_type: Graph(SimpleMemory()) for buffer_type in BufferType
+        Args:
+            size: Number of changes to move to each overlay.
+        """
+        removed = dict()
+        for pattern in self.removed:
+            removed.setdefault(pattern[0], set()).add(pattern)
+        subjects = iter(dict.fromkeys(s for s, _, _ in self._changed))
+        chunk = DeltaOverlay()
+        for subject in subjects:
+            pattern = (subject, None, None)
+            for name in ("uncaught", "caught"):
+                for buffer_type in BufferType:
+                    index = getattr(self, name)[buffer_type]
+                    for triple in index.triples(pattern):
+                        getattr(chunk, name)[buffer_type].add(triple)
+                    index.remove(pattern)
+            if subject in self.touched:
+                chunk.touched[subject] = self.touched.pop(subject)
+            if subject in self.sizes:
+                chunk.sizes[subject] = self.sizes.pop(subject)
+            # Triples removed by patterns not bound to a subject are
+            # removed one by one.
+            patterns = removed.get(subject, set())
+            chunk.removed |= patterns
+            chunk.removed.update(
+                triple
+                for triple in chunk.uncaught[BufferType.DELETED].triples(
+                    pattern
+                )
+                if not any(
+                    all(x is None or x == y for x, y in zip(removal, triple))
+                    for removal in patterns
+                )
+            )
+            if len(chunk) >= size:
+                yield chunk
+                chunk = DeltaOverlay()
+        if len(chunk):
+            yield chunk
+        self.__init__()
+
+    def removals(self) -> Set[Pattern]:
+        """Patterns to remove from the base graph on commit.
+
+        Removing them deletes the uncaught deleted triples in as few
+        operations as possible. Patterns covered by a more general removed
+        pattern are omitted.
+        """
+        removed = self.removed
+        return {
+            pattern
+            for pattern in removed
+            if not any(
+                tuple(
+                    None if drop else term for term, drop in zip(pattern, mask)
+                )
+                in removed
+                for mask in product((False, True), repeat=3)
+                if any(
+                    drop and term is not None
+                    for term, drop in zip(pattern, mask)
+                )
+            )
         }
 
-        # Reset cache
-        self._cache.remove((None, None, None))
+    def predicates(self) -> Set[Node]:
+        """Predicates of the added and deleted triples."""
+        return {p for _, p, _ in self._changed}
+
+    def touches(self, triple_pattern: Pattern) -> bool:
+        """Whether the changes may affect triples matching a pattern."""
+        if not self._changed:
+            return False
+        subject = triple_pattern[0]
+        return subject is None or any(
+            buffer[buffer_type].has_subject(subject)
+            for buffer in (self.uncaught, self.caught)
+            for buffer_type in BufferType
+        )
 
-        # Set-up file bytestream cache
-        self._file_cache = TemporaryDirectory()
+    def apply(
+        self, triples: Iterable[Triple], triple_pattern: Pattern
+    ) -> Iterable[Triple]:
+        """Apply the changes to triples read from the interface.
 
-        self.interface.open(configuration, create)
+        Args:
+            triples: Triples matching the pattern, without the changes.
+            triple_pattern: The pattern that the triples match.
 
-        # The interface can set its base graph when `open` is called. If not
-        # set by the interface, then an in-memory transaction-aware graph is
-        # used. A session based on this graph is also provided to the
-        # interface.
-        if self.interface.base is None:
-            self.interface.base = Graph(store=BufferedSimpleMemoryStore())
-        self.interface.session_base = Session(
-            base=self.interface.base, ontology=self._ontology
+        Returns:
+            The triples matching the pattern after the changes.
+        """
+        if not self.touches(triple_pattern):
+            return triples
+        changed = self._changed
+        # Exclude all the changed triples, and then include the added ones
+        # (so that they are not duplicated).
+        return chain(
+            (triple for triple in triples if triple not in changed),
+            self.uncaught[BufferType.ADDED].triples(triple_pattern),
+            self.caught[BufferType.ADDED].triples(triple_pattern),
         )
 
-        # Call the populate method of the interface on base graph/session.
-        # The populate method is meant to act on the base graph.
-        session = self.interface.session_base
-        self.interface.session = session
-        try:
-            session.lock()
-            # Session must not close when exiting its context manager (just
-            # in case the user enters the context manager again inside
-            # populate).
-            with session:
-                self.interface.populate()
-                session.commit()
-        finally:
-            session.unlock()
-            self.interface.session_base = None
-            self.interface.session = None
-
-    def close(self, commit_pending_transaction: bool = False) -> None:
-        """Tells the interface to close the data source.
 
-        Args:
-            commit_pending_transaction: commits uncommitted changes when
-                true before closing the data source.
-        """
-        if commit_pending_transaction:
-            self.commit()
-        self.interface.close()
+class CacheSizeException(RuntimeError):
+    """Raised when  triples do not fit in the cache of `InterfaceDriver`."""
 
-        # Clear the cache
-        self._cache.remove((None, None, None))
 
-        # Clear all sessions, graphs, and entities provided to the interface.
-        self.interface.base = None
-        self.interface.old_graph = None
-        self.interface.new_graph = None
-        self.interface.buffer = None
-        self.interface.session_base = None
-        self.interface.session_old = None
-        self.interface.session_new = None
-        self.interface.added = None
-        self.interface.updated = None
-        self.interface.deleted = None
+class FileCommitError(RuntimeError):
+    """Raised when some of the queued files could not be committed.
 
-        # Clear bytestream cache
-        if self._file_cache is not None:
-            self._file_cache.cleanup()
-            self._file_cache = None
+    The exceptions raised for each of the files are available on the
+    `errors` attribute. The triples are committed nonetheless, and the
+    queued files remain pending.
+    """
 
-    def add(self, triple: Triple, context: Graph, quoted=False) -> None:
-        """Adds triples to the interface.
+    errors: Dict[URIRef, Exception]
 
-        Since the actual addition happens during a commit, this method just
-        buffers the changes.
-        """
-        buffer = (
-            self._buffer_caught
-            if hasattr(self.interface, "add")
-            and not self.interface.add(triple)
-            else self._buffer_uncaught
+    def __init__(self, errors: Dict[URIRef, Exception]):
+        """Initialize the exception from the errors of each file."""
+        self.errors = errors
+        super().__init__(
+            f"{len(errors)} file(s) could not be committed: "
+            + ", ".join(
+                f"{key} ({type(error).__name__}: {error})"
+                for key, error in errors.items()
+            )
         )
 
-        buffer[BufferType.DELETED].remove(triple)
-        buffer[BufferType.ADDED].add(triple)
 
-    def remove(
-        self, triple_pattern: Pattern, context: Optional[Graph] = None
-    ) -> None:
-        """Remove triples from the interface.
+class PatternIndex:
+    """Index of the triple patterns held in the cache of `InterfaceDriver`.
 
-        Since the actual removal happens during a commit, this method just
-        buffers the changes.
-        """
-        for buffer in (self._buffer_uncaught, self._buffer_caught):
-            buffer[BufferType.ADDED].remove(triple_pattern)
-            existing_triples = (
-                self.interface.base.triples(triple_pattern)
-                if buffer is self._buffer_uncaught
-                else (
-                    set(self.interface.remove(triple_pattern))
-                    if hasattr(self.interface, "remove")
-                    else set()
-                )
-            )
-            for triple in existing_triples:
-                buffer[BufferType.DELETED].add(triple)
+    Answers whether a triple pattern is covered by the cached patterns with a
+    constant number of dictionary lookups, and keeps the patterns sorted from
+    the least to the most recently inserted one, so that the eviction
+    algorithm does not need to sort them. It also keeps track of the number
+    of cached triples matching each pattern and of their approximate size in
+    bytes.
 
-    def triples(
-        self, triple_pattern: Pattern, context=None, ignore_buffers=False
-    ) -> Iterator[Tuple[Triple, Graph]]:
-        """Query the interface for triple patterns.
+    Patterns matching no triples are known to be empty, and are kept on a
+    separate queue, so that they can be bounded independently and are not
+    chosen for eviction when making room for new triples.
+    """
 
-        This method combines the information on the buffers with the one
-        provided by the interface. Moreover, if defined, it will use the
-        `triples` method of the interface so that it can watch which triples
-        are being retrieved or produce triples from its data structures on
-        the fly.
+    _patterns: OrderedDict[Pattern, datetime]
+    """Cached patterns and the time they were cached, oldest first."""
 
-        In addition, this method is responsible for trying to obtain the
-        triples from the cache if it is enabled, and for filling it on cache
-        misses.
-        """
-        # Determine source of triples.
-        if self.interface.cache and self._cached(triple_pattern):
-            query_method = self._cache.triples
-            fill_cache, fill_cache_sparql = False, False
-        elif hasattr(self.interface, "triples"):
-            query_method = self.interface.triples
-            fill_cache, fill_cache_sparql = True, False
-        else:
-            query_method = self.interface.base.triples
-            fill_cache, fill_cache_sparql = True, True
+    _sizes: Dict[Pattern, int]
+    """Number of cached triples that match each cached pattern."""
 
-        # Manage the triple cache.
-        if fill_cache and self.interface.cache:
-            """Fill the cache using requests based on triple patterns.
+    _sizes_bytes: Dict[Pattern, int]
+    """Approximate size in bytes of the triples matching each pattern."""
 
-            This stage caches either the requested triple pattern, or if the
-            triple pattern contains a subject, all the information about the
-            subject.
-            """
-            timestamp = datetime.now()
+    _by_term: Dict[Tuple[int, Node], Set[Pattern]]
+    """Cached patterns indexed by each of their bound positions and terms."""
 
-            s_p, p_p, o_p = triple_pattern
-            if s_p is not None:
-                """The requested pattern contains a subject."""
-                cache_pattern = (s_p, None, None)
-            else:
-                """No subject in the triple pattern.
+    _empty: OrderedDict[Pattern, None]
+    """Cached patterns matching no triples, oldest first."""
 
-                Cache the triple pattern only.
-                """
-                cache_pattern = triple_pattern
-                fill_cache_sparql = False
-            all_triples = set(query_method(cache_pattern))
+    def __init__(self):
+        """Initialize an empty pattern index."""
+        self._patterns = OrderedDict()
+        self._sizes = dict()
+        self._sizes_bytes = dict()
+        self._by_term = dict()
+        self._empty = OrderedDict()
 
-            def query_method(pattern_triples: Pattern) -> Iterator[Triple]:
-                """Filter the retrieved triples.
+    def __contains__(self, pattern: Pattern) -> bool:
+        """Whether exactly this pattern is on the index."""
+        return pattern in self._patterns
 
-                Yields only the triples matching the given pattern.
-                """
-                pat_s, pat_p, pat_o = pattern_triples
-                yield from (
-                    (a, b, c)
-                    for a, b, c in all_triples
-                    if all(
-                        (
-                            pat_s is None or a == pat_s,
-                            pat_p is None or b == pat_p,
-                            pat_o is None or c == pat_o,
-                        )
-                    )
-                )
+    def __iter__(self) -> Iterator[Pattern]:
+        """Iterate over the patterns from the oldest to the newest."""
+        return iter(self._patterns)
 
-            try:
-                """Fill the cache with the retrieved triples."""
-                self._fill(cache_pattern, all_triples)
-            except CacheSizeException:
-                """No space for the retrieved triples. No action."""
-                pass
+    def __len__(self) -> int:
+        """Number of patterns on the index."""
+        return len(self._patterns)
 
-            if fill_cache_sparql:
-                """Fill the cache using requests based on SPARQL.
+    def items(self) -> Iterator[Tuple[Pattern, datetime]]:
+        """Iterate over the patterns and the time they were cached."""
+        return iter(self._patterns.items())
 
-                This stage allows additional triples related to the children of
-                the object, the parent object and the neighbors to be cached.
-                """
-                base = self.interface.base
-
-                if not isinstance(s_p, BNode):
-                    queries = (
-                        f"""SELECT ?s ?p ?o WHERE {{
-                            <{s_p}> ?predicate ?s .
-                            ?s ?p ?o .
-                        }}""",  # request info about children
-                        f"""SELECT ?s ?p ?o WHERE {{
-                        ?s ?predicate <{s_p}> .
-                        ?s ?p ?o .
-                        }}""",  # request info about parent
-                        f"""SELECT ?s ?p ?o WHERE {{
-                        ?parent ?predicate <{s_p}> .
-                        ?parent ?another_predicate ?s .
-                        ?s ?p ?o .
-                        }}""",  # request info about neighbors
-                    )
-                else:
-                    queries = tuple()
-
-                start = datetime.now()
-                for query in queries:
-                    query_iterator = iter(
-                        base.query(
-                            query,
-                            initNs={
-                                "owl": URIRef("http://www.w3.org/2002/07/owl#")
-                            },
-                        )
-                    )
+    def add(
+        self,
+        pattern: Pattern,
+        size: Optional[int] = None,
+        size_bytes: Optional[int] = None,
+    ) -> None:
+        """Add a pattern to the index, or mark it as the most recent one.
 
-                    result = set()
-                    taken = True
-                    timeout = False
-                    while taken and not timeout:
-                        taken = set(take(query_iterator, self._cache_step))
-                        result |= taken
+        Args:
+            pattern: The pattern to add.
+            size: The number of cached triples matching the pattern. When
+                not provided, the size of an already indexed pattern is
+                kept, and the size of a new pattern is set to zero.
+            size_bytes: The approximate size in bytes of the cached triples
+                matching the pattern. Same behavior as `size` when not
+                provided.
+        """
+        if pattern in self._patterns:
+            self._patterns.move_to_end(pattern)
+        else:
+            for position, term in enumerate(pattern):
+                if term is not None:
+                    self._by_term.setdefault((position, term), set()).add(
+                        pattern
+                    )
+        self._patterns[pattern] = datetime.now()
+        if size is not None or pattern not in self._sizes:
+            self._sizes[pattern] = size or 0
+        if size_bytes is not None or pattern not in self._sizes_bytes:
+            self._sizes_bytes[pattern] = size_bytes or 0
+        self._update_empty(pattern)
+
+    def discard(self, pattern: Pattern) -> None:
+        """Remove a pattern from the index if present."""
+        if self._patterns.pop(pattern, None) is None:
+            return
+        del self._sizes[pattern]
+        del self._sizes_bytes[pattern]
+        self._empty.pop(pattern, None)
+        for position, term in enumerate(pattern):
+            if term is not None:
+                patterns = self._by_term[(position, term)]
+                patterns.discard(pattern)
+                if not patterns:
+                    del self._by_term[(position, term)]
+
+    def clear(self) -> None:
+        """Remove all patterns from the index."""
+        self._patterns.clear()
+        self._sizes.clear()
+        self._sizes_bytes.clear()
+        self._by_term.clear()
+        self._empty.clear()
+
+    def timestamp(self, pattern: Pattern) -> datetime:
+        """Time at which an indexed pattern was cached or last touched."""
+        return self._patterns[pattern]
+
+    def touch(self, pattern: Pattern) -> None:
+        """Mark an indexed pattern as the most recent one."""
+        self._patterns.move_to_end(pattern)
+        self._patterns[pattern] = datetime.now()
+        if pattern in self._empty:
+            self._empty.move_to_end(pattern)
+
+    def size(self, pattern: Pattern) -> int:
+        """Number of cached triples matching an indexed pattern."""
+        return self._sizes[pattern]
+
+    def size_bytes(self, pattern: Pattern) -> int:
+        """Approximate size in bytes of the triples matching a pattern."""
+        return self._sizes_bytes[pattern]
+
+    def resize(
+        self, pattern: Pattern, delta: int, delta_bytes: int = 0
+    ) -> None:
+        """Change the size of the triples matching an indexed pattern.
 
-                        if datetime.now() - start > self._cache_time:
-                            timeout = True
-                            break
+        Args:
+            pattern: The indexed pattern.
+            delta: Change in the number of triples.
+            delta_bytes: Change in the approximate size in bytes.
+        """
+        self._sizes[pattern] += delta
+        self._sizes_bytes[pattern] += delta_bytes
+        if delta:
+            self._update_empty(pattern)
 
-                    if timeout:
-                        break
+    def known_empty(self) -> Iterator[Pattern]:
+        """Iterate over the patterns matching no triples, oldest first."""
+        return iter(self._empty)
 
-                    result = set(result)
-                    if self._compute_space(older_than=timestamp) >= len(
-                        result
-                    ):
-                        pattern_dict = dict()
-                        for s, p, o in result:
-                            pattern_dict[(s, None, None)] = pattern_dict.get(
-                                (s, None, None), set()
-                            ) | {(s, p, o)}
+    def count_empty(self) -> int:
+        """Number of patterns matching no triples."""
+        return len(self._empty)
 
-                        for pattern, triples in pattern_dict.items():
-                            self._fill(pattern, triples)
+    def evictable(self, date: datetime) -> Iterator[Pattern]:
+        """Iterate over the non-empty patterns cached before a given date.
 
-        # Pool existing triples minus added and deleted triples.
-        triple_pool = query_method(triple_pattern)
-        if not ignore_buffers:
-            triple_pool = (
-                triple
-                for triple in triple_pool
-                if all(
-                    triple not in graph
-                    for graph in (
-                        self._buffer_uncaught[BufferType.DELETED],
-                        self._buffer_caught[BufferType.DELETED],
-                        self._buffer_uncaught[BufferType.ADDED],
-                        self._buffer_caught[BufferType.ADDED],
-                    )
-                )
-            )
-            # Include added triples (previously they were excluded in order not
-            # to duplicate triples).
-            triple_pool = chain(
-                triple_pool,
-                self._buffer_uncaught[BufferType.ADDED].triples(
-                    triple_pattern
-                ),
-                self._buffer_caught[BufferType.ADDED].triples(triple_pattern),
-            )
+        The patterns are yielded from the oldest to the newest.
+        """
+        return (
+            pattern
+            for pattern in self.older_than(date)
+            if self._sizes[pattern]
+        )
 
-        yield from ((triple, iter(())) for triple in triple_pool)
+    def oldest(self) -> Optional[Tuple[Pattern, datetime]]:
+        """The least recently inserted pattern and the time it was cached."""
+        return next(iter(self._patterns.items()), None)
 
-    def __len__(self, context: Graph = None, ignore_buffers=False) -> int:
-        """Get the number of triples in the store."""
-        # TODO: faster algorithm.
-        return sum(
-            1 for _ in self.triples((None, None, None), ignore_buffers=True)
+    def covers(self, pattern: Pattern) -> bool:
+        """Whether the pattern is contained in any of the indexed patterns."""
+        return any(
+            compatible in self._patterns
+            for compatible in self.compatible_patterns(pattern)
         )
 
-    def bind(self, prefix, namespace):
-        """Bind a namespace to a prefix."""
-        return super().bind(prefix, namespace)
+    def covering(self, pattern: Pattern) -> Set[Pattern]:
+        """Indexed patterns that contain the given pattern or triple."""
+        return {
+            compatible
+            for compatible in self.compatible_patterns(pattern)
+            if compatible in self._patterns
+        }
 
-    def namespace(self, prefix):
-        """Get the namespace to which a prefix is bound."""
-        return super().namespace(prefix)
+    def sub_patterns(self, pattern: Pattern) -> Set[Pattern]:
+        """Indexed patterns that are contained in the given pattern."""
+        candidates = min(
+            (
+                self._by_term.get((position, term), set())
+                for position, term in enumerate(pattern)
+                if term is not None
+            ),
+            key=len,
+            default=self._patterns.keys(),
+        )
+        return {
+            candidate
+            for candidate in candidates
+            if self.is_sub_pattern(candidate, pattern)
+        }
 
-    def prefix(self, namespace):
-        """Get a bound namespace's prefix."""
-        return super().prefix(namespace)
+    def older_than(self, date: datetime) -> Iterator[Pattern]:
+        """Iterate over the patterns cached before a given date.
 
-    def namespaces(self):
-        """Get the bound namespaces."""
-        return super().namespaces()
+        The patterns are yielded from the oldest to the newest.
+        """
+        for pattern, timestamp in self._patterns.items():
+            if timestamp >= date:
+                break
+            yield pattern
 
-    def query(
-        self, query, init_ns, init_bindings, query_graph, **kwargs
-    ) -> Result:
-        """Perform a SPARQL query on the store."""
-        if (
-            sum(
-                len(x)
-                for x in (
-                    buffer[y]
-                    for buffer in (self._buffer_uncaught, self._buffer_caught)
-                    for y in (BufferType.ADDED, BufferType.DELETED)
-                )
-            )
-            > 0
-        ):
-            # TODO: raise warning that committing can increase query
-            #  performance.
-            raise NotImplementedError
-        elif hasattr(self.interface, "triples"):
-            if hasattr(self.interface, "query"):
-                # TODO: translate init_ns and init_bindings.
-                return self.interface.query(query)
-            else:
-                raise NotImplementedError
+    def newer_than(self, date: datetime) -> Iterator[Pattern]:
+        """Iterate over the patterns cached on or after a given date.
+
+        The patterns are yielded from the newest to the oldest.
+        """
+        for pattern in reversed(self._patterns):
+            if self._patterns[pattern] < date:
+                break
+            yield pattern
+
+    def _update_empty(self, pattern: Pattern) -> None:
+        """Move a pattern in or out of the queue of empty patterns."""
+        if self._sizes[pattern] == 0:
+            self._empty[pattern] = None
+            self._empty.move_to_end(pattern)
         else:
-            return self.interface.base.query(
-                query, initNs=init_ns, initBindings=init_bindings, **kwargs
+            self._empty.pop(pattern, None)
+
+    @staticmethod
+    def is_sub_pattern(sub_pattern: Pattern, pattern: Pattern) -> bool:
+        """Determine whether a triple pattern is a sub-pattern of another.
+
+        Args:
+            sub_pattern: The pattern that is assumed to be a sub-pattern.
+            pattern: The pattern that is assumed to be the super-pattern.
+
+        Returns:
+            Whether the above assumptions are true or not.
+        """
+        return all(
+            sub_pattern[i] == pattern[i] or pattern[i] is None
+            for i in range(0, 3)
+        )
+
+    @staticmethod
+    def compatible_patterns(triple: Pattern) -> Set[Pattern]:
+        """List the patterns that are compatible with a given triple."""
+        s, p, o = triple
+        return {
+            (s, p, o),
+            (s, p, None),
+            (None, p, o),
+            (s, None, o),
+            (None, None, o),
+            (s, None, None),
+            (None, p, None),
+            (None, None, None),
+        }
+
+
+class DiskCache:
+    """Second-level triple cache of `InterfaceDriver`, stored on disk.
+
+    Holds the triples of the patterns evicted from the in-memory cache in an
+    SQLite database, so that they do not need to be requested again from
+    the interface. Patterns are promoted back to the in-memory cache when
+    requested, which removes them from the disk cache. When the disk cache
+    is full, the oldest patterns are discarded.
+
+    Terms are stored using their N3 representation. Unbound positions of
+    the patterns are stored as empty strings.
+    """
+
+    size: int
+    """Maximum size of the disk cache in triples."""
+
+    _connection: sqlite3.Connection
+    """Connection to the SQLite database holding the cache."""
+
+    _length: int = 0
+    """Number of triples held by the disk cache."""
+
+    def __init__(self, path: Union[str, Path], size: int):
+        """Create the database of the disk cache.
+
+        Args:
+            path: Path of the SQLite database file.
+            size: Maximum size of the disk cache in triples.
+        """
+        self.size = size
+        # The prefetch worker of the driver may also use the connection.
+        # The driver serializes the access to it.
+        self._connection = sqlite3.connect(str(path), check_same_thread=False)
+        self._connection.executescript(
+            """
+            CREATE TABLE patterns (
+                id INTEGER PRIMARY KEY,
+                s TEXT, p TEXT, o TEXT,
+                UNIQUE (s, p, o)
+            );
+            CREATE TABLE triples (
+                pattern INTEGER REFERENCES patterns(id),
+                s TEXT, p TEXT, o TEXT
+            );
+            CREATE INDEX triples_pattern ON triples(pattern);
+            CREATE INDEX triples_spo ON triples(s, p, o);
+            """
+        )
+
+    def __len__(self) -> int:
+        """Number of triples held by the disk cache."""
+        return self._length
+
+    def close(self) -> None:
+        """Close the database of the disk cache."""
+        self._connection.close()
+
+    def clear(self) -> None:
+        """Remove all patterns and triples from the disk cache."""
+        with self._connection:
+            self._connection.execute("DELETE FROM triples")
+            self._connection.execute("DELETE FROM patterns")
+        self._length = 0
+
+    def store(self, pattern: Pattern, triples: Collection[Triple]) -> bool:
+        """Store the triples matching a pattern.
+
+        Discards the oldest patterns if there is not enough room.
+
+        Args:
+            pattern: The pattern that the triples match.
+            triples: All the triples matching the pattern.
+
+        Returns:
+            Whether the triples were stored. Patterns bigger than the disk
+            cache are not stored.
+        """
+        if len(triples) > self.size:
+            return False
+        with self._connection:
+            self._delete(pattern)
+            while self._length + len(triples) > self.size:
+                oldest = self._connection.execute(
+                    "SELECT s, p, o FROM patterns ORDER BY id LIMIT 1"
+                ).fetchone()
+                self._delete(tuple(self._decode(x) for x in oldest))
+            identifier = self._connection.execute(
+                "INSERT INTO patterns (s, p, o) VALUES (?, ?, ?)",
+                self._encode_triple(pattern),
+            ).lastrowid
+            self._connection.executemany(
+                "INSERT INTO triples (pattern, s, p, o) VALUES (?, ?, ?, ?)",
+                (
+                    (identifier, *self._encode_triple(triple))
+                    for triple in triples
+                ),
             )
+        self._length += len(triples)
+        return True
+
+    def pop(self, pattern: Pattern) -> Optional[Tuple[Pattern, Set[Triple]]]:
+        """Remove a pattern containing the given one and return its triples.
+
+        Args:
+            pattern: The pattern to look for.
+
+        Returns:
+            The stored pattern containing the given one and all the triples
+            matching it, or `None` if no stored pattern contains it.
+        """
+        for compatible in PatternIndex.compatible_patterns(pattern):
+            row = self._connection.execute(
+                "SELECT id FROM patterns WHERE s = ? AND p = ? AND o = ?",
+                self._encode_triple(compatible),
+            ).fetchone()
+            if row is None:
+                continue
+            triples = {
+                tuple(self._decode(x) for x in triple)
+                for triple in self._connection.execute(
+                    "SELECT s, p, o FROM triples WHERE pattern = ?", row
+                )
+            }
+            with self._connection:
+                self._delete(compatible)
+            return compatible, triples
+        return None
+
+    def add(self, triple: Triple) -> None:
+        """Add a triple to the stored patterns that it matches."""
+        encoded = self._encode_triple(triple)
+        with self._connection:
+            for pattern in PatternIndex.compatible_patterns(triple):
+                self._length += self._connection.execute(
+                    "INSERT INTO triples (pattern, s, p, o) "
+                    "SELECT id, ?, ?, ? FROM patterns "
+                    "WHERE s = ? AND p = ? AND o = ? AND NOT EXISTS ("
+                    "SELECT 1 FROM triples WHERE pattern = patterns.id "
+                    "AND s = ? AND p = ? AND o = ?)",
+                    (*encoded, *self._encode_triple(pattern), *encoded),
+                ).rowcount
+
+    def remove(self, triple: Triple) -> None:
+        """Remove a triple from the stored patterns."""
+        with self._connection:
+            self._length -= self._connection.execute(
+                "DELETE FROM triples WHERE s = ? AND p = ? AND o = ?",
+                self._encode_triple(triple),
+            ).rowcount
+
+    def _delete(self, pattern: Pattern) -> None:
+        """Delete a stored pattern and its triples, if present."""
+        row = self._connection.execute(
+            "SELECT id FROM patterns WHERE s = ? AND p = ? AND o = ?",
+            self._encode_triple(pattern),
+        ).fetchone()
+        if row is None:
+            return
+        self._length -= self._connection.execute(
+            "DELETE FROM triples WHERE pattern = ?", row
+        ).rowcount
+        self._connection.execute("DELETE FROM patterns WHERE id = ?", row)
+
+    @classmethod
+    def _encode_triple(cls, pattern: Pattern) -> Tuple[str, str, str]:
+        return tuple(cls._encode(term) for term in pattern)
+
+    @staticmethod
+    def _encode(term: Optional[Node]) -> str:
+        return term.n3() if term is not None else ""
+
+    @staticmethod
+    def _decode(value: str) -> Optional[Node]:
+        return from_n3(value) if value else None
+
+
+class CachePolicy(ABC):
+    """Decides how the `InterfaceDriver` manages its triple cache.
+
+    An instance of a policy can be assigned to the `cache_policy` attribute
+    of an interface, or passed to a wrapper using the `cache_policy`
+    keyword argument. Each driver works on its own copy of the instance.
+    """
+
+    size: int
+    """Maximum size of the cache in triples."""
+
+    size_bytes: Optional[int]
+    """Maximum approximate size of the cache in bytes.
+
+    The size of a triple is approximated by the number of characters of its
+    terms. There is no limit when set to `None`.
+    """
+
+    prefetch_time: timedelta
+    """Maximum time to spend in caching after making a request.
+
+    When a request for triples involving a specific subject is made,
+    the caching algorithm asks for all the triples involving the subject.
+    This call is not subject to a time limit.
+
+    However, in a second stage, if the interface is merely based on a base
+    graph (meaning requests can be made using SPARQL), the algorithm will
+    also try to cache the children of the such subject, the parent objects,
+    and all of its neighbors. These requests are scheduled on a background
+    worker, so that the request for the triples of the subject returns
+    without waiting for them. Since these operations can take a lot of extra
+    time, this parameter fixes a deadline for each scheduled prefetch,
+    counted from the moment the original request was made. When such
+    caching operations take longer than this time, they are interrupted.
+    """
+
+    prefetch_step: int
+    """Number of triples to fetch at once when filling the cache.
+
+    The queries described above (on the docstring of `prefetch_time`) hold
+    the lock of the driver while they fetch triples from the interface,
+    which blocks any request made by the user in the meantime. This means
+    that if one tries to fetch too many items at once from the interface,
+    it may take significantly longer than the `prefetch_time` to do so, but
+    the operation cannot be canceled until all the items have been fetched.
+
+    That is the reason behind this parameter: if it is small enough, the
+    worker releases the lock and checks the deadline and whether the
+    prefetch has been canceled at smaller intervals. Please note that this
+    assumes that asking the interface to yield one triple takes a much
+    smaller amount of time than `prefetch_time`. This is not necessarily
+    always the case (for example if the underlying interface produces
+    triples in chunks).
+    """
+
+    disk_size: Optional[int]
+    """Maximum size of the second-level cache on disk in triples.
+
+    Patterns evicted from the in-memory cache are moved to a cache on disk
+    instead of being discarded, and moved back when requested. There is no
+    disk cache when set to `None`.
+    """
+
+    empty_size: int
+    """Maximum number of patterns known to match no triples.
+
+    Requests for such patterns (for example checks for the existence of
+    an entity that does not exist) are answered from the cache. They take
+    no room from the triples, and are forgotten from the oldest when there
+    are more than this number of them. Set to zero to disable.
+    """
+
+    prefetch_background: bool
+    """Whether to run the SPARQL-based cache prefetching in the background.
+
+    When false, the prefetching runs on the caller's thread right after the
+    triples of the subject have been fetched, as soon as they are requested.
+    Interfaces whose base graph cannot be read from other threads (see
+    `Interface.thread_safe_reads`) always prefetch on the caller's thread.
+    """
+
+    prefetch_cbd: bool
+    """Whether to cache the blank nodes described by a requested subject.
+
+    When the triples of a subject are requested, the triples of the blank
+    nodes reachable from it through blank nodes (its concise bounded
+    description) are also fetched and cached. Blank nodes are used, for
+    example, for OWL restrictions and RDF lists, which would otherwise be
+    fetched one node at a time. This prefetch runs in the background under
+    the same conditions as the SPARQL-based one, and it is also subject to
+    `prefetch_time`. When it runs on the caller's thread, only the blank
+    nodes referenced by the triples of the subject are fetched.
+    """
+
+    def __init__(
+        self,
+        size: int = 100000,
+        size_bytes: Optional[int] = None,
+        disk_size: Optional[int] = None,
+        empty_size: int = 10000,
+        prefetch_time: float = 0.3,
+        prefetch_step: int = 100,
+        prefetch_background: bool = True,
+        prefetch_cbd: bool = True,
+    ):
+        """Initialize the cache policy.
+
+        Args:
+            size: Maximum size of the cache in triples.
+            size_bytes: Maximum approximate size of the cache in bytes.
+            disk_size: Maximum size of the cache on disk in triples.
+            empty_size: Maximum number of patterns known to match no
+                triples.
+            prefetch_time: Maximum time to spend prefetching triples after a
+                request (in seconds).
+            prefetch_step: Number of triples to fetch at once when
+                prefetching.
+            prefetch_background: Whether to prefetch triples on a background
+                worker.
+            prefetch_cbd: Whether to prefetch the blank nodes described by
+                requested subjects.
+        """
+        self.size = size
+        self.size_bytes = size_bytes
+        self.disk_size = disk_size
+        self.empty_size = empty_size
+        self.prefetch_time = timedelta(seconds=prefetch_time)
+        self.prefetch_step = prefetch_step
+        self.prefetch_background = prefetch_background
+        self.prefetch_cbd = prefetch_cbd
+
+    @classmethod
+    def get_policy(cls, name: str) -> CachePolicy:
+        """Get a cache policy with default settings from its name.
+
+        Args:
+            name: One of `lru`, `lfu` or `ttl` (case-insensitive).
+
+        Raises:
+            KeyError: No policy with such name.
+        """
+        policies = {
+            "lru": LRUCachePolicy,
+            "lfu": LFUCachePolicy,
+            "ttl": TTLCachePolicy,
+        }
+        try:
+            return policies[name.lower()]()
+        except KeyError as e:
+            raise KeyError(
+                f"Unknown cache policy {name}. Available policies: "
+                f"{', '.join(policies)}."
+            ) from e
+
+    def inserted(self, index: PatternIndex, pattern: Pattern) -> None:
+        """Called after a pattern has been (re)filled with triples."""
+        pass
+
+    def hit(self, index: PatternIndex, pattern: Pattern) -> None:
+        """Called when a cached pattern answers a request."""
+        pass
+
+    def discarded(self, pattern: Pattern) -> None:
+        """Called after a pattern has been removed from the cache."""
+        pass
+
+    def expired(self, index: PatternIndex, pattern: Pattern) -> bool:
+        """Whether a cached pattern must not be used to answer requests."""
+        return False
+
+    def clear(self) -> None:
+        """Called after all patterns have been removed from the cache."""
+        pass
+
+    @abstractmethod
+    def victim(
+        self, index: PatternIndex, older_than: datetime
+    ) -> Optional[Pattern]:
+        """Choose the next pattern to evict from the cache.
+
+        Patterns matching no triples must not be chosen, as evicting them
+        makes no room.
+
+        Args:
+            index: The index of cached patterns.
+            older_than: Patterns cached or touched after this date are
+                pinned and cannot be chosen.
+
+        Returns:
+            The pattern to evict, or `None` if none can be evicted.
+        """
+        pass
+
+
+class LRUCachePolicy(CachePolicy):
+    """Evicts the least recently used patterns first."""
+
+    def hit(self, index: PatternIndex, pattern: Pattern) -> None:
+        """Mark the pattern as the most recently used one."""
+        index.touch(pattern)
+
+    def victim(
+        self, index: PatternIndex, older_than: datetime
+    ) -> Optional[Pattern]:
+        """Choose the least recently used pattern."""
+        return next(index.evictable(older_than), None)
+
+
+class LFUCachePolicy(CachePolicy):
+    """Evicts the least frequently used patterns first.
+
+    Among the patterns used the same number of times, the least recently
+    cached one is evicted first.
+    """
+
+    _frequencies: Dict[Pattern, int]
+    """Number of times each cached pattern has been used."""
+
+    _buckets: Dict[int, OrderedDict[Pattern, None]]
+    """Cached patterns grouped by the number of times they have been used."""
+
+    def __init__(self, *args, **kwargs):
+        """Initialize the cache policy.
+
+        Accepts the same arguments as `CachePolicy`.
+        """
+        super().__init__(*args, **kwargs)
+        self._frequencies = dict()
+        self._buckets = dict()
+
+    def inserted(self, index: PatternIndex, pattern: Pattern) -> None:
+        """Start tracking the pattern, keeping its frequency if refilled."""
+        if pattern not in self._frequencies:
+            self._frequencies[pattern] = 1
+            self._buckets.setdefault(1, OrderedDict())[pattern] = None
+
+    def hit(self, index: PatternIndex, pattern: Pattern) -> None:
+        """Increase the frequency of the pattern."""
+        frequency = self._frequencies.get(pattern)
+        if frequency is None:
+            self.inserted(index, pattern)
+            return
+        self._remove_from_bucket(pattern, frequency)
+        self._frequencies[pattern] = frequency + 1
+        self._buckets.setdefault(frequency + 1, OrderedDict())[pattern] = None
+
+    def discarded(self, pattern: Pattern) -> None:
+        """Stop tracking the pattern."""
+        frequency = self._frequencies.pop(pattern, None)
+        if frequency is not None:
+            self._remove_from_bucket(pattern, frequency)
+
+    def clear(self) -> None:
+        """Stop tracking all patterns."""
+        self._frequencies.clear()
+        self._buckets.clear()
+
+    def victim(
+        self, index: PatternIndex, older_than: datetime
+    ) -> Optional[Pattern]:
+        """Choose the least frequently used pattern."""
+        for frequency in sorted(self._buckets):
+            for pattern in self._buckets[frequency]:
+                if (
+                    index.size(pattern)
+                    and index.timestamp(pattern) < older_than
+                ):
+                    return pattern
+        return None
+
+    def _remove_from_bucket(self, pattern: Pattern, frequency: int) -> None:
+        bucket = self._buckets[frequency]
+        del bucket[pattern]
+        if not bucket:
+            del self._buckets[frequency]
+
+
+class TTLCachePolicy(CachePolicy):
+    """Patterns expire after a fixed amount of time.
+
+    Expired patterns are fetched again from the interface when requested.
+    The patterns closest to expiring are evicted first.
+    """
+
+    ttl: timedelta
+    """Time after which a cached pattern expires."""
+
+    def __init__(self, ttl: float = 60, *args, **kwargs):
+        """Initialize the cache policy.
+
+        Args:
+            ttl: Time after which a cached pattern expires (in seconds).
+            args: Positional arguments for `CachePolicy`.
+            kwargs: Keyword arguments for `CachePolicy`.
+        """
+        super().__init__(*args, **kwargs)
+        self.ttl = timedelta(seconds=ttl)
+
+    def expired(self, index: PatternIndex, pattern: Pattern) -> bool:
+        """Whether the pattern was cached longer than `ttl` ago."""
+        return datetime.now() - index.timestamp(pattern) > self.ttl
+
+    def victim(
+        self, index: PatternIndex, older_than: datetime
+    ) -> Optional[Pattern]:
+        """Choose the pattern that has been cached for the longest time."""
+        return next(index.evictable(older_than), None)
+
+
+class JobStatus(IntEnum):
+    """Enum representing the possible states of a compute job.
+
+    - PENDING: Waiting for the previous commits and jobs to finish.
+    - RUNNING: Being computed.
+    - DONE: Computed, the results are on the base graph.
+    - FAILED: The computation raised an exception.
+    - CANCELLED: Cancelled before or while being computed.
+    """
+
+    PENDING = 0
+    RUNNING = 1
+    DONE = 2
+    FAILED = 3
+    CANCELLED = 4
+
+
+class ComputeJob:
+    """Handle on a computation running in the background.
+
+    Returned by `InterfaceDriver.compute_async`. While computing, the
+    interface can reach the job through its `job` attribute to report
+    progress and to check whether cancellation has been requested.
+    Interfaces that honor cancellation should raise `CancelledError` after
+    stopping, so that their results are not committed.
+    """
+
+    _future: Future
+    _cancel: Event
+    _progress: Optional[float] = None
+
+    def __init__(self):
+        """Initialize the job."""
+        self._future = Future()
+        self._cancel = Event()
+
+    @property
+    def status(self) -> JobStatus:
+        """Current state of the job."""
+        if self._future.cancelled():
+            return JobStatus.CANCELLED
+        elif not self._future.done():
+            return (
+                JobStatus.RUNNING
+                if self._future.running()
+                else JobStatus.PENDING
+            )
+        elif isinstance(self._future.exception(), CancelledError):
+            return JobStatus.CANCELLED
+        elif self._future.exception() is not None:
+            return JobStatus.FAILED
+        return JobStatus.DONE
+
+    @property
+    def progress(self) -> Optional[float]:
+        """Last progress reported by the interface (from 0 to 1)."""
+        return self._progress
+
+    def report(self, progress: float) -> None:
+        """Report the progress of the computation (from 0 to 1).
+
+        Meant to be called by the interface while computing.
+        """
+        self._progress = min(max(progress, 0.0), 1.0)
+
+    @property
+    def cancel_requested(self) -> bool:
+        """Whether the cancellation of the job has been requested."""
+        return self._cancel.is_set()
+
+    def cancel(self) -> bool:
+        """Request the cancellation of the job.
+
+        Pending jobs are cancelled right away. Running jobs are only asked
+        to stop, and are cancelled if the interface honors the request.
+
+        Returns:
+            True when the job was cancelled right away, False when it is
+            already running or finished, as `concurrent.futures.Future`.
+        """
+        if self._future.done():
+            return False
+        self._cancel.set()
+        return self._future.cancel()
+
+    def done(self) -> bool:
+        """Whether the job has finished (successfully or not)."""
+        return self._future.done()
+
+    def wait(self, timeout: Optional[float] = None) -> None:
+        """Wait for the job to finish.
+
+        Args:
+            timeout: Maximum number of seconds to wait.
+
+        Raises:
+            TimeoutError: The job did not finish in time.
+            CancelledError: The job was cancelled.
+            Exception: The exception raised by the computation.
+        """
+        self._future.result(timeout=timeout)
+
+    def _run(self, function: Callable[[], None]) -> None:
+        """Run the computation unless the job was cancelled."""
+        if not self._future.set_running_or_notify_cancel():
+            return
+        try:
+            function()
+        except BaseException as exception:
+            self._future.set_exception(exception)
+        else:
+            self._future.set_result(None)
+
+
+class SessionViews:
+    """Sessions on the graphs offered to an interface by `InterfaceDriver`.
+
+    The driver assigns a graph to each of the views (`base`, `old` and
+    `new`) before calling the interface, which reaches them through its
+    `session_base`, `session_old` and `session_new` attributes. The session
+    of a view is only created the first time it is accessed. Afterwards, it
+    is reused, rebasing it on the graph assigned to the view, so that
+    transactions not using a view do not pay for creating its session.
+    The session is rebased the first time it is accessed after each
+    assignment, even when the graph is the same, so that no state of a
+    transaction (e.g. created or cached entities) reaches the next one.
+    """
+
+    def __init__(self, ontology: Optional[Session] = None):
+        """Initialize the views without graphs.
+
+        Args:
+            ontology: Ontology of the sessions.
+        """
+        self._ontology = ontology
+        self._graphs: Dict[str, Graph] = dict()
+        self._sessions: Dict[str, Session] = dict()
+        self._rebased: Set[str] = set()
+
+    def assign(self, **graphs: Optional[Graph]) -> None:
+        """Assign graphs to views (or unassign them when `None`)."""
+        for view, graph in graphs.items():
+            self._rebased.discard(view)
+            if graph is None:
+                self._graphs.pop(view, None)
+            else:
+                self._graphs[view] = graph
+
+    def clear(self) -> None:
+        """Unassign the graphs of all the views."""
+        self._graphs.clear()
+        self._rebased.clear()
+
+    def get(self, view: str) -> Optional[Session]:
+        """Get the session of a view.
+
+        Returns:
+            The session, or `None` when no graph is assigned to the view.
+        """
+        graph = self._graphs.get(view)
+        if graph is None:
+            return None
+        session = self._sessions.get(view)
+        if session is None:
+            session = Session(base=graph, ontology=self._ontology)
+            self._sessions[view] = session
+        elif view not in self._rebased:
+            session._rebase(graph)
+        self._rebased.add(view)
+        return session
+
+
+class _SessionView:
+    """Attribute of `Interface` giving access to a view of `SessionViews`."""
+
+    def __init__(self, view: str):
+        """Initialize the attribute for a view."""
+        self._view = view
+
+    def __get__(
+        self, interface: Optional[Interface], owner: Optional[type] = None
+    ) -> Optional[Session]:
+        """Get the session of the view."""
+        if interface is None:
+            return self
+        views = interface._session_views
+        return views.get(self._view) if views is not None else None
+
+
+def synchronized(method: Callable) -> Callable:
+    """Run a method of `InterfaceDriver` while holding its lock."""
+
+    @wraps(method)
+    def wrapper(self, *args, **kwargs):
+        with self._lock:
+            return method(self, *args, **kwargs)
+
+    return wrapper
+
+
+class InterfaceDriver(Store):
+    """RDFLib store acting as intermediary between SimPhoNy and wrappers.
+
+    Offers a triplestore interface for SimPhoNy to interact with wrappers.
+
+     SimPhoNy <--> InterfaceDriver <--> Interface
+
+    The store is transaction aware (needs a commit action to save the changes
+    to the wrapper). Otherwise, one would have to update an entity
+    every time a single triple from the entity is added.
+    """
+
+    interface: Interface
+    """The interface that the driver controls."""
+
+    _delta: DeltaOverlay
+    """Holds uncommitted changes.
+
+    The triples caught by the interface should not be added to the
+    interface's base graph, while the uncaught triples should.
+    """
+
+    _queue: Dict[URIRef, Optional[BinaryIO]]
+    """Holds handles of files to be uploaded, URIs of files to be deleted."""
+
+    _ontology: Optional[Session]
+    """Ontology to be used on the session's shown to the wrapper developer."""
+
+    _cache: Graph
+    """Holds cached triples when the interface's cache is enabled."""
+
+    _cached_patterns: PatternIndex
+    """Holds currently cached patterns and the time they were cached."""
+
+    _cache_length: int = 0
+    """Number of triples currently held by the cache."""
+
+    _cache_bytes: int = 0
+    """Approximate size in bytes of the triples held by the cache."""
+
+    _cache_policy: CachePolicy
+    """Decides the size of the cache, what to evict and how to prefetch."""
+
+    _cache_disk: Optional[DiskCache] = None
+    """Second-level cache on disk, enabled by the cache policy."""
+
+    _cache_stats: Dict[str, Union[int, float]]
+    """Counters describing the behavior of the cache since it was opened.
+
+    See the docstring of `cache_stats` for details.
+    """
+
+    _pending: Deque[Tuple[DeltaOverlay, dict, Optional[int], Future]]
+    """Changes frozen by `commit_async` that are not yet committed.
+
+    Each entry contains the changes, the file queue, the chunk size and
+    the future of the commit, oldest first.
+    """
+
+    _commit_error: Optional[BaseException] = None
+    """Exception of the last failed asynchronous commit.
+
+    Raised by the next call to `commit`, unless the changes are rolled
+    back.
+    """
+
+    _executor: Optional[ThreadPoolExecutor] = None
+    """Worker running asynchronous commits and compute jobs, in order."""
+
+    _jobs: List[ComputeJob]
+    """Compute jobs submitted to the worker that may not have finished."""
+
+    _commit_stats: Dict[str, Union[int, float]]
+    """Statistics about the last commit.
+
+    See the docstring of `commit_stats` for details.
+    """
+
+    count_probes: int = 1000
+    """Maximum number of changed triples looked up when counting.
+
+    See the docstring of `count`.
+    """
+
+    _lock: RLock
+    """Serializes the access to the interface and to the cache.
+
+    The user's requests and the prefetch worker share both the interface
+    and the cache. Only one of them may use them at a time.
+    """
+
+    _prefetch_queue: Deque[
+        Tuple[Callable[..., None], Node, datetime, datetime, int]
+    ]
+    """Prefetches scheduled for the prefetch worker.
+
+    Each entry contains the prefetch method, the subject, the time the
+    original request was made, the deadline of the prefetch and the
+    generation it belongs to.
+    """
+
+    _prefetch_generation: int = 0
+    """Increased every time scheduled or running prefetches are canceled."""
+
+    _prefetch_worker: Optional[Thread] = None
+    """Thread consuming the prefetch queue, if running."""
+
+    _file_cache: Optional[TemporaryDirectory] = None
+    """Holds files that are accessed while queued.
+
+    Files are queued as byte streams (which can be exhausted). Therefore,
+    if a user needs to access a file before it is committed, the byte stream
+    needs to be copied somewhere to be committed later. This also applies
+    when files need to be accessed during commit by a wrapper (as they are
+    truly sent to the wrapper after the `commit` method has finished).
+    """
+
+    # RDFLib
+    # ↓ -- ↓
+
+    context_aware: bool = False
+    formula_aware: bool = False
+    transaction_aware: bool = True
+    graph_aware: bool = False
+
+    def __init__(
+        self,
+        *args,
+        interface: Interface,
+        ontology: Optional[Session] = None,
+        cache_policy: Optional[Union[str, CachePolicy]] = None,
+        **kwargs,
+    ):
+        """Initialize the InterfaceDriver.
+
+        The initialization assigns an interface to the store and creates
+        buffers. Then the usual RDFLib's store initialization follows.
+
+        The cache policy is taken from the `cache_policy` argument. When
+        not provided, the `cache_policy` attribute of the interface is used,
+        and if it is not defined either, a least recently used policy with
+        default settings.
+        """
+        if not isinstance(interface, Interface):
+            raise ValueError("No valid interface provided.")
+
+        interface.close()
+        self.interface = interface
+
+        self._delta = DeltaOverlay()
+
+        self._ontology = ontology
+        self._session_views = SessionViews(ontology)
+        interface._session_views = self._session_views
+        self._queue = dict()
+        self._cache = Graph("SimpleMemory")
+        self._cached_patterns = PatternIndex()
+        cache_policy = (
+            cache_policy or interface.cache_policy or LRUCachePolicy()
+        )
+        if isinstance(cache_policy, str):
+            cache_policy = CachePolicy.get_policy(cache_policy)
+        self._cache_policy = deepcopy(cache_policy)
+        self._cache_policy.clear()
+        self._cache_stats = self._cache_stats_empty()
+        self._commit_stats = dict()
+        self._pending = deque()
+        self._jobs = []
+        self._lock = RLock()
+        # Guards the uncommitted changes (`_changes`, `_delta` and `_queue`)
+        # against commits taking them from other threads. It is acquired
+        # before `_lock` when both are needed, and the background worker
+        # never acquires it, so that changes can be made while it commits.
+        self._changes_lock = RLock()
+        self._prefetch_queue = deque()
+        self._changes = []
+        super().__init__(*args, **kwargs)
+
+    @synchronized
+    def open(self, configuration: str, create: bool = False) -> None:
+        """Asks the interface to open the data source."""
+        # Cancel prefetches scheduled before the data source was reopened.
+        self._prefetch_cancel()
+
+        # Reset buffers
+        self._delta = DeltaOverlay()
+
+        # Reset cache
+        self.cache_clear()
+        self._cache_stats = self._cache_stats_empty()
+
+        # Set-up file bytestream cache
+        self._file_cache = TemporaryDirectory()
+
+        # Set-up the second-level triple cache, stored with the files.
+        if self._cache_disk is not None:
+            self._cache_disk.close()
+            self._cache_disk = None
+        if self.interface.cache and self._cache_policy.disk_size is not None:
+            self._cache_disk = DiskCache(
+                Path(self._file_cache.name) / "cache.sqlite",
+                size=self._cache_policy.disk_size,
+            )
+
+        self.interface.open(configuration, create)
+
+        # The interface can set its base graph when `open` is called. If not
+        # set by the interface, then an in-memory transaction-aware graph is
+        # used. A session based on this graph is also provided to the
+        # interface.
+        if self.interface.base is None:
+            self.interface.base = Graph(store=BufferedSimpleMemoryStore())
+        self._session_views.assign(base=self.interface.base)
+
+        # Call the populate method of the interface on base graph/session.
+        # The populate method is meant to act on the base graph.
+        session = self.interface.session_base
+        self.interface.session = session
+        try:
+            session.lock()
+            # Session must not close when exiting its context manager (just
+            # in case the user enters the context manager again inside
+            # populate).
+            with session:
+                self.interface.populate()
+                session.commit()
+        finally:
+            session.unlock()
+            self._session_views.assign(base=None)
+            self.interface.session = None
+
+    def close(self, commit_pending_transaction: bool = False) -> None:
+        """Tells the interface to close the data source.
+
+        Args:
+            commit_pending_transaction: commits uncommitted changes when
+                true before closing the data source.
+        """
+        with self._lock:
+            # Stop prefetching, the data source is about to be closed.
+            self._prefetch_cancel()
+
+            # Cancel the compute jobs.
+            for job in self._jobs:
+                job.cancel()
+            self._jobs = []
+
+        if commit_pending_transaction:
+            self.commit()
+
+        with self._changes_lock, self._lock:
+            # Finish the asynchronous commits.
+            while self._pending and not self._pending[0][3].done():
+                self._commit_next()
+            self._commit_restore()
+            self._commit_error = None
+            if self._executor is not None:
+                self._executor.shutdown(wait=False)
+                self._executor = None
+            self._changes = []
+            self.interface.close()
+
+            # Clear the cache
+            self.cache_clear()
+
+            # Clear the sessions, graphs and entities provided to the
+            # interface.
+            self.interface.base = None
+            self.interface.old_graph = None
+            self.interface.new_graph = None
+            self.interface.buffer = None
+            self._session_views.clear()
+            self.interface.added = None
+            self.interface.updated = None
+            self.interface.deleted = None
+
+            # Clear second-level triple cache and bytestream cache
+            if self._cache_disk is not None:
+                self._cache_disk.close()
+                self._cache_disk = None
+            if self._file_cache is not None:
+                self._file_cache.cleanup()
+                self._file_cache = None
+
+    def add(self, triple: Triple, context: Graph, quoted=False) -> None:
+        """Adds triples to the interface.
+
+        Since the actual addition happens during a commit, this method just
+        buffers the changes. When the interface defines `add_many`, the
+        additions are batched (see `_flush_changes`). Only deciding whether
+        the interface catches the addition waits for the asynchronous
+        commits in progress.
+        """
+        self._commit_restore()
+        if hasattr(self.interface, "add_many"):
+            self._batch_change(True, triple)
+            return
+        self._flush_changes()
+        with self._changes_lock:
+            caught = False
+            if hasattr(self.interface, "add"):
+                with self._lock:
+                    caught = not self.interface.add(triple)
+            self._buffer_addition(triple, caught)
+
+    def remove(
+        self, triple_pattern: Pattern, context: Optional[Graph] = None
+    ) -> None:
+        """Remove triples from the interface.
+
+        Since the actual removal happens during a commit, this method just
+        buffers the changes. When the interface defines `remove_many`, the
+        removals are batched (see `_flush_changes`). Unlike additions,
+        removals look up the triples being removed, which waits for the
+        asynchronous commits in progress.
+        """
+        self._commit_restore()
+        if hasattr(self.interface, "remove_many"):
+            self._batch_change(False, triple_pattern)
+            return
+        self._flush_changes()
+        with self._changes_lock, self._lock:
+            self._buffer_removal(
+                triple_pattern,
+                set(self.interface.remove(triple_pattern))
+                if hasattr(self.interface, "remove")
+                else set(),
+            )
+
+    def triples(
+        self, triple_pattern: Pattern, context=None, ignore_buffers=False
+    ) -> Iterator[Tuple[Triple, Graph]]:
+        """Query the interface for triple patterns.
+
+        This method combines the information on the buffers with the one
+        provided by the interface. Moreover, if defined, it will use the
+        `triples` method of the interface so that it can watch which triples
+        are being retrieved or produce triples from its data structures on
+        the fly.
+
+        In addition, this method is responsible for trying to obtain the
+        triples from the cache if it is enabled, and for filling it on cache
+        misses.
+        """
+        if not ignore_buffers:
+            self._flush_changes()
+        with self._lock:
+            # Determine source of triples.
+            query_many = None
+            if self.interface.cache and self._cached(triple_pattern):
+                query_method = self._cache.triples
+                fill_cache, fill_cache_sparql = False, False
+                self._cache_stats["hits"] += 1
+            elif self.interface.cache and self._cache_promote(triple_pattern):
+                query_method = self._cache.triples
+                fill_cache, fill_cache_sparql = False, False
+                self._cache_stats["disk_hits"] += 1
+            elif hasattr(self.interface, "triples"):
+                query_method = self.interface.triples
+                query_many = getattr(self.interface, "triples_many", None)
+                fill_cache, fill_cache_sparql = True, False
+            else:
+                query_method = self.interface.base.triples
+                fill_cache, fill_cache_sparql = True, True
+
+            # Manage the triple cache.
+            if fill_cache and self.interface.cache:
+                """Fill the cache using requests based on triple patterns.
+
+                This stage caches either the requested triple pattern, or if
+                the triple pattern contains a subject, all the information
+                about the subject.
+                """
+                timestamp = datetime.now()
+
+                self._cache_stats["misses"] += 1
+                if self._cached_patterns.sub_patterns(triple_pattern):
+                    """Part of the requested triples are cached."""
+                    self._cache_stats["partial_hits"] += 1
+
+                s_p, p_p, o_p = triple_pattern
+                if s_p is not None:
+                    """The requested pattern contains a subject."""
+                    cache_pattern = (s_p, None, None)
+                else:
+                    """No subject in the triple pattern.
+
+                    Cache the triple pattern only.
+                    """
+                    cache_pattern = triple_pattern
+                    fill_cache_sparql = False
+                source = query_method
+                all_triples = set(source(cache_pattern))
+
+                def query_method(
+                    pattern_triples: Pattern,
+                ) -> Iterator[Triple]:
+                    """Filter the retrieved triples.
+
+                    Yields only the triples matching the given pattern.
+                    """
+                    pat_s, pat_p, pat_o = pattern_triples
+                    yield from (
+                        (a, b, c)
+                        for a, b, c in all_triples
+                        if all(
+                            (
+                                pat_s is None or a == pat_s,
+                                pat_p is None or b == pat_p,
+                                pat_o is None or c == pat_o,
+                            )
+                        )
+                    )
+
+                try:
+                    """Fill the cache with the retrieved triples."""
+                    self._fill(cache_pattern, all_triples)
+                except CacheSizeException:
+                    """No space for the retrieved triples. No action."""
+                    pass
+
+                if (
+                    s_p is not None
+                    and self._cache_policy.prefetch_cbd
+                    and any(isinstance(o, BNode) for _, _, o in all_triples)
+                ):
+                    """Fill the cache with the blank nodes of the subject.
+
+                    Caches the concise bounded description of the subject,
+                    that is, the triples of the blank nodes reachable from
+                    it through blank nodes. This works for blank node
+                    subjects too, which SPARQL cannot refer to.
+                    """
+                    self._prefetch_schedule(
+                        partial(
+                            self._prefetch_cbd,
+                            triples=all_triples,
+                            source=source,
+                            source_many=query_many,
+                            walk=self._prefetch_background,
+                        ),
+                        s_p,
+                        timestamp,
+                    )
+
+                if fill_cache_sparql and not isinstance(s_p, BNode):
+                    """Fill the cache using requests based on SPARQL.
+
+                    This stage allows additional triples related to the
+                    children of the object, the parent object and the
+                    neighbors to be cached. It runs on a background worker,
+                    so that the triples of the subject can be returned
+                    right away.
+                    """
+                    self._prefetch_schedule(
+                        self._prefetch_neighborhood, s_p, timestamp
+                    )
+
+            triple_pool = query_method(triple_pattern)
+            if not fill_cache and self.interface.cache:
+                """Read the cached triples while holding the lock.
+
+                The prefetch worker may modify the cache at any time.
+                """
+                triple_pool = list(triple_pool)
+
+        # Pool existing triples minus added and deleted triples, plus added
+        # triples.
+        if not ignore_buffers:
+            triple_pool = self._delta.apply(
+                self._apply_pending(triple_pool, triple_pattern),
+                triple_pattern,
+            )
+
+        yield from ((triple, iter(())) for triple in triple_pool)
+
+    def triples_many(
+        self, triple_patterns: Iterable[Pattern], ignore_buffers=False
+    ) -> Dict[Pattern, Set[Triple]]:
+        """Query the interface for several triple patterns at once.
+
+        When the interface defines a `triples_many` method, the patterns
+        not covered by the cache are retrieved with a single call to it, and
+        then cached as they are. Otherwise, each pattern is queried
+        separately through `triples`.
+
+        Returns:
+            A dictionary mapping each pattern to the triples matching it.
+        """
+        triple_patterns = list(dict.fromkeys(triple_patterns))
+        result = dict()
+        if not ignore_buffers:
+            self._flush_changes()
+        with self._lock:
+            if hasattr(self.interface, "triples_many"):
+                missing = []
+                for pattern in triple_patterns:
+                    if self.interface.cache and self._cached(pattern):
+                        self._cache_stats["hits"] += 1
+                    elif self.interface.cache and self._cache_promote(pattern):
+                        self._cache_stats["disk_hits"] += 1
+                    else:
+                        missing.append(pattern)
+                        continue
+                    result[pattern] = set(self._cache.triples(pattern))
+                fetched = (
+                    self.interface.triples_many(missing) if missing else {}
+                )
+                for pattern in missing:
+                    triples = set(fetched.get(pattern, ()))
+                    result[pattern] = triples
+                    if not self.interface.cache:
+                        continue
+                    self._cache_stats["misses"] += 1
+                    try:
+                        self._fill(pattern, triples)
+                    except CacheSizeException:
+                        pass
+            else:
+                for pattern in triple_patterns:
+                    result[pattern] = {
+                        triple
+                        for triple, _ in self.triples(
+                            pattern, ignore_buffers=True
+                        )
+                    }
+
+        if not ignore_buffers:
+            result = {
+                pattern: set(
+                    self._delta.apply(
+                        self._apply_pending(triples, pattern), pattern
+                    )
+                )
+                for pattern, triples in result.items()
+            }
+        return result
+
+    def count(self, triple_pattern: Pattern, ignore_buffers=False) -> int:
+        """Count the triples matching a triple pattern.
+
+        The triples are counted from the cache if it covers the pattern, and
+        otherwise using the `count` method of the interface if defined, so
+        that the backend can count them natively. Only when neither is
+        possible the triples are retrieved and counted one by one.
+
+        The uncommitted changes are accounted for by looking up only the
+        added and deleted triples that match the pattern (see `_existing`).
+        When more than `count_probes` changed triples match the pattern, the
+        triples are counted one by one instead.
+        """
+        if not ignore_buffers:
+            self._flush_changes()
+        with self._lock:
+            if self._pending and not ignore_buffers:
+                # Changes are being committed asynchronously. Count the
+                # triples one by one.
+                return sum(1 for _ in self.triples(triple_pattern))
+
+            changed, added = set(), set()
+            if not ignore_buffers and self._delta.touches(triple_pattern):
+                buffers = (self._delta.uncaught, self._delta.caught)
+                changed = {
+                    triple
+                    for buffer in buffers
+                    for buffer_type in BufferType
+                    for triple in buffer[buffer_type].triples(triple_pattern)
+                }
+                if len(changed) > self.count_probes:
+                    return sum(1 for _ in self.triples(triple_pattern))
+                added = {
+                    triple
+                    for buffer in buffers
+                    for triple in buffer[BufferType.ADDED].triples(
+                        triple_pattern
+                    )
+                }
+
+            if self.interface.cache and self._cached(triple_pattern):
+                count = sum(1 for _ in self._cache.triples(triple_pattern))
+            elif hasattr(self.interface, "count"):
+                count = self.interface.count(triple_pattern)
+            elif hasattr(self.interface, "triples"):
+                count = sum(1 for _ in self.interface.triples(triple_pattern))
+            elif triple_pattern == (None, None, None):
+                count = len(self.interface.base)
+            else:
+                count = sum(
+                    1 for _ in self.interface.base.triples(triple_pattern)
+                )
+
+            if not changed:
+                return count
+
+            # Discount the changed triples that exist on the interface and
+            # count the added ones (see `DeltaOverlay.apply`).
+            return count - self._existing(changed) + len(added)
+
+    def _existing(self, triples: Collection[Triple]) -> int:
+        """Count how many of the given triples exist on the interface.
+
+        The triples are looked up on the cache when it covers them, and
+        otherwise on the interface, at once if it defines `triples_many`.
+        The cache is not filled with the results, as the lookups are
+        unlikely to be useful later and would evict other patterns.
+        """
+        existing, unknown = 0, []
+        for triple in triples:
+            if self.interface.cache and self._cached(triple):
+                existing += next(self._cache.triples(triple), None) is not None
+            else:
+                unknown.append(triple)
+        if not unknown:
+            return existing
+        if hasattr(self.interface, "triples_many"):
+            found = self.interface.triples_many(unknown)
+            existing += sum(
+                1
+                for triple in unknown
+                if next(iter(found.get(triple, ())), None) is not None
+            )
+        elif hasattr(self.interface, "triples"):
+            existing += sum(
+                1
+                for triple in unknown
+                if next(iter(self.interface.triples(triple)), None) is not None
+            )
+        else:
+            existing += sum(
+                1 for triple in unknown if triple in self.interface.base
+            )
+        return existing
+
+    def __len__(self, context: Graph = None, ignore_buffers=False) -> int:
+        """Get the number of triples in the store."""
+        return self.count((None, None, None), ignore_buffers=ignore_buffers)
+
+    def bind(self, prefix, namespace, override=True):
+        """Bind a namespace to a prefix."""
+        return super().bind(prefix, namespace, override=override)
+
+    def namespace(self, prefix):
+        """Get the namespace to which a prefix is bound."""
+        return super().namespace(prefix)
+
+    def prefix(self, namespace):
+        """Get a bound namespace's prefix."""
+        return super().prefix(namespace)
+
+    def namespaces(self):
+        """Get the bound namespaces."""
+        return super().namespaces()
 
-    def update(self, query, init_ns, init_bindings, query_graph, **kwargs):
-        """Perform a SPARQL update query on the store."""
-        if (
-            sum(
-                len(x)
-                for x in (
-                    buffer[y]
-                    for buffer in (self._buffer_uncaught, self._buffer_caught)
-                    for y in (BufferType.ADDED, BufferType.DELETED)
+    def query(
+        self, query, init_ns, init_bindings, query_graph, **kwargs
+    ) -> Result:
+        """Perform a SPARQL query on the store.
+
+        When there are uncommitted changes, the query is still delegated to
+        the interface if it cannot read any of the changed triples.
+        Otherwise, RDFLib evaluates it on the triples of the interface plus
+        the uncommitted changes.
+        """
+        self._flush_changes()
+        return self._query(query, init_ns, init_bindings, **kwargs)
+
+    @synchronized
+    def _query(self, query, init_ns, init_bindings, **kwargs) -> Result:
+        """Perform a SPARQL query on the store, without flushing changes.
+
+        See the docstring of `query`.
+        """
+        query_string = query
+        deltas = self._deltas()
+        if any(len(delta) > 0 for delta in deltas):
+            if not isinstance(query, Query):
+                query = prepareQuery(query, initNs=init_ns)
+            predicates = self._query_predicates(query)
+            if predicates is None or predicates & set().union(
+                *(delta.predicates() for delta in deltas)
+            ):
+                return Graph(store=self).query(
+                    query,
+                    initNs=init_ns,
+                    initBindings=init_bindings,
+                    use_store_provided=False,
+                    **kwargs,
                 )
-            )
-            > 0
-        ):
-            # TODO: raise warning that committing can increase query
-            #  performance.
-            raise NotImplementedError
-        elif hasattr(self.interface, "triples"):
-            if hasattr(self.interface, "update"):
-                return self.interface.update(query)
+
+        if hasattr(self.interface, "triples"):
+            if hasattr(self.interface, "query"):
+                # TODO: translate init_ns and init_bindings.
+                return self.interface.query(query_string)
             else:
                 raise NotImplementedError
         else:
-            return self.interface.base.update(
+            return self.interface.base.query(
                 query, initNs=init_ns, initBindings=init_bindings, **kwargs
             )
 
-    def commit(self) -> None:
-        """Commit buffered changes."""
-        # Gets the old and new graphs and let the interface access a
-        # read-only version of them.
-        self.interface.old_graph = Graph(
-            store=InterfaceDriver.UnbufferedInterfaceDriver(driver=self)
-        )
-        self.interface.new_graph = ReadOnlyGraphAggregate([Graph(store=self)])
+    def update(self, query, init_ns, init_bindings, query_graph, **kwargs):
+        """Perform a SPARQL update query on the store.
 
-        # Lets the interface access the buffer of caught triples.
-        self.interface.buffer = self._buffer_caught
+        When there are uncommitted changes, RDFLib evaluates the update on
+        the triples of the interface plus the uncommitted changes, and
+        buffers the resulting changes.
+        """
+        self._flush_changes()
+        with self._changes_lock, self._lock:
+            if any(len(delta) > 0 for delta in self._deltas()):
+                return Graph(store=self).update(
+                    query,
+                    initNs=init_ns,
+                    initBindings=init_bindings,
+                    use_store_provided=False,
+                    **kwargs,
+                )
+            elif hasattr(self.interface, "triples"):
+                if hasattr(self.interface, "update"):
+                    return self.interface.update(query)
+                else:
+                    raise NotImplementedError
+            else:
+                return self.interface.base.update(
+                    query,
+                    initNs=init_ns,
+                    initBindings=init_bindings,
+                    **kwargs,
+                )
 
-        # Creates the base, old and new sessions for the interface.
-        self.interface.session_base = Session(
-            base=self.interface.base, ontology=self._ontology
-        )
-        self.interface.session_old = Session(
-            base=self.interface.old_graph, ontology=self._ontology
-        )
-        self.interface.session_new = Session(
-            base=self.interface.new_graph, ontology=self._ontology
-        )
+    @staticmethod
+    def _query_predicates(query: Query) -> Optional[Set[Node]]:
+        """Find the predicates of the triples that a SPARQL query reads.
 
-        # Computes updated, added and deleted entities if enabled.
-        if self.interface.entity_tracking:
-            (
-                added_entities,
-                updated_entities,
-                deleted_entities,
-            ) = self._compute_entity_modifications()
-            self.interface.added = added_entities
-            self.interface.updated = updated_entities
-            self.interface.deleted = deleted_entities
-
-        # Calls commit on the interface.
-        session = self.interface.session_new
-        self.interface.session = session
-        try:
-            session.lock()
-            with session:
-                self.interface.commit()
-        finally:
-            session.unlock()
-            self.interface.session_new = None
-            self.interface.session = None
+        Args:
+            query: The prepared query.
 
-        # Copies the uncaught triples from the buffers to the base graph.
-        for triple in self._buffer_uncaught[BufferType.DELETED]:
-            self.interface.base.remove(triple)
-        self.interface.base.addN(
-            (s, p, o, self.interface.base)
-            for s, p, o in self._buffer_uncaught[BufferType.ADDED]
-        )
-        self.interface.base.commit()
-
-        # Queue file upload and removal for file objects.
-        for s in chain(
-            self._buffer_uncaught[BufferType.DELETED][
-                : RDF.type : simphony_namespace.File
-            ],
-            self._buffer_caught[BufferType.DELETED][
-                : RDF.type : simphony_namespace.File
-            ],
-        ):
-            self.queue(s, None)
-        for URI, file in self._queue.items():
-            if file is None:
-                if hasattr(self.interface, "delete"):
-                    self.interface.delete(URI)
-                else:
-                    logging.warning(
-                        f"Ignoring deletion of file {URI}, as the session "
-                        f"does not support deleting files."
-                    )
-            else:
-                if hasattr(self.interface, "save"):
-                    self.interface.save(URI, file)
-                else:
-                    logging.warning(
-                        f"File {URI}, will NOT be committed to the session, "
-                        f"as it does not support the storage of new files."
+        Returns:
+            The predicates, or `None` when the query may read triples with
+            any predicate (e.g. a variable predicate or a property path).
+        """
+        predicates = set()
+        pending = [query.algebra]
+        while pending:
+            item = pending.pop()
+            if isinstance(item, CompValue):
+                if item.name in {
+                    "DescribeQuery",
+                    "Graph",
+                    "ServiceGraphPattern",
+                }:
+                    return None
+                terms = tuple(
+                    chain.from_iterable(
+                        item["triples"] if "triples" in item else ()
                     )
-                file.close()
+                )
+                for predicate in terms[1::3]:
+                    if not isinstance(predicate, URIRef):
+                        return None
+                    predicates.add(predicate)
+                pending.extend(item.values())
+            elif isinstance(item, (list, tuple)):
+                pending.extend(item)
+        return predicates
+
+    def commit(self, chunk_size: Optional[int] = None) -> None:
+        """Commit buffered changes.
+
+        The commit runs as a pipeline of stages: snapshot the uncommitted
+        changes for the interface, compute the modified entities, let the
+        interface commit, apply the changes to the base graph in bulk,
+        commit the queued files and reflect the changes on the cache. The
+        time spent on each stage is available from `commit_stats`.
+
+        The commit runs on the background worker after the asynchronous
+        commits and computations requested before it (see `commit_async`
+        and `compute_async`). If one of the asynchronous commits failed,
+        its exception is raised instead, and its changes remain pending,
+        so that committing again retries them.
+
+        The queued files are committed after the triples. If any of them
+        cannot be saved or deleted, the file operations that succeeded are
+        rolled back when the interface supports renaming and deleting
+        files, and a `FileCommitError` reporting all the failures is
+        raised. The triples remain committed, while the queued files
+        remain pending, so that committing again retries them.
 
-        # Reflect changes from buffers in the cache.
-        if self.interface.cache:
-            # - remove deleted triples
-            for triple in chain(
-                self._buffer_uncaught[BufferType.DELETED],
-                self._buffer_caught[BufferType.DELETED],
-            ):
-                self._cache.remove(triple)
-            # - add the added triples
-            timestamp = datetime.now()
-            cacheable_triples = dict()
-            for triple in chain(
-                self._buffer_uncaught[BufferType.ADDED],
-                self._buffer_caught[BufferType.ADDED],
-            ):
-                compatible_cached_patterns = self._compatible_patterns(
-                    triple
-                ) & set(self._cached_patterns)
-                for pattern in compatible_cached_patterns:
-                    cacheable_triples[pattern] = cacheable_triples.get(
-                        pattern, set()
-                    ) | {triple}
-            for pattern, triples in cacheable_triples.items():
-                try:
-                    self._fill(
-                        pattern, triples, older_than=timestamp, replace=False
-                    )
-                except CacheSizeException:
-                    self._cache.remove(pattern)
-                    try:
-                        del self._cached_patterns[pattern]
-                    except KeyError:
-                        pass
+        Args:
+            chunk_size: When provided, the changes are committed in chunks
+                of approximately this number of triples, each of them
+                running the whole pipeline, so that large transactions
+                do not need memory proportional to their size on each
+                stage. The changes of each subject are kept on the same
+                chunk. The queued files are committed with the last
+                chunk. If a chunk fails, the previous chunks remain
+                committed, and the rest of the changes remain pending.
+                Interfaces not supporting partial commits (see
+                `Interface.partial_commits`) receive all the changes at
+                once.
+        """
+        if self._lock._is_owned():
+            # The worker cannot run while the caller holds the lock (e.g.
+            # the commit of a computation). Commit on the caller's thread.
+            with self._changes_lock, self._lock:
+                while self._pending and not self._pending[0][3].done():
+                    self._commit_next()
+                self._commit_restore()
+                self._commit_raise()
+
+                self._flush_changes()
+                self._commit(self._delta, self._queue, chunk_size)
+
+                # Reset buffers and file queue.
+                self._delta = DeltaOverlay()
+                self._queue = dict()
+            return
+
+        with self._changes_lock:
+            self._commit_restore()
+            self._commit_raise()
+            future = self._commit_freeze(chunk_size)
+        self._submit(self._commit_next)
+        try:
+            future.result()
+        except BaseException:
+            # Make the changes pending again, the exception is raised here.
+            self._commit_restore()
+            self._commit_error = None
+            raise
+
+    def commit_async(self, chunk_size: Optional[int] = None) -> Future:
+        """Commit buffered changes on a background thread.
+
+        The changes are frozen and new empty buffers are started right
+        away, so that the caller can keep working while they are committed.
+        The frozen changes remain visible until they are committed.
+        Operations that need the interface wait until the commit finishes.
+        Commits are serialized, and run in the order they were requested.
 
-        # Reset buffers and file queue.
-        self._buffer_uncaught = {
-            buffer_type: Graph(SimpleMemory()) for buffer_type in BufferType
-        }
-        self._buffer_caught = {
-            buffer_type: Graph(SimpleMemory()) for buffer_type in BufferType
-        }
-        self._queue = dict()
+        Args:
+            chunk_size: See the docstring of `commit`.
 
-        # Reset graphs, sessions and entities passed to the interface.
-        self.interface.old_graph = None
-        self.interface.new_graph = None
-        self.interface.buffer = None
-        self.interface.session_base = None
-        self.interface.session_old = None
-        self.interface.session_new = None
-        self.interface.added = None
-        self.interface.updated = None
-        self.interface.deleted = None
+        Returns:
+            A future that resolves when the changes are committed. When the
+            commit fails, the future raises the exception. Then the
+            changes that could not be committed, and those of the
+            asynchronous commits requested after it (whose futures fail
+            too), become pending again, under the changes made since then.
+        """
+        with self._changes_lock:
+            self._commit_restore()
+            future = self._commit_freeze(chunk_size)
+        self._submit(self._commit_next)
+        return future
 
     def rollback(self) -> None:
         """Discard uncommitted changes."""
-        self._buffer_uncaught = {
-            buffer_type: Graph(SimpleMemory()) for buffer_type in BufferType
-        }
-        self._buffer_caught = {
-            buffer_type: Graph(SimpleMemory()) for buffer_type in BufferType
-        }
-        for file in self._queue.values():
-            if file is not None:
-                file.close()
-        self._queue = dict()
+        with self._changes_lock:
+            self._commit_restore()
+            self._commit_error = None
+            self._changes = []
+            self._delta = DeltaOverlay()
+            for file in self._queue.values():
+                if file is not None:
+                    file.close()
+            self._queue = dict()
 
     # RDFLib
     # ↑ -- ↑
@@ -843,12 +2370,64 @@ class InterfaceDriver(Store):
             )
 
         self.commit()
+        with self._lock:
+            self._compute(ComputeJob(), kwargs)
 
-        self.interface.session_base = Session(
-            base=self.interface.base, ontology=self._ontology
-        )
+    def compute_async(
+        self,
+        **kwargs: Union[
+            str,
+            int,
+            float,
+            bool,
+            None,
+            Iterable[Union[str, int, float, bool, None]],
+        ],
+    ) -> ComputeJob:
+        """Compute new information on a background thread.
+
+        The uncommitted changes are committed asynchronously (see
+        `commit_async`), and then the computation runs on the same
+        background worker, so that commits and computations happen in the
+        order they were requested. The results are committed to the base
+        graph when the computation finishes. Meanwhile, operations on the
+        session that need the interface wait, but the caller can do other
+        work, such as driving other sessions.
+
+        Returns:
+            A handle on the computation, offering its status, the progress
+            reported by the interface, cancellation and a way to wait for
+            it to finish.
+        """
+        if not hasattr(self.interface, "compute"):
+            raise AttributeError(
+                f"'{self.interface}' object has no attribute 'compute'"
+            )
+
+        job = ComputeJob()
+        commit = self.commit_async()
+
+        def compute() -> None:
+            commit.result()
+            with self._lock:
+                self._compute(job, kwargs)
+
+        self._jobs = [job for job in self._jobs if not job.done()] + [job]
+        self._submit(job._run, compute)
+        return job
+
+    def _compute(self, job: ComputeJob, kwargs: dict) -> None:
+        """Let the interface compute on a locked base session.
+
+        Args:
+            job: Handle on the computation, offered to the interface.
+            kwargs: Keyword arguments for the `compute` method of the
+                interface.
+        """
+        self._session_views.assign(base=self.interface.base)
         session = self.interface.session_base
         self.interface.session = session
+        self.interface.job = job
         try:
             session.lock()
             with session:
@@ -856,8 +2435,9 @@ class InterfaceDriver(Store):
                 session.commit()
         finally:
             session.unlock()
-            self.interface.session_base = None
+            self._session_views.assign(base=None)
             self.interface.session = None
+            self.interface.job = None
 
     def queue(self, key: URIRef, file: Optional[BinaryIO]) -> None:
         """Queue a file to be committed."""
@@ -868,127 +2448,799 @@ class InterfaceDriver(Store):
                 "operation."
             )
 
-        # Clear cached bytestream
+        with self._changes_lock:
+            self._commit_restore()
+            self._file_cache_discard(key)
+            self._queue[key] = file
+
+    def load(self, key: URIRef, memory_map: bool = False) -> BinaryIO:
+        """Retrieve a file.
+
+        Args:
+            key: Identifier of the file individual.
+            memory_map: Return a read-only memory-mapped handle when the
+                file is stored locally, so that reading it does not copy
+                the contents to memory.
+        """
+        if key not in self._queue:
+            # The files queued by the commits in progress belong to the
+            # commit worker. Wait until they are committed.
+            self._commit_wait(key)
+
+        with self._changes_lock:
+            byte_stream = self._load_queued(key)
+        if byte_stream is None:
+            if not hasattr(self.interface, "load"):
+                raise FileNotFoundError(
+                    "This session does not support file storage. Unable to "
+                    "retrieve the file contents."
+                )
+            byte_stream = self.interface.load(key)
+
+        if memory_map:
+            byte_stream = map_file(byte_stream)
+        return byte_stream
+
+    def _load_queued(self, key: URIRef) -> Optional[BinaryIO]:
+        """Retrieve a file from the queue.
+
+        Returns:
+            A file handle pointing to a temporary copy of the queued file,
+            or None when the file is not queued.
+        """
+        if key not in self._queue:
+            return None
+        file_name = b64encode(bytes(key, encoding="UTF-8")).decode("UTF-8")
+
+        # Save a temporary copy of the file (a link to it if it is a local
+        # file) and put a file handle pointing to the copy on the queue.
+        path = Path(self._file_cache.name) / file_name
+        if not path.exists():
+            queued = self._queue[key]
+            copy_file(queued, path, link=True)
+            queued.close()
+            self._queue[key] = open(path, "rb")
+
+        # Return a file handle pointing to the copy
+        return open(path, "rb")
+
+    @synchronized
+    def cache_clear(self):
+        """Clear the interface's cache."""
+        self._cache.remove((None, None, None))
+        self._cached_patterns.clear()
+        self._cache_policy.clear()
+        self._cache_length = 0
+        self._cache_bytes = 0
+        if self._cache_disk is not None:
+            self._cache_disk.clear()
+
+    @synchronized
+    def cache_stats(self) -> Dict[str, Union[int, float]]:
+        """Statistics about the cache since the data source was opened.
+
+        Returns:
+            A dictionary with the following keys:
+            - `hits`: requests answered from the cache.
+            - `empty_hits`: hits on patterns known to match no triples.
+            - `disk_hits`: requests answered from the disk cache.
+            - `misses`: requests sent to the interface.
+            - `partial_hits`: misses for which part of the requested
+              triples were already cached.
+            - `evictions`: patterns evicted to make room for others.
+            - `expirations`: patterns evicted because they expired.
+            - `prefetched_triples`: triples cached by the prefetcher.
+            - `prefetch_time`: time spent prefetching (in seconds).
+            - `triples`: triples currently held by the cache.
+            - `bytes`: approximate size of the cached triples in bytes.
+            - `patterns`: patterns currently held by the cache.
+            - `disk_triples`: triples currently held by the disk cache.
+        """
+        return {
+            **self._cache_stats,
+            "triples": self._cache_length,
+            "bytes": self._cache_bytes,
+            "patterns": len(self._cached_patterns),
+            "disk_triples": len(self._cache_disk or ()),
+        }
+
+    @synchronized
+    def commit_stats(self) -> Dict[str, Union[int, float]]:
+        """Statistics about the last commit.
+
+        Returns:
+            A dictionary with the following keys:
+            - `added`: triples added.
+            - `deleted`: triples deleted.
+            - `removals`: removal operations applied to the base graph.
+            - `chunks`: chunks in which the changes were committed.
+            - `snapshot`, `entities`, `interface`, `apply`, `files` and
+              `cache`: time spent on each stage of the commit (in seconds,
+              see the docstring of `commit`).
+            - `total`: time spent on the whole commit (in seconds).
+        """
+        return dict(self._commit_stats)
+
+    def _buffer_addition(self, triple: Triple, caught: bool) -> None:
+        """Buffer the addition of a triple.
+
+        Args:
+            triple: The added triple.
+            caught: Whether the interface caught the addition.
+        """
+        buffer = self._delta.caught if caught else self._delta.uncaught
+        buffer[BufferType.DELETED].remove(triple)
+        buffer[BufferType.ADDED].add(triple)
+        if self.interface.entity_tracking:
+            self._delta.track(triple[0])
+
+    def _buffer_removal(
+        self, triple_pattern: Pattern, removed: Set[Triple]
+    ) -> None:
+        """Buffer the removal of a triple pattern.
+
+        Args:
+            triple_pattern: The removed pattern.
+            removed: The triples that the interface lets remove from the
+                base graph (see `Interface.remove`).
+        """
+        for buffer in (self._delta.uncaught, self._delta.caught):
+            buffer[BufferType.ADDED].remove(triple_pattern)
+            existing_triples = (
+                set(
+                    self._apply_pending(
+                        self.interface.base.triples(triple_pattern),
+                        triple_pattern,
+                    )
+                )
+                if buffer is self._delta.uncaught
+                else removed
+            )
+            for triple in existing_triples:
+                buffer[BufferType.DELETED].add(triple)
+            if existing_triples and buffer is self._delta.uncaught:
+                # The pattern removes the triples from the base graph on
+                # commit (any of them added again is added after removing).
+                self._delta.removed.add(triple_pattern)
+            if self.interface.entity_tracking:
+                self._track_removal(
+                    triple_pattern,
+                    existing_triples,
+                    buffer is self._delta.uncaught
+                    and not hasattr(self.interface, "triples"),
+                )
+
+    def _batch_change(
+        self, addition: bool, item: Union[Triple, Pattern]
+    ) -> None:
+        """Batch the addition of a triple or the removal of a pattern.
+
+        The batch is flushed when it reaches the `batch_size` of the
+        interface.
+        """
+        with self._changes_lock:
+            self._changes.append((addition, item))
+            if len(self._changes) >= self.interface.batch_size:
+                self._flush_changes()
+
+    def _flush_changes(self) -> None:
+        """Buffer the batched additions and removals.
+
+        Whether the interface catches them is decided with a single call to
+        `add_many` for each run of consecutive additions, and to
+        `remove_many` for each run of consecutive removals. The batch is
+        flushed before reading the uncommitted changes or committing them,
+        and before any change that is not batched, so that changes are
+        buffered in the order they were made. Reads ignoring the changes
+        (e.g. those of the commit worker) leave the batch alone.
+        """
+        if not self._changes:
+            return
+        with self._changes_lock, self._lock:
+            changes, self._changes = self._changes, []
+            for addition, group in groupby(changes, key=lambda x: x[0]):
+                items = [item for _, item in group]
+                if addition:
+                    for triple, added in zip(
+                        items, self.interface.add_many(items)
+                    ):
+                        self._buffer_addition(triple, not added)
+                else:
+                    removed = self.interface.remove_many(items)
+                    for pattern in items:
+                        self._buffer_removal(
+                            pattern, set(removed.get(pattern, ()))
+                        )
+
+    def _deltas(self) -> List[DeltaOverlay]:
+        """Changes being committed asynchronously and uncommitted changes.
+
+        The oldest changes come first.
+        """
+        return [delta for delta, _, _, _ in self._pending] + [self._delta]
+
+    def _apply_pending(
+        self, triples: Iterable[Triple], triple_pattern: Pattern
+    ) -> Iterable[Triple]:
+        """Apply the changes being committed asynchronously to triples.
+
+        Args:
+            triples: Triples matching the pattern on the interface.
+            triple_pattern: The pattern that the triples match.
+        """
+        for delta, _, _, _ in tuple(self._pending):
+            triples = delta.apply(triples, triple_pattern)
+        return triples
+
+    def _file_cache_discard(self, key: URIRef) -> None:
+        """Remove the cached bytestream of a file."""
         file_name = b64encode(bytes(key, encoding="UTF-8")).decode("UTF-8")
         file_path = Path(self._file_cache.name) / file_name
         if file_path.exists():
             file_path.unlink()
 
-        self._queue[key] = file
+    def _submit(self, function: Callable, *args) -> None:
+        """Run a function on the background worker."""
+        if self._executor is None:
+            with self._lock:
+                if self._executor is None:
+                    self._executor = ThreadPoolExecutor(max_workers=1)
+        self._executor.submit(function, *args)
+
+    def _commit_next(self) -> None:
+        """Commit the oldest changes frozen by `commit_async`.
+
+        If the commit fails or was cancelled, the futures of all the frozen
+        changes fail. The changes remain frozen until the caller's thread
+        makes them pending again (see `_commit_restore`), so that the
+        worker never modifies the uncommitted changes.
+        """
+        with self._lock:
+            if not self._pending:
+                return
+            delta, queue, chunk_size, future = self._pending[0]
+            if future.done() and not future.cancelled():
+                # Failed, waiting to be restored.
+                return
+            if future.set_running_or_notify_cancel():
+                try:
+                    self._commit(delta, queue, chunk_size)
+                except Exception as exception:
+                    future.set_exception(exception)
+                else:
+                    self._pending.popleft()
+                    future.set_result(None)
+                    return
+            self._commit_fail()
+
+    def _commit_fail(self) -> None:
+        """Fail the futures of the changes frozen by `commit_async`."""
+        exception = RuntimeError(
+            "The changes of a previous asynchronous commit could not be "
+            "committed."
+        )
+        for _, _, _, future in self._pending:
+            if not future.done():
+                future.set_running_or_notify_cancel()
+                future.set_exception(exception)
+
+    def _commit_restore(self) -> None:
+        """Make the changes of failed asynchronous commits pending again.
+
+        The failed changes are put under the changes made since then. Must
+        be called from the caller's thread, which owns the uncommitted
+        changes. The background worker never modifies them.
+        """
+        if not self._pending or not self._pending[0][3].done():
+            return
+        with self._changes_lock, self._lock:
+            if not self._pending or not self._pending[0][3].done():
+                return
+            head = self._pending[0][3]
+            if not head.cancelled() and self._commit_error is None:
+                self._commit_error = head.exception()
+            self._commit_fail()
+            while self._pending:
+                delta, queue, _, _ = self._pending.pop()
+                self._delta.merge(delta)
+                for key, file in queue.items():
+                    self._queue.setdefault(key, file)
+
+    def _commit_raise(self) -> None:
+        """Raise the exception of the last failed asynchronous commit."""
+        error, self._commit_error = self._commit_error, None
+        if error is not None:
+            raise error
+
+    def _commit_freeze(self, chunk_size: Optional[int]) -> Future:
+        """Freeze the uncommitted changes for the background worker.
+
+        Args:
+            chunk_size: See the docstring of `commit`.
+
+        Returns:
+            The future of the commit, to be resolved by `_commit_next`.
+        """
+        future = Future()
+        self._flush_changes()
+        self._pending.append((self._delta, self._queue, chunk_size, future))
+        self._delta, self._queue = DeltaOverlay(), dict()
+        return future
+
+    def _commit_wait(self, key: URIRef) -> None:
+        """Wait for the asynchronous commits that queued a file.
+
+        Args:
+            key: Identifier of the file individual.
+        """
+        pending = tuple(self._pending)
+        last = max(
+            (i for i, (_, queue, _, _) in enumerate(pending) if key in queue),
+            default=None,
+        )
+        if last is None:
+            return
+        for _, _, _, future in pending[: last + 1]:
+            with suppress(Exception):
+                future.result()
+        self._commit_restore()
+
+    def _commit(
+        self,
+        delta: DeltaOverlay,
+        queue: Dict[URIRef, Optional[BinaryIO]],
+        chunk_size: Optional[int] = None,
+    ) -> None:
+        """Run the commit pipeline on the given changes.
+
+        See the docstring of `commit`. If the commit fails, the changes that
+        were not committed remain on the given overlay and queue.
+        """
+        # Stop prefetching, the base graph is about to change.
+        self._prefetch_cancel()
+
+        if chunk_size is not None and not self.interface.partial_commits:
+            logger.warning(
+                f"The interface {self.interface} does not support partial "
+                f"commits. All the changes will be committed at once."
+            )
+            chunk_size = None
+
+        stages = ("snapshot", "entities", "interface", "apply", "files")
+        stats = {
+            "added": len(delta.caught[BufferType.ADDED])
+            + len(delta.uncaught[BufferType.ADDED]),
+            "deleted": len(delta.caught[BufferType.DELETED])
+            + len(delta.uncaught[BufferType.DELETED]),
+            "removals": 0,
+            "chunks": 0,
+            **{stage: 0.0 for stage in stages + ("cache",)},
+        }
+        self._commit_stats = stats
+        total = time.perf_counter()
+
+        chunks = (
+            [delta]
+            if chunk_size is None
+            else list(delta.split(chunk_size)) or [DeltaOverlay()]
+        )
+        for i, chunk in enumerate(chunks):
+            try:
+                self._commit_chunk(chunk, queue, final=i == len(chunks) - 1)
+            except Exception:
+                # Keep the changes that have not been committed.
+                if chunk is not delta:
+                    for remaining in chunks[i:]:
+                        delta.merge(remaining)
+                raise
+            chunks[i] = None
+            stats["chunks"] += 1
+
+        stats["total"] = time.perf_counter() - total
+
+    def _commit_chunk(
+        self,
+        delta: DeltaOverlay,
+        queue: Dict[URIRef, Optional[BinaryIO]],
+        final: bool = True,
+    ) -> None:
+        """Run the commit pipeline on a chunk of the changes.
+
+        Args:
+            delta: The changes to commit.
+            queue: The files to commit.
+            final: Whether these are the last changes of the transaction,
+                which also commits the queued files.
+        """
+        stats = self._commit_stats
+
+        # The files that are already stored are looked up before the
+        # changes are applied (see `_commit_files`).
+        start = time.perf_counter()
+        stored = (
+            self._stored_files(
+                key for key, file in queue.items() if file is not None
+            )
+            if final
+            and hasattr(self.interface, "delete")
+            and hasattr(self.interface, "rename")
+            else set()
+        )
+        stats["files"] += time.perf_counter() - start
+
+        try:
+            for stage, method in (
+                ("snapshot", partial(self._commit_snapshot, delta)),
+                ("entities", partial(self._commit_entities, delta)),
+                ("interface", self._commit_interface),
+                ("apply", partial(self._commit_apply, delta)),
+                (
+                    "files",
+                    partial(self._commit_files, delta, queue, final, stored),
+                ),
+                ("cache", partial(self._commit_cache, delta)),
+            ):
+                start = time.perf_counter()
+                method()
+                stats[stage] += time.perf_counter() - start
+        except FileCommitError:
+            # The triples are committed, only the files remain pending.
+            self._commit_cache(delta)
+            delta.__init__()
+            raise
+
+        # Reset graphs, sessions and entities passed to the interface.
+        self.interface.old_graph = None
+        self.interface.new_graph = None
+        self.interface.buffer = None
+        self._session_views.clear()
+        self.interface.added = None
+        self.interface.updated = None
+        self.interface.deleted = None
+
+    def _commit_snapshot(self, delta: DeltaOverlay) -> None:
+        """Let the interface access the uncommitted changes.
+
+        Offers read-only views of the graph before and after the changes,
+        the buffer of caught triples and sessions based on them.
+        """
+        self.interface.old_graph = Graph(
+            store=InterfaceDriver.UnbufferedInterfaceDriver(driver=self)
+        )
+        self.interface.new_graph = ReadOnlyGraphAggregate(
+            [
+                Graph(
+                    store=InterfaceDriver.UnbufferedInterfaceDriver(
+                        driver=self, delta=delta
+                    )
+                )
+            ]
+        )
+        self.interface.buffer = {
+            buffer_type: delta.caught[buffer_type].graph()
+            for buffer_type in BufferType
+        }
+        self._session_views.assign(
+            base=self.interface.base,
+            old=self.interface.old_graph,
+            new=self.interface.new_graph,
+        )
+
+    def _commit_entities(self, delta: DeltaOverlay) -> None:
+        """Compute the added, updated and deleted entities if enabled."""
+        if self.interface.entity_tracking:
+            (
+                self.interface.added,
+                self.interface.updated,
+                self.interface.deleted,
+            ) = self._compute_entity_modifications(delta)
+
+    def _commit_interface(self) -> None:
+        """Call commit on the interface."""
+        session = self.interface.session_new
+        self.interface.session = session
+        try:
+            session.lock()
+            with session:
+                self.interface.commit()
+        finally:
+            session.unlock()
+            self._session_views.assign(new=None)
+            self.interface.session = None
+
+    def _commit_apply(self, delta: DeltaOverlay) -> None:
+        """Apply the uncaught changes to the base graph.
 
-    def load(self, key: URIRef) -> BinaryIO:
-        """Retrieve a file."""
-        if key in self._queue:
-            file_name = b64encode(bytes(key, encoding="UTF-8")).decode("UTF-8")
+        The deleted triples are removed using the patterns that were
+        removed (see `DeltaOverlay.removals`), so that stores supporting it
+        remove each group of triples with a single operation (e.g. one
+        `DELETE` statement on a database). Triples added again after
+        their removal are added back afterwards.
+        """
+        base = self.interface.base
+        removals = delta.removals()
+        for pattern in removals:
+            base.remove(pattern)
+        base.addN(
+            (s, p, o, base) for s, p, o in delta.uncaught[BufferType.ADDED]
+        )
+        base.commit()
+        self._commit_stats["removals"] += len(removals)
 
-            # Save a temporary copy of the file and put a file handle
-            # pointing to the copy on the queue
-            if not (Path(self._file_cache.name) / file_name).exists():
-                queued = self._queue[key]
-                with open(
-                    Path(self._file_cache.name) / file_name, "wb"
-                ) as file:
-                    file.write(queued.read())
+    def _commit_files(
+        self,
+        delta: DeltaOverlay,
+        queue: Dict[URIRef, Optional[BinaryIO]],
+        save: bool = True,
+        stored: Optional[Set[URIRef]] = None,
+    ) -> None:
+        """Upload and remove the queued files.
 
-                file = open(Path(self._file_cache.name) / file_name, "rb")
-                self._queue[key] = file
+        When the interface supports renaming and deleting files, the stored
+        files that are about to be overwritten or deleted are moved aside
+        first, so that they can be restored if committing any of the files
+        fails (and deleted otherwise). If committing the files fails, the
+        handles of the queued files are left open and rewound, so that
+        they can be committed again.
 
-            # Return a file handle pointing to the copy
-            byte_stream = open(Path(self._file_cache.name) / file_name, "rb")
-        elif hasattr(self.interface, "load"):
-            byte_stream = self.interface.load(key)
-        else:
-            raise FileNotFoundError(
-                "This session does not support file storage. Unable to "
-                "retrieve the file contents."
+        Args:
+            delta: The changes being committed.
+            queue: The files to commit.
+            save: Whether to commit the queued files. Otherwise, the removal
+                of the files of deleted file objects is just queued.
+            stored: Queued files that were already stored before the
+                changes (see `_stored_files`).
+        """
+        for s, _, _ in chain(
+            delta.uncaught[BufferType.DELETED].triples(
+                (None, RDF.type, simphony_namespace.File)
+            ),
+            delta.caught[BufferType.DELETED].triples(
+                (None, RDF.type, simphony_namespace.File)
+            ),
+        ):
+            self._file_cache_discard(s)
+            queue[s] = None
+        if not save:
+            return
+
+        can_save = hasattr(self.interface, "save")
+        can_delete = hasattr(self.interface, "delete")
+        can_rollback = can_delete and hasattr(self.interface, "rename")
+        keys = []
+        for URI, file in queue.items():
+            if file is None and not can_delete:
+                logging.warning(
+                    f"Ignoring deletion of file {URI}, as the session "
+                    f"does not support deleting files."
+                )
+            elif file is not None and not can_save:
+                logging.warning(
+                    f"File {URI}, will NOT be committed to the session, "
+                    f"as it does not support the storage of new files."
+                )
+                file.close()
+            else:
+                keys.append(URI)
+
+        def backup(key: URIRef) -> URIRef:
+            return URIRef(f"{key}.commit-backup")
+
+        stashed = set()
+        if can_rollback:
+            existing = [
+                key
+                for key in keys
+                if queue[key] is None or key in (stored or ())
+            ]
+            failed = self._file_map(
+                lambda key: self.interface.rename(key, backup(key)), existing
             )
+            stashed = set(existing).difference(failed)
 
-        return byte_stream
-
-    def cache_clear(self):
-        """Clear the interface's cache."""
-        self._cache.remove((None, None, None))
-        self._cached_patterns.clear()
+        positions = dict()
+        for key in keys:
+            with suppress(AttributeError, OSError, ValueError):
+                if queue[key] is not None and queue[key].seekable():
+                    positions[key] = queue[key].tell()
 
-    def _compute_entity_modifications(
-        self,
-    ) -> Tuple[Set[OntologyEntity], Set[OntologyEntity], Set[OntologyEntity]]:
+        def commit(key: URIRef) -> None:
+            file = queue[key]
+            if file is None:
+                if key not in stashed:
+                    self.interface.delete(key)
+                return
+            self.interface.save(key, file)
+
+        errors = self._file_map(commit, keys)
+        if errors:
+            if can_rollback:
+                saved = [
+                    key
+                    for key in keys
+                    if queue[key] is not None and key not in errors
+                ]
+                for key, error in chain(
+                    self._file_map(self.interface.delete, saved).items(),
+                    self._file_map(
+                        lambda key: self.interface.rename(backup(key), key),
+                        stashed,
+                    ).items(),
+                ):
+                    logger.warning(f"Could not roll back file {key}: {error}")
+            for key, position in positions.items():
+                with suppress(OSError, ValueError):
+                    queue[key].seek(position)
+            raise FileCommitError(errors)
+
+        for key in keys:
+            if queue[key] is not None:
+                queue[key].close()
+        for key, error in self._file_map(
+            lambda key: self.interface.delete(backup(key)), stashed
+        ).items():
+            logger.warning(f"Could not remove backup of file {key}: {error}")
+
+    def _stored_files(self, keys: Iterable[URIRef]) -> Set[URIRef]:
+        """Find which of the given files were stored by previous commits.
+
+        A file is considered stored when its file object exists on the
+        interface. The file objects are looked up ignoring the changes,
+        with a single batch of probes (see `triples_many`).
+        """
+        patterns = [(key, RDF.type, simphony_namespace.File) for key in keys]
+        if not patterns:
+            return set()
+        return {
+            s
+            for (s, _, _), triples in self.triples_many(
+                patterns, ignore_buffers=True
+            ).items()
+            if triples
+        }
 
-        # Find out from the triples which entities were added, updated and
-        # deleted.
-        class Tracker:
-            """Checks whether entities already exist on the interface.
+    def _file_map(
+        self, function: Callable[[URIRef], None], keys: Iterable[URIRef]
+    ) -> Dict[URIRef, Exception]:
+        """Apply a file operation to several files.
 
-            In addition, it keeps track of entities for which existence has
-            been already checked.
-            """
+        The operations run in parallel (see `Interface.thread_safe_files`)
+        when the interface declares that its file operations are
+        thread-safe, and one after another otherwise.
 
-            existing_subjects: set
+        Returns:
+            The exceptions raised for the files whose operation failed.
+        """
+        keys = list(keys)
 
-            @property
-            def visited_subjects(self) -> set:
-                return (
-                    self.visited_subjects_minus_existing_subjects
-                    | self.existing_subjects
+        def call(key: URIRef) -> Tuple[URIRef, Optional[Exception]]:
+            try:
+                function(key)
+            except Exception as exception:
+                return key, exception
+            return key, None
+
+        workers = min(self.interface.file_workers, len(keys))
+        if self.interface.thread_safe_files and workers > 1:
+            with ThreadPoolExecutor(max_workers=workers) as executor:
+                results = list(executor.map(call, keys))
+        else:
+            results = map(call, keys)
+        return {key: error for key, error in results if error is not None}
+
+    def _commit_cache(self, delta: DeltaOverlay) -> None:
+        """Reflect the changes from the buffers in the cache."""
+        if not self.interface.cache:
+            return
+        # - remove deleted triples
+        for triple in chain(
+            delta.uncaught[BufferType.DELETED],
+            delta.caught[BufferType.DELETED],
+        ):
+            self._cache_delete(triple)
+            if self._cache_disk is not None:
+                self._cache_disk.remove(triple)
+        self._cache_trim_empty()
+        # - add the added triples
+        timestamp = datetime.now()
+        cacheable_triples = dict()
+        for triple in chain(
+            delta.uncaught[BufferType.ADDED],
+            delta.caught[BufferType.ADDED],
+        ):
+            for pattern in self._cached_patterns.covering(triple):
+                cacheable_triples.setdefault(pattern, set()).add(triple)
+            if self._cache_disk is not None:
+                self._cache_disk.add(triple)
+        for pattern, triples in cacheable_triples.items():
+            try:
+                self._fill(
+                    pattern, triples, older_than=timestamp, replace=False
                 )
+            except CacheSizeException:
+                self._evict(pattern)
+                self._cache_stats["evictions"] += 1
 
-            _interface = self.interface
-
-            def __init__(self):
-                self.existing_subjects = set()
-                self.visited_subjects_minus_existing_subjects = set()
+    def _compute_entity_modifications(
+        self, delta: DeltaOverlay
+    ) -> Tuple[Set[OntologyEntity], Set[OntologyEntity], Set[OntologyEntity]]:
+        """Find out which entities were added, updated and deleted.
 
-            def __call__(self, subject: Node):
-                if subject not in self.visited_subjects:
-                    if (
-                        next(
-                            self._interface.old_graph.triples(
-                                (subject, None, None)
-                            ),
-                            None,
-                        )
-                        is not None
-                    ):
-                        self.existing_subjects.add(subject)
-                    else:
-                        self.visited_subjects_minus_existing_subjects.add(
-                            subject
-                        )
+        The subjects of the changed triples are tracked as the triples are
+        added and removed (see `_track_removal`). Only the existence of
+        the subjects that is still unknown is checked, with a single batch
+        of probes.
+        """
+        added_buffers = (
+            delta.uncaught[BufferType.ADDED],
+            delta.caught[BufferType.ADDED],
+        )
+        deleted_buffers = (
+            delta.uncaught[BufferType.DELETED],
+            delta.caught[BufferType.DELETED],
+        )
 
-        tracker = Tracker()
+        # Subjects whose triples were changed and then changed back are
+        # no longer on the buffers.
+        subjects = {
+            s
+            for s in delta.touched
+            if any(
+                buffer.has_subject(s)
+                for buffer in chain(added_buffers, deleted_buffers)
+            )
+        }
+        existing_subjects = {
+            s for s in subjects if delta.touched[s]
+        } | self._existing_subjects(
+            s for s in subjects if delta.touched[s] is None
+        )
 
         # Get added subjects.
-        for s in chain(
-            self._buffer_uncaught[BufferType.ADDED].subjects(),
-            self._buffer_caught[BufferType.ADDED].subjects(),
-        ):
-            tracker(s)
-        added_subjects = tracker.visited_subjects_minus_existing_subjects
+        added_subjects = {
+            s
+            for s in subjects.difference(existing_subjects)
+            if any(buffer.has_subject(s) for buffer in added_buffers)
+        }
         # Get deleted subjects.
-        deleted_subjects = dict()
-        for s in chain(
-            self._buffer_uncaught[BufferType.DELETED].subjects(),
-            self._buffer_caught[BufferType.DELETED].subjects(),
+        deleted_subjects = set()
+        deleted_triples = {
+            s: {
+                triple
+                for buffer in deleted_buffers
+                for triple in buffer.triples((s, None, None))
+            }
+            for s in existing_subjects
+        }
+        sizes = dict(delta.sizes)
+        unknown = [
+            s
+            for s, deleted in deleted_triples.items()
+            if deleted and s not in sizes
+        ]
+        if (
+            unknown
+            and hasattr(self.interface, "triples_many")
+            and not hasattr(self.interface, "count")
         ):
-            tracker(s)
-            if s not in added_subjects and s in tracker.existing_subjects:
-                deleted_subjects[s] = deleted_subjects.get(s, 0) + 1
-        deleted_subjects = {
-            s: True
-            if count
-            >= sum(
-                1 for _ in self.interface.old_graph.triples((s, None, None))
+            # Retrieve the triples of the subjects with a single call.
+            sizes.update(
+                (s, len(triples))
+                for (s, _, _), triples in self.triples_many(
+                    ((s, None, None) for s in unknown), ignore_buffers=True
+                ).items()
             )
-            else False
-            for s, count in deleted_subjects.items()
-        }
-        deleted_subjects = {
-            s for s, deleted in deleted_subjects.items() if deleted
-        }
+        for s, deleted in deleted_triples.items():
+            if not deleted:
+                continue
+            size = sizes.get(s)
+            if size is None:
+                size = self.count((s, None, None), ignore_buffers=True)
+            if len(deleted) >= size:
+                deleted_subjects.add(s)
         # Get updated subjects.
-        updated_subjects = tracker.existing_subjects.difference(
-            deleted_subjects
-        )
+        updated_subjects = existing_subjects.difference(deleted_subjects)
+
         added_entities = {
             self.interface.session_new.from_identifier(s)
             for s in added_subjects
@@ -1003,15 +3255,105 @@ class InterfaceDriver(Store):
         }
         return added_entities, updated_entities, deleted_entities
 
+    def _track_removal(
+        self,
+        triple_pattern: Pattern,
+        existing_triples: Set[Triple],
+        complete: bool,
+    ) -> None:
+        """Track the subjects of the triples being removed.
+
+        Args:
+            triple_pattern: The removed pattern.
+            existing_triples: The triples matching the pattern that are
+                being removed.
+            complete: Whether the existing triples are all the triples
+                matching the pattern on the interface. Then the subjects are
+                known to exist, and if the pattern is bound to a subject
+                only, its number of triples is known too.
+        """
+        for s, _, _ in existing_triples:
+            self._delta.track(s, True if complete else None)
+        subject, predicate, obj = triple_pattern
+        if subject is None:
+            return
+        elif complete and predicate is None and obj is None:
+            self._delta.track(subject, bool(existing_triples))
+            self._delta.sizes[subject] = len(existing_triples)
+        else:
+            self._delta.track(subject)
+
+    def _existing_subjects(self, subjects: Iterable[Node]) -> Set[Node]:
+        """Determine which of the given subjects have triples.
+
+        The changes are ignored. The subjects whose triples are cached are
+        looked up on the cache. When the interface has no `triples` method,
+        the rest are looked up on the base graph with a batch of SPARQL
+        queries. Otherwise (and for blank nodes, which SPARQL cannot refer
+        to), they are looked up with a single call to the `triples_many`
+        method of the interface if defined, or each subject separately.
+        """
+        existing, pending = set(), []
+        with self._lock:
+            for subject in subjects:
+                pattern = (subject, None, None)
+                if self.interface.cache and self._cached(pattern):
+                    if next(self._cache.triples(pattern), None) is not None:
+                        existing.add(subject)
+                else:
+                    pending.append(subject)
+
+            if not hasattr(self.interface, "triples"):
+                named = iter([s for s in pending if not isinstance(s, BNode)])
+                pending = [s for s in pending if isinstance(s, BNode)]
+                batch = list(take(named, 1000))
+                while batch:
+                    values = " ".join(s.n3() for s in batch)
+                    existing |= {
+                        row[0]
+                        for row in self.interface.base.query(
+                            f"""SELECT DISTINCT ?s WHERE {{
+                                VALUES ?s {{ {values} }}
+                                ?s ?p ?o .
+                            }}"""
+                        )
+                    }
+                    batch = list(take(named, 1000))
+
+            if pending and hasattr(self.interface, "triples_many"):
+                existing |= {
+                    s
+                    for (s, _, _), triples in self.triples_many(
+                        ((s, None, None) for s in pending),
+                        ignore_buffers=True,
+                    ).items()
+                    if triples
+                }
+            else:
+                existing |= {
+                    s
+                    for s in pending
+                    if next(
+                        self.triples((s, None, None), ignore_buffers=True),
+                        None,
+                    )
+                    is not None
+                }
+        return existing
+
     class UnbufferedInterfaceDriver(Store):
         """Provides a read-only view on the interface without the buffers.
 
         This store implementation provides a read-only view on the connected
-        interface without the `InterfaceDriver`'s buffers.
+        interface without the `InterfaceDriver`'s buffers. Optionally, a
+        specific set of changes can be applied to the view.
         """
 
         _driver: InterfaceDriver
 
+        _delta: Optional[DeltaOverlay] = None
+        """Changes applied to the view."""
+
         # RDFLib
         # ↓ -- ↓
 
@@ -1020,9 +3362,16 @@ class InterfaceDriver(Store):
         transaction_aware: bool = True
         graph_aware: bool = False
 
-        def __init__(self, *args, driver: InterfaceDriver, **kwargs):
+        def __init__(
+            self,
+            *args,
+            driver: InterfaceDriver,
+            delta: Optional[DeltaOverlay] = None,
+            **kwargs,
+        ):
             """Initialize the store."""
             self._driver = driver
+            self._delta = delta
             super().__init__(*args, **kwargs)
 
         def open(self, configuration: str, create: bool = False) -> None:
@@ -1047,17 +3396,31 @@ class InterfaceDriver(Store):
             self, triple_pattern: Pattern, context=None
         ) -> Iterator[Tuple[Triple, Graph]]:
             """Yields triples from the interface ignoring the buffers."""
-            yield from self._driver.triples(
+            triples = self._driver.triples(
                 triple_pattern, context, ignore_buffers=True
             )
+            if self._delta is not None:
+                triples = (
+                    (triple, iter(()))
+                    for triple in self._delta.apply(
+                        (triple for triple, _ in triples), triple_pattern
+                    )
+                )
+            yield from triples
 
         def __len__(self, context: Graph = None) -> int:
             """Gets the amount of triples on the interface, without buffers."""
+            if self._delta is not None:
+                return sum(1 for _ in self.triples((None, None, None)))
             return self._driver.__len__(context, ignore_buffers=True)
 
-        def bind(self, prefix, namespace):
-            """Prevents the modification of namespaces."""
-            raise ModificationException
+        def bind(self, prefix, namespace, override=True):
+            """Bind a namespace to a prefix.
+
+            The namespaces are shared with the driver. RDFLib binds the
+            default namespaces when it evaluates a query on the view.
+            """
+            return self._driver.bind(prefix, namespace, override=override)
 
         def namespace(self, prefix):
             """Get the namespace to which a prefix is bound."""
@@ -1071,9 +3434,33 @@ class InterfaceDriver(Store):
             """Get the bound namespaces."""
             return self._driver.namespaces()
 
-        def query(self, *args, **kwargs) -> Result:
-            """Perform a SPARQL query on the store."""
-            return self._driver.query(*args, **kwargs)
+        def query(
+            self, query, init_ns, init_bindings, query_graph, **kwargs
+        ) -> Result:
+            """Perform a SPARQL query on the store.
+
+            The query is delegated to the driver when neither the view nor
+            the driver have changes. Otherwise, RDFLib evaluates it on the
+            triples of the view.
+            """
+            with self._driver._lock:
+                if (
+                    self._delta is None
+                    and not self._driver._changes
+                    and not any(
+                        len(delta) > 0 for delta in self._driver._deltas()
+                    )
+                ):
+                    return self._driver._query(
+                        query, init_ns, init_bindings, **kwargs
+                    )
+                return Graph(store=self).query(
+                    query,
+                    initNs=init_ns,
+                    initBindings=init_bindings,
+                    use_store_provided=False,
+                    **kwargs,
+                )
 
         def update(self, *args, **kwargs):
             """Prevents the modification."""
@@ -1094,6 +3481,8 @@ class InterfaceDriver(Store):
             older_than: Cache entries older than this date can be cleared
                 to make room for the new triples. When not specified,
                 `datetime.now()` is invoked.
+            replace: Whether the triples replace the cached triples matching
+                the pattern or are added to them.
 
         Raises:
             CacheSizeException: No space left on the cache to fill it with
@@ -1107,61 +3496,126 @@ class InterfaceDriver(Store):
         Also compute the patterns that should be removed to make room for
         the new one.
         """
-        if len(triples) > self._cache_size:
+        size = len(triples)
+        size_bytes = sum(self._triple_bytes(triple) for triple in triples)
+        if self._exceeds(size, size_bytes):
             """The triples to store are bigger than the cache."""
             raise CacheSizeException()
-        elif len(triples) > (self._cache_size - len(self._cache)):
+        elif self._exceeds(
+            size, size_bytes, self._cache_length, self._cache_bytes
+        ):
             """Not enough free space in the cache.
 
             Find out which cached patterns can be removed to make room for
-            the new triples.
+            the new triples. Patterns cached after `older_than` are pinned,
+            except for the sub-patterns of the pattern to cache, which are
+            always removable.
             """
-            to_remove = set()
-            removable_patterns = dict()
-            # sub-patterns of the pattern to cache are always removable
-            removable_patterns.update(
-                {
-                    pattern: None
-                    for pattern in set(self._cached_patterns)
-                    - {triple_pattern}
-                    if self._is_sub_pattern(pattern, triple_pattern)
-                }
-            )
-            if replace:
-                removable_patterns.update({triple_pattern: None})
-            to_remove |= set(removable_patterns)
-            # concatenate the rest of the patterns:
-            # TODO: do not sort, keep ordering when inserting
-            removable_patterns.update(
-                {
-                    pattern: date
-                    for pattern, date in sorted(
-                        self._cached_patterns.items(), key=lambda x: x[1]
-                    )
-                    if date < older_than
-                }
-            )
-            triple_count = 0
-            for pattern in removable_patterns:
-                triple_count += sum(1 for _ in self._cache.triples(pattern))
-                to_remove.add(pattern)
-                if triple_count >= len(triples):
-                    break
-            else:
+            to_remove = self._cached_patterns.sub_patterns(triple_pattern) - {
+                triple_pattern
+            }
+            if replace and triple_pattern in self._cached_patterns:
+                to_remove.add(triple_pattern)
+            pinned = [
+                pattern
+                for pattern in self._cached_patterns.newer_than(older_than)
+                if pattern not in to_remove
+            ]
+            if self._exceeds(
+                size,
+                size_bytes,
+                sum(self._cached_patterns.size(x) for x in pinned),
+                sum(self._cached_patterns.size_bytes(x) for x in pinned),
+            ):
                 raise CacheSizeException()
 
-            """Remove the patterns to make room for the new one."""
+            """Remove the patterns to make room for the new one.
+
+            The cache policy chooses the patterns to remove until there is
+            enough room.
+            """
             for pattern in to_remove:
-                self._cache.remove(pattern)
-                try:
-                    del self._cached_patterns[pattern]
-                except KeyError:
-                    pass
+                self._evict(pattern)
+                self._cache_stats["evictions"] += 1
+            while self._exceeds(
+                size, size_bytes, self._cache_length, self._cache_bytes
+            ):
+                pattern = self._cache_policy.victim(
+                    self._cached_patterns, older_than
+                )
+                if pattern is None:
+                    raise CacheSizeException()
+                if self._cache_disk is not None:
+                    """Move the triples of the pattern to the disk cache."""
+                    self._cache_disk.store(
+                        pattern, set(self._cache.triples(pattern))
+                    )
+                self._evict(pattern)
+                self._cache_stats["evictions"] += 1
 
         """Fill the cache with the new pattern."""
-        self._cache.remove(triple_pattern)
-        self._cache.addN((s, p, o, self._cache) for s, p, o in triples)
-        self._cached_patterns[triple_pattern] = datetime.now()
+        if replace:
+            self._cache_delete(triple_pattern)
+        self._cache_insert(triples)
+        self._cached_patterns.add(
+            triple_pattern,
+            size=size if replace else None,
+            size_bytes=size_bytes if replace else None,
+        )
+        self._cache_policy.inserted(self._cached_patterns, triple_pattern)
+        self._cache_trim_empty()
+
+    def _cache_promote(self, triple_pattern: Pattern) -> bool:
+        """Move a pattern containing the given one from disk to memory.
+
+        Args:
+            triple_pattern: The requested pattern.
+
+        Returns:
+            Whether the requested pattern is now cached in memory.
+        """
+        if self._cache_disk is None:
+            return False
+        stored = self._cache_disk.pop(triple_pattern)
+        if stored is None:
+            return False
+        pattern, triples = stored
+        try:
+            self._fill(pattern, triples)
+        except CacheSizeException:
+            self._cache_disk.store(pattern, triples)
+            return False
+        return True
+
+    def _cache_trim_empty(self) -> None:
+        """Forget the oldest empty patterns beyond the policy's limit."""
+        while (
+            self._cached_patterns.count_empty() > self._cache_policy.empty_size
+        ):
+            self._evict(next(self._cached_patterns.known_empty()))
+
+    def _exceeds(
+        self, size: int, size_bytes: int, used: int = 0, used_bytes: int = 0
+    ) -> bool:
+        """Whether some triples do not fit in the cache.
+
+        Args:
+            size: Number of triples.
+            size_bytes: Approximate size of the triples in bytes.
+            used: Number of triples already occupying the cache.
+            used_bytes: Approximate size in bytes of the triples already
+                occupying the cache.
+        """
+        policy = self._cache_policy
+        return size > policy.size - used or (
+            policy.size_bytes is not None
+            and size_bytes > policy.size_bytes - used_bytes
+        )
+
+    @staticmethod
+    def _triple_bytes(triple: Triple) -> int:
+        """Approximate size of a triple in bytes."""
+        return sum(len(term) for term in triple)
 
     def _compute_space(
         self,
@@ -1179,57 +3633,361 @@ class InterfaceDriver(Store):
         if older_than is None:
             older_than = datetime.now()
 
-        patterns = {
-            pattern
-            for pattern, date in self._cached_patterns.items()
-            if date < older_than
-        }
-        triple_count = 0
-        for pattern in patterns:
-            triple_count += sum(1 for _ in self._cache.triples(pattern))
+        pinned = sum(
+            self._cached_patterns.size(pattern)
+            for pattern in self._cached_patterns.newer_than(older_than)
+        )
+        return max(0, self._cache_policy.size - pinned)
+
+    def _cache_insert(self, triples: Iterable[Triple]) -> None:
+        """Add triples to the cache, updating the size of the patterns.
+
+        Args:
+            triples: The triples to add to the cache.
+        """
+        for triple in triples:
+            if triple in self._cache:
+                continue
+            self._cache.add(triple)
+            size_bytes = self._triple_bytes(triple)
+            self._cache_length += 1
+            self._cache_bytes += size_bytes
+            for pattern in self._cached_patterns.covering(triple):
+                self._cached_patterns.resize(pattern, 1, size_bytes)
+
+    def _cache_delete(self, triple_pattern: Pattern) -> None:
+        """Remove triples from the cache, updating the size of the patterns.
+
+        Args:
+            triple_pattern: Triples matching this pattern are removed.
+        """
+        for triple in list(self._cache.triples(triple_pattern)):
+            self._cache.remove(triple)
+            size_bytes = self._triple_bytes(triple)
+            self._cache_length -= 1
+            self._cache_bytes -= size_bytes
+            for pattern in self._cached_patterns.covering(triple):
+                self._cached_patterns.resize(pattern, -1, -size_bytes)
+
+    def _evict(self, triple_pattern: Pattern) -> None:
+        """Remove a pattern from the cache.
 
-        return min(
-            self._cache_size,
-            self._cache_size - len(self._cache) + triple_count,
+        Triples matching the pattern that also match other cached patterns
+        are kept, so that the rest of the cached patterns stay complete.
+
+        Args:
+            triple_pattern: The pattern to remove from the cache.
+        """
+        self._cached_patterns.discard(triple_pattern)
+        self._cache_policy.discarded(triple_pattern)
+        for triple in list(self._cache.triples(triple_pattern)):
+            if not self._cached_patterns.covers(triple):
+                self._cache.remove(triple)
+                self._cache_length -= 1
+                self._cache_bytes -= self._triple_bytes(triple)
+
+    @property
+    def _prefetch_background(self) -> bool:
+        """Whether prefetches run on the prefetch worker."""
+        return (
+            self._cache_policy.prefetch_background
+            and self.interface.thread_safe_reads
         )
 
-    @staticmethod
-    def _is_sub_pattern(sub_pattern: Pattern, pattern: Pattern) -> bool:
-        """Determine whether a triple pattern is a sub-pattern of another.
+    def _prefetch_schedule(
+        self,
+        prefetch: Callable[[Node, datetime, datetime, int], None],
+        subject: Node,
+        timestamp: datetime,
+    ) -> None:
+        """Schedule prefetching triples related to a subject.
+
+        Starts the prefetch worker if it is not running. When background
+        prefetching is disabled, the prefetch is performed right away.
 
         Args:
-            sub_pattern: The pattern that is assumed to be a sub-pattern.
-            pattern: The pattern that is assumed to be the super-pattern.
+            prefetch: The prefetch method, which accepts the same arguments
+                as `_prefetch_neighborhood`.
+            subject: The subject whose related triples should be cached.
+            timestamp: The time at which the triples of the subject were
+                requested.
+        """
+        job = (
+            prefetch,
+            subject,
+            timestamp,
+            timestamp + self._cache_policy.prefetch_time,
+            self._prefetch_generation,
+        )
+        if not self._prefetch_background:
+            self._prefetch(*job)
+            return
+
+        with self._lock:
+            self._prefetch_queue.append(job)
+            if self._prefetch_worker is None:
+                self._prefetch_worker = Thread(
+                    target=self._prefetch_work,
+                    name=f"{type(self).__name__}-prefetch",
+                    daemon=True,
+                )
+                self._prefetch_worker.start()
 
-        Returns:
-            Whether the above assumptions are true or not.
+    def _prefetch_cancel(self) -> None:
+        """Cancel scheduled and running prefetches.
+
+        Running prefetches stop the next time they check their generation,
+        which happens every `prefetch_step` triples and before filling the
+        cache.
         """
-        return all(
-            sub_pattern[i] == pattern[i] or pattern[i] is None
-            for i in range(0, 3)
+        with self._lock:
+            self._prefetch_generation += 1
+            self._prefetch_queue.clear()
+
+    def _prefetch_work(self) -> None:
+        """Consume the prefetch queue until it is empty.
+
+        Prefetching is only an optimization, a failed prefetch leaves the
+        triples to be fetched when requested. Therefore, failures are
+        logged and the worker moves on to the next subject.
+        """
+        while True:
+            with self._lock:
+                if not self._prefetch_queue:
+                    self._prefetch_worker = None
+                    return
+                job = self._prefetch_queue.popleft()
+            try:
+                self._prefetch(*job)
+            except Exception as exception:
+                logger.warning(
+                    f"Prefetching the triples related to {job[1]} failed: "
+                    f"{exception}"
+                )
+
+    def _prefetch(
+        self, prefetch: Callable[[Node, datetime, datetime, int], None], *args
+    ) -> None:
+        """Run a prefetch method, timing the operation.
+
+        Args:
+            prefetch: The prefetch method.
+            args: The arguments for the method (see
+                `_prefetch_neighborhood`).
+        """
+        start = time.perf_counter()
+        try:
+            prefetch(*args)
+        finally:
+            with self._lock:
+                self._cache_stats["prefetch_time"] += (
+                    time.perf_counter() - start
+                )
+
+    def _prefetch_neighborhood(
+        self,
+        subject: Node,
+        timestamp: datetime,
+        deadline: datetime,
+        generation: int,
+    ) -> None:
+        """Cache the children, parents and neighbors of a subject.
+
+        Args:
+            subject: The subject whose neighborhood should be cached.
+            timestamp: The time at which the triples of the subject were
+                requested. Patterns cached after it are not evicted.
+            deadline: The prefetch is interrupted after this time.
+            generation: Generation of the prefetch. The prefetch is
+                interrupted when the generation of the driver changes.
+        """
+        queries = (
+            f"""SELECT ?s ?p ?o WHERE {{
+                <{subject}> ?predicate ?s .
+                ?s ?p ?o .
+            }}""",  # request info about children
+            f"""SELECT ?s ?p ?o WHERE {{
+            ?s ?predicate <{subject}> .
+            ?s ?p ?o .
+            }}""",  # request info about parent
+            f"""SELECT ?s ?p ?o WHERE {{
+            ?parent ?predicate <{subject}> .
+            ?parent ?another_predicate ?s .
+            ?s ?p ?o .
+            }}""",  # request info about neighbors
         )
 
+        def interrupted() -> bool:
+            return (
+                generation != self._prefetch_generation
+                or datetime.now() > deadline
+            )
+
+        for query in queries:
+            with self._lock:
+                if interrupted():
+                    return
+                query_iterator = iter(
+                    self.interface.base.query(
+                        query,
+                        initNs={
+                            "owl": URIRef("http://www.w3.org/2002/07/owl#")
+                        },
+                    )
+                )
+
+            result = set()
+            taken = True
+            while taken:
+                with self._lock:
+                    if interrupted():
+                        return
+                    taken = set(
+                        take(query_iterator, self._cache_policy.prefetch_step)
+                    )
+                result |= taken
+
+            with self._lock:
+                if generation != self._prefetch_generation:
+                    return
+                if self._compute_space(older_than=timestamp) >= len(result):
+                    pattern_dict = dict()
+                    for s, p, o in result:
+                        pattern_dict[(s, None, None)] = pattern_dict.get(
+                            (s, None, None), set()
+                        ) | {(s, p, o)}
+
+                    for pattern, triples in pattern_dict.items():
+                        try:
+                            self._fill(pattern, triples, older_than=timestamp)
+                        except CacheSizeException:
+                            continue
+                        self._cache_stats["prefetched_triples"] += len(triples)
+
+    def _prefetch_cbd(
+        self,
+        subject: Node,
+        timestamp: datetime,
+        deadline: datetime,
+        generation: int,
+        triples: Iterable[Triple],
+        source: Callable[[Pattern], Iterator[Triple]],
+        source_many: Optional[
+            Callable[[Iterable[Pattern]], Dict[Pattern, Iterable[Triple]]]
+        ] = None,
+        walk: bool = True,
+    ) -> None:
+        """Cache the blank nodes reachable from the triples of a subject.
+
+        Walks the blank node objects of the triples breadth-first, fetching
+        the triples of all the blank nodes found at each depth together
+        (with a single call when a batch method is available).
+        Stops walking after the deadline. The fetched blank nodes are
+        cached as a unit: either all of them or none.
+
+        Args:
+            subject: The subject whose triples are given.
+            timestamp: The time at which the triples were requested.
+                Patterns cached after it are not evicted.
+            deadline: The walk stops after this time.
+            generation: Generation of the prefetch. The prefetch is
+                interrupted when the generation of the driver changes.
+            triples: The triples from which to start walking.
+            source: Method used to fetch triples from the interface.
+            source_many: Method used to fetch the triples of several
+                patterns from the interface at once.
+            walk: Whether to walk further than the blank nodes referenced
+                by the given triples.
+        """
+
+        def unknown_blank_nodes(from_triples: Iterable[Triple]) -> Set[BNode]:
+            return {
+                o
+                for _, _, o in from_triples
+                if isinstance(o, BNode)
+                and o not in described
+                and not self._cached_patterns.covers((o, None, None))
+            }
+
+        described: Dict[BNode, Set[Triple]] = dict()
+        with self._lock:
+            frontier = unknown_blank_nodes(triples)
+        while frontier:
+            with self._lock:
+                if generation != self._prefetch_generation:
+                    return
+                if datetime.now() > deadline:
+                    break
+                if source_many is not None:
+                    fetched = source_many(
+                        [(node, None, None) for node in frontier]
+                    )
+                    level = {
+                        node: set(fetched.get((node, None, None), ()))
+                        for node in frontier
+                    }
+                else:
+                    level = {
+                        node: set(source((node, None, None)))
+                        for node in frontier
+                    }
+                described.update(level)
+                frontier = (
+                    unknown_blank_nodes(chain(*level.values()))
+                    if walk
+                    else set()
+                )
+
+        size = sum(len(x) for x in described.values())
+        with self._lock:
+            if generation != self._prefetch_generation:
+                return
+            if described and self._compute_space(older_than=timestamp) >= size:
+                try:
+                    for node, node_triples in described.items():
+                        self._fill(
+                            (node, None, None),
+                            node_triples,
+                            older_than=timestamp,
+                        )
+                    self._cache_stats["prefetched_triples"] += size
+                except CacheSizeException:
+                    for node in described:
+                        self._evict((node, None, None))
+
+    def _cached(self, item: Pattern) -> bool:
+        """Determine whether a given pattern is already cached.
+
+        Expired patterns covering the given one are evicted. The cache
+        policy is notified of the patterns that are used.
+        """
+        covering = self._cached_patterns.covering(item)
+        for pattern in tuple(covering):
+            if self._cache_policy.expired(self._cached_patterns, pattern):
+                self._evict(pattern)
+                self._cache_stats["expirations"] += 1
+                covering.discard(pattern)
+        for pattern in covering:
+            self._cache_policy.hit(self._cached_patterns, pattern)
+        if any(self._cached_patterns.size(x) == 0 for x in covering):
+            self._cache_stats["empty_hits"] += 1
+        return bool(covering)
+
     @staticmethod
-    def _compatible_patterns(triple: Triple) -> Set[Pattern]:
-        """List the patterns that are compatible with a given triple."""
-        s, p, o = triple
+    def _cache_stats_empty() -> Dict[str, Union[int, float]]:
+        """Counters of the cache statistics, set to zero."""
         return {
-            (s, p, o),
-            (s, p, None),
-            (None, p, o),
-            (s, None, o),
-            (None, None, o),
-            (s, None, None),
-            (None, p, None),
-            (None, None, None),
+            "hits": 0,
+            "empty_hits": 0,
+            "disk_hits": 0,
+            "misses": 0,
+            "partial_hits": 0,
+            "evictions": 0,
+            "expirations": 0,
+            "prefetched_triples": 0,
+            "prefetch_time": 0.0,
         }
 
-    def _cached(self, item: Pattern) -> bool:
-        """Determine whether a given pattern is already cached."""
-        return bool(
-            self._compatible_patterns(item) & set(self._cached_patterns)
-        )
-
 
 class Interface(ABC):
     """To be implemented by interface/wrapper developers.
@@ -1261,6 +4019,48 @@ class Interface(ABC):
     high. This is the case, for example,
     """
 
+    partial_commits: bool = False
+    """Whether the interface supports committing a transaction in chunks.
+
+    Large transactions may be committed in several chunks (see the
+    `chunk_size` argument of `Session.commit`) when enabled. Then the
+    `commit` method is called once per chunk, and only the changes of the
+    chunk are available to it. The changes of each subject are kept on
+    the same chunk.
+    """
+
+    thread_safe_reads: bool = False
+    """Whether the base graph can be read from other threads.
+
+    The driver reads the base graph while holding a lock, so reads never
+    overlap. However, some backends are bound to the thread that opened
+    them (e.g. SQLite connections or asyncio event loops). When enabled,
+    the neighborhood of the requested subjects is prefetched on a
+    background thread (see `CachePolicy.prefetch_background`). Otherwise,
+    it is prefetched on the caller's thread.
+    """
+
+    thread_safe_files: bool = False
+    """Whether the file methods of the interface are thread-safe.
+
+    When enabled, the queued files are saved and deleted in parallel on
+    commit, using up to `file_workers` threads.
+    """
+
+    file_workers: int = 8
+    """Maximum number of files saved or deleted in parallel on commit."""
+
+    batch_size: int = 10000
+    """Maximum number of changes batched for `add_many` and `remove_many`."""
+
+    cache_policy: Optional[CachePolicy] = None
+    """Cache policy to use when caching is enabled.
+
+    When not set, a least recently used policy with default settings is
+    used. Users can override it using the `cache_policy` keyword argument
+    of the wrapper.
+    """
+
     def __init__(
         self,
         **kwargs: Union[
@@ -1385,6 +4185,9 @@ class Interface(ABC):
         - `self.deleted`: A list of deleted individuals (rw). You are not
           expected to modify the entities.
 
+        The sessions are reused across commits. Do not keep references to
+        them or to their entities after this method returns.
+
         Before updating the data structures, check that the changes provided
         by the user do not leave them in a consistent state. This necessary
         because SimPhoNy cannot revert the changes you make to your
@@ -1454,6 +4257,40 @@ class Interface(ABC):
         """
         pass
 
+    def add_many(self, triples: Iterable[Triple]) -> Iterable[bool]:
+        """Inspect and control the addition of several triples at once.
+
+        Can be used to decide whether several triples are added to the base
+        graph with a single request to the backend (e.g. a single message
+        to a remote process). When defined, the driver batches the
+        additions (up to `batch_size` of them) until the triples are read
+        or committed, and uses it instead of `add`.
+
+        Args:
+            triples: The triples being added.
+
+        Returns:
+            For each triple, in the same order, whether it should be added
+            to the base graph (see `add`).
+        """
+        pass
+
+    def remove_many(
+        self, patterns: Iterable[Pattern]
+    ) -> Dict[Pattern, Iterable[Triple]]:
+        """Inspect and control the removal of several patterns at once.
+
+        The counterpart of `add_many` for `remove`.
+
+        Args:
+            patterns: The patterns being removed.
+
+        Returns:
+            A dictionary mapping each pattern to the triples that should be
+            removed from the base graph (see `remove`).
+        """
+        pass
+
     def triples(self, pattern: Pattern) -> Iterator[Triple]:
         """Intercept a triple pattern query.
 
@@ -1468,6 +4305,40 @@ class Interface(ABC):
         """
         pass
 
+    def triples_many(
+        self, patterns: Iterable[Pattern]
+    ) -> Dict[Pattern, Iterable[Triple]]:
+        """Intercept several triple pattern queries at once.
+
+        Can be used to retrieve the triples matching several patterns with
+        a single request to the backend (e.g. a single database query or
+        a single message to a remote process). The driver uses it instead
+        of `triples` when it needs the triples of several patterns at
+        once, thus interfaces defining it should also define `triples`.
+
+        Args:
+            patterns: The patterns being queried.
+
+        Returns:
+            A dictionary mapping each pattern to the triples matching it.
+        """
+        pass
+
+    def count(self, pattern: Pattern) -> int:
+        """Count the triples matching a triple pattern.
+
+        Can be used to count the triples using the native capabilities of
+        the backend (e.g. a `COUNT` query on a database) instead of
+        retrieving all of them.
+
+        Args:
+            pattern: The pattern whose matching triples are counted.
+
+        Returns:
+            The number of triples matching the pattern.
+        """
+        pass
+
     # File storage methods.
 
     def save(self, key: str, file: BinaryIO) -> None:
@@ -1519,13 +4390,15 @@ class Interface(ABC):
     new_graph: Optional[Graph] = None
     buffer: Optional[Graph] = None
 
-    session_base: Optional[Session] = None
-    session_old: Optional[Session] = None
-    session_new: Optional[Session] = None
+    session_base: Optional[Session] = _SessionView("base")
+    session_old: Optional[Session] = _SessionView("old")
+    session_new: Optional[Session] = _SessionView("new")
     session: Optional[Session] = None
     added: Optional[Set[OntologyEntity]] = None
     updated: Optional[Set[OntologyEntity]] = None
     deleted: Optional[Set[OntologyEntity]] = None
+    job: Optional[ComputeJob] = None
+    _session_views: Optional[SessionViews] = None
 
     # Definition of:
     # Interface
@@ -1536,8 +4409,12 @@ class Interface(ABC):
         if name in {
             "compute",
             "add",
+            "add_many",
             "remove",
+            "remove_many",
             "triples",
+            "triples_many",
+            "count",
             "save",
             "load",
             "delete",
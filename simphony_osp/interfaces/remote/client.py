@@ -4,6 +4,7 @@ import json
 import os
 import tempfile
 from itertools import chain
+from threading import Thread
 from typing import (
     Any,
     BinaryIO,
@@ -12,6 +13,7 @@ from typing import (
     Iterator,
     List,
     Optional,
+    Tuple,
     Union,
 )
 
@@ -20,10 +22,16 @@ from rdflib.plugins.parsers.jsonld import to_rdf as json_to_rdf
 from rdflib.plugins.stores.memory import SimpleMemory
 from rdflib.store import Store
 
-from simphony_osp.interfaces.interface import BufferType, Interface
-from simphony_osp.interfaces.remote.common import COMMAND, parse_uri
+from simphony_osp.interfaces.interface import BufferType, ComputeJob, Interface
+from simphony_osp.interfaces.remote.common import (
+    COMMAND,
+    TermGroups,
+    parse_uri,
+    triples_from_terms,
+)
 from simphony_osp.interfaces.remote.engine import CommunicationEngineClient
 from simphony_osp.utils.datatypes import Pattern, Triple
+from simphony_osp.utils.other import copy_file
 
 
 class RemoteInterface(Interface):
@@ -34,33 +42,58 @@ class RemoteInterface(Interface):
     _username: Optional[str] = None
     _password: Optional[str] = None
     _engine: Optional[CommunicationEngineClient] = None
+    _attributes: Optional[Dict[str, bool]] = None
+
+    # Compression (see `CommunicationEngineClient`).
+    compression: bool = True
+    compress_files: bool = True
 
     @staticmethod
     def _handle_response(
-        data: str, files: List[BinaryIO]
-    ) -> (Dict[str, Any], List[BinaryIO]):
-        data = json.loads(data or "{}")
+        data: Union[str, TermGroups], files: List[BinaryIO]
+    ) -> (Union[Dict[str, Any], TermGroups], List[BinaryIO]):
+        if isinstance(data, str):
+            data = json.loads(data or "{}")
         return data, files
 
     def __getattribute__(self, item):
         """Check whether the interface on the remote side has the attribute."""
-        if item in (
+        if item in ("triples_many", "add_many", "remove_many"):
+            # The server answers batches of triples and patterns whenever
+            # the remote interface can answer either batches or single ones.
+            if not (
+                self._remote_hasattr(item)
+                or self._remote_hasattr(item[: -len("_many")])
+            ):
+                raise AttributeError(item)
+        elif item in (
             "compute",
             "add",
             "remove",
             "triples",
+            "count",
             "save",
             "load",
             "delete",
             "hash",
             "rename",
         ):
+            if not self._remote_hasattr(item):
+                raise AttributeError(item)
+        return super().__getattribute__(item)
+
+    def _remote_hasattr(self, item: str) -> bool:
+        """Whether the interface on the remote side has the attribute."""
+        # The attributes of the remote interface do not change while
+        # connected, remember them to avoid a round trip per call.
+        if self._attributes is None:
+            self._attributes = dict()
+        if item not in self._attributes:
             response, _ = self._engine.send(
                 COMMAND.HASATTR, json.dumps({"item": item})
             )
-            if response[COMMAND.HASATTR] is False:
-                raise AttributeError(item)
-        return super().__getattribute__(item)
+            self._attributes[item] = response[COMMAND.HASATTR] is not False
+        return self._attributes[item]
 
     # Interface
     # ↓ ----- ↓
@@ -69,6 +102,10 @@ class RemoteInterface(Interface):
 
     cache = True
 
+    # The communication engine serializes the requests made from any
+    # thread on the event loop of the thread that connected.
+    thread_safe_reads = True
+
     def open(self, configuration: str, create: bool = False) -> None:
         """Implements the OPEN command."""
         if self._engine is not None:
@@ -86,6 +123,8 @@ class RemoteInterface(Interface):
         self._engine = CommunicationEngineClient(
             uri=self._uri,
             handle_response=self._handle_response,
+            compression=self.compression,
+            compress_files=self.compress_files,
         )
 
         # Send authentication command
@@ -122,6 +161,7 @@ class RemoteInterface(Interface):
         # Close connection and clear connection information.
         self._engine.close()
         self._uri, self._username, self._password = (None,) * 3
+        self._attributes = None
 
         # return response[COMMAND.CLOSE]
 
@@ -161,6 +201,8 @@ class RemoteInterface(Interface):
 
     def add(self, triple: Triple) -> bool:
         """Implements the ADD command."""
+        if self._engine.binary:
+            return next(iter(self.add_many([triple])))
         g = Graph()
         g.add(triple)
         response, _ = self._engine.send(
@@ -169,8 +211,23 @@ class RemoteInterface(Interface):
         )
         return response.get(COMMAND.ADD)
 
+    def add_many(self, triples: Iterable[Triple]) -> List[bool]:
+        """Implements the ADD command for several triples."""
+        triples = list(triples)
+        if not self._engine.binary:
+            # The remote interface may only have `add_many`, which the
+            # server uses when asked to add a single triple.
+            return [RemoteInterface.add(self, triple) for triple in triples]
+        response, _ = self._engine.send(
+            COMMAND.ADD, [list(chain.from_iterable(triples))]
+        )
+        return response[COMMAND.ADD]
+
     def remove(self, pattern: Triple) -> Iterator[Triple]:
         """Implements the REMOVE command."""
+        if self._engine.binary:
+            yield from self.remove_many([pattern])[pattern]
+            return
         g = Graph()
         s = pattern[0] if pattern[0] is not None else URIRef("none:None")
         p = pattern[1] if pattern[1] is not None else URIRef("none:None")
@@ -182,8 +239,30 @@ class RemoteInterface(Interface):
         )
         yield from json_to_rdf(response[COMMAND.REMOVE], Graph())
 
+    def remove_many(
+        self, patterns: Iterable[Pattern]
+    ) -> Dict[Pattern, Iterable[Triple]]:
+        """Implements the REMOVE command for several patterns."""
+        patterns = list(patterns)
+        if not self._engine.binary:
+            return {
+                pattern: set(RemoteInterface.remove(self, pattern))
+                for pattern in patterns
+            }
+        response, _ = self._engine.send(
+            COMMAND.REMOVE, [list(pattern) for pattern in patterns]
+        )
+        return {
+            pattern: set(triples_from_terms(terms))
+            for pattern, terms in zip(patterns, response)
+        }
+
     def triples(self, pattern: Triple) -> Iterator[Triple]:
         """Implements the TRIPLES command."""
+        if self._engine.binary:
+            for page in self._engine.stream(COMMAND.TRIPLES, [list(pattern)]):
+                yield from triples_from_terms(page)
+            return
         g = Graph()
         s = pattern[0] if pattern[0] is not None else URIRef("none:None")
         p = pattern[1] if pattern[1] is not None else URIRef("none:None")
@@ -195,21 +274,68 @@ class RemoteInterface(Interface):
         )
         yield from json_to_rdf(response[COMMAND.TRIPLES], Graph())
 
+    def triples_many(
+        self, patterns: Iterable[Pattern]
+    ) -> Dict[Pattern, Iterable[Triple]]:
+        """Implements the TRIPLES_MANY command."""
+        patterns = list(patterns)
+        if self._engine.binary:
+            response, _ = self._engine.send(
+                COMMAND.TRIPLES_MANY, [list(pattern) for pattern in patterns]
+            )
+            return {
+                pattern: set(triples_from_terms(terms))
+                for pattern, terms in zip(patterns, response)
+            }
+        response, _ = self._engine.send(
+            COMMAND.TRIPLES_MANY,
+            json.dumps(
+                [
+                    [x.n3() if x is not None else None for x in pattern]
+                    for pattern in patterns
+                ]
+            ),
+        )
+        return {
+            pattern: set(json_to_rdf(triples, Graph()))
+            for pattern, triples in zip(
+                patterns, response[COMMAND.TRIPLES_MANY]
+            )
+        }
+
+    def count(self, pattern: Pattern) -> int:
+        """Implements the COUNT command."""
+        if self._engine.binary:
+            response, _ = self._engine.send(COMMAND.COUNT, [list(pattern)])
+            return response[COMMAND.COUNT]
+        g = Graph()
+        s = pattern[0] if pattern[0] is not None else URIRef("none:None")
+        p = pattern[1] if pattern[1] is not None else URIRef("none:None")
+        o = pattern[2] if pattern[2] is not None else URIRef("none:None")
+        g.add((s, p, o))
+        response, _ = self._engine.send(
+            COMMAND.COUNT,
+            g.serialize(format="turtle"),
+        )
+        return response[COMMAND.COUNT]
+
     def save(self, key: str, file: BinaryIO) -> None:
         """Implements the SAVE command."""
-        file = tempfile.NamedTemporaryFile(delete=False)
+        with tempfile.NamedTemporaryFile(delete=False) as temporary_file:
+            path = temporary_file.name
         try:
+            copy_file(file, path)
             response, _ = self._engine.send(
-                COMMAND.COMPUTE,
+                COMMAND.SAVE,
                 json.dumps(
                     {
                         "key": key,
                     }
                 ),
-                [file.name],
+                [path],
             )
         finally:
-            os.remove(file.name)
+            os.remove(path)
         return response.get(COMMAND.SAVE)
 
     def load(self, key: str) -> BinaryIO:
@@ -222,7 +348,7 @@ class RemoteInterface(Interface):
                 }
             ),
         )
-        return files
+        return files[0]
 
     def delete(self, key: str) -> BinaryIO:
         """Implements the DELETE command."""
@@ -255,6 +381,7 @@ class RemoteInterface(Interface):
             json.dumps(
                 {
                     "key": key,
+                    "new_key": new_key,
                 }
             ),
         )
@@ -375,12 +502,33 @@ class RemoteStoreClient(Store):
     def __len__(self, context=None) -> int:
         """Get the number of triples in the store.
 
-        For more details, check RDFLib's documentation.
+        The triples are counted on the remote side. Only the buffered
+        changes are looked up. For more details, check RDFLib's
+        documentation.
         """
-        i = 0
-        for _ in self.triples((None, None, None)):
-            i += 1
-        return i
+        changed = set(
+            chain(
+                self._buffers[BufferType.DELETED],
+                self._buffers[BufferType.ADDED],
+            )
+        )
+        # Look up all the changed triples at once.
+        (response, _), *lookups = self._engine.send_many(
+            chain(
+                ((COMMAND.STORE_COUNT, ""),),
+                (self._triples_request(triple) for triple in changed),
+            )
+        )
+        existing = sum(
+            1
+            for lookup in lookups
+            if next(self._triples_response(lookup), None) is not None
+        )
+        return (
+            response[COMMAND.STORE_COUNT]
+            - existing
+            + len(self._buffers[BufferType.ADDED])
+        )
 
     def bind(self, prefix, namespace):
         """Bind a namespace to a prefix."""
@@ -408,16 +556,36 @@ class RemoteStoreClient(Store):
 
     def commit(self) -> None:
         """Commit buffered changes."""
-        # data are the buffers, serialized (json-ld)
-        self._engine.send(
-            COMMAND.STORE_ADD,
-            self._buffers[BufferType.ADDED].serialize(format="json-ld"),
-        )
-        self._engine.send(
-            COMMAND.STORE_REMOVE,
-            self._buffers[BufferType.DELETED].serialize(format="turtle"),
-        )
-        self._engine.send(COMMAND.STORE_COMMIT, "")
+        # The server handles the requests in order, there is no need to wait
+        # for each response before sending the next request.
+        if self._engine.binary:
+            requests = [
+                (
+                    command,
+                    [list(chain.from_iterable(self._buffers[buffer_type]))],
+                )
+                for command, buffer_type in (
+                    (COMMAND.STORE_ADD, BufferType.ADDED),
+                    (COMMAND.STORE_REMOVE, BufferType.DELETED),
+                )
+            ]
+        else:
+            # data are the buffers, serialized (json-ld)
+            requests = [
+                (
+                    COMMAND.STORE_ADD,
+                    self._buffers[BufferType.ADDED].serialize(
+                        format="json-ld"
+                    ),
+                ),
+                (
+                    COMMAND.STORE_REMOVE,
+                    self._buffers[BufferType.DELETED].serialize(
+                        format="turtle"
+                    ),
+                ),
+            ]
+        self._engine.send_many(requests + [(COMMAND.STORE_COMMIT, "")])
 
         self._reset_buffers()
 
@@ -428,21 +596,75 @@ class RemoteStoreClient(Store):
     # RDFLib
     # ↑ -- ↑
 
+    def compute(self, **kwargs) -> None:
+        """Let the remote interface compute new information.
+
+        The uncommitted changes must have been committed before.
+        """
+        response, _ = self._engine.send(
+            COMMAND.COMPUTE, json.dumps({"kwargs": kwargs})
+        )
+        return response.get(COMMAND.COMPUTE)
+
+    def compute_async(self, **kwargs) -> ComputeJob:
+        """Let the remote interface compute on a background thread.
+
+        The uncommitted changes are committed first, and then the
+        computation runs on its own thread. The job can be cancelled while
+        pending, but the remote interface is not asked to stop once it is
+        running.
+
+        Returns:
+            A handle on the computation.
+        """
+        self.commit()
+        job = ComputeJob()
+        Thread(
+            target=job._run,
+            args=(lambda: self.compute(**kwargs),),
+            daemon=True,
+        ).start()
+        return job
+
     def _remote_triples(self, triple_pattern: Pattern) -> Iterator[Triple]:
         """Fetch triples from the remote store.
 
         Args:
             triple_pattern: The triple pattern to query the remote store.
         """
+        if self._engine.binary:
+            for page in self._engine.stream(
+                COMMAND.STORE_TRIPLES, [list(triple_pattern)]
+            ):
+                yield from triples_from_terms(page)
+            return
+        yield from self._triples_response(
+            self._engine.send(*self._triples_request(triple_pattern))
+        )
+
+    def _triples_request(
+        self, triple_pattern: Pattern
+    ) -> Tuple[COMMAND, Union[str, TermGroups]]:
+        """Produce the request fetching a triple pattern from the store."""
+        if self._engine.binary:
+            return COMMAND.STORE_TRIPLES, [list(triple_pattern)]
         triple_pattern = tuple(
             x or URIRef("none:None") for x in triple_pattern
         )
         pattern = Graph()
         pattern.add(triple_pattern)
-        response, _ = self._engine.send(
-            COMMAND.STORE_TRIPLES, pattern.serialize(format="turtle")
-        )
-        yield from json_to_rdf(response[COMMAND.STORE_TRIPLES], Graph())
+        return COMMAND.STORE_TRIPLES, pattern.serialize(format="turtle")
+
+    @staticmethod
+    def _triples_response(
+        response: Tuple[Union[Dict[str, Any], TermGroups], List[BinaryIO]]
+    ) -> Iterator[Triple]:
+        """Read the triples from the response to `_triples_request`."""
+        data, _ = response
+        if isinstance(data, dict):
+            yield from json_to_rdf(data[COMMAND.STORE_TRIPLES], Graph())
+        else:
+            yield from triples_from_terms(data[0])
 
     def _reset_buffers(self) -> None:
         """Replaces the existing buffers by empty buffers."""
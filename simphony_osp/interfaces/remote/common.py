@@ -1,9 +1,17 @@
 """Utility functions and variables for the remote store implementation."""
 
-import hashlib
 import urllib.parse
 from enum import Enum
-from typing import Optional, Tuple
+from typing import Dict, Iterable, Iterator, List, Optional, Tuple
+
+from rdflib import BNode, Literal, URIRef
+from rdflib.term import Node
+
+from simphony_osp.utils.datatypes import Triple
+from simphony_osp.utils.other import hash_file
+
+TermGroups = List[List[Optional[Node]]]
+"""Groups of RDF terms (or `None`), the contents of binary messages."""
 
 
 class COMMAND(str, Enum):
@@ -22,6 +30,7 @@ class COMMAND(str, Enum):
     STORE_CLOSE = "STORE_CLOSE"
     STORE_ADD = "STORE_ADD"
     STORE_TRIPLES = "STORE_TRIPLES"
+    STORE_COUNT = "STORE_COUNT"
     STORE_REMOVE = "STORE_REMOVE"
     STORE_COMMIT = "STORE_COMMIT"
     STORE_ROLLBACK = "STORE_ROLLBACK"
@@ -29,8 +38,14 @@ class COMMAND(str, Enum):
     # Triplestore commands
     ADD = "ADD"
     TRIPLES = "TRIPLES"
+    TRIPLES_MANY = "TRIPLES_MANY"
+    COUNT = "COUNT"
     REMOVE = "REMOVE"
 
+    # Paged query commands (TRIPLES, STORE_TRIPLES)
+    TRIPLES_NEXT = "TRIPLES_NEXT"
+    TRIPLES_CLOSE = "TRIPLES_CLOSE"
+
     # File commands
     SAVE = "SAVE"
     LOAD = "LOAD"
@@ -50,16 +65,10 @@ def get_hash(file_path: str) -> str:
         file_path (path): A path to a file
 
     Returns:
-        HASH: A sha256 HASH object
+        HASH: The hexadecimal digest of a sha256 HASH object
     """
-    buf_size = 4096
-    result = hashlib.sha256()
     with open(file_path, "rb") as f:
-        data = True
-        while data:
-            data = f.read(buf_size)
-            result.update(data)
-    return result.hexdigest()
+        return hash_file(f)
 
 
 def parse_uri(uri: str) -> Tuple[Optional[str], Optional[str], Optional[str]]:
@@ -78,3 +87,169 @@ def parse_uri(uri: str) -> Tuple[Optional[str], Optional[str], Optional[str]]:
         parsed[1] = parsed[1].split("@")[1]
     uri = urllib.parse.urlunparse(parsed)
     return uri, username, password
+
+
+def triples_from_terms(terms: Iterable[Optional[Node]]) -> Iterator[Triple]:
+    """Group a flat sequence of terms into triples."""
+    terms = iter(terms)
+    return zip(terms, terms, terms)
+
+
+class TermCodec:
+    """Compact binary encoding of RDF terms.
+
+    Used by version 3 of the protocol of the communication engine to
+    exchange groups of terms (e.g. triple patterns or the triples matching
+    them, see `TermGroups`).
+
+    Each side of a connection keeps a dictionary of the IRIs and blank
+    nodes it has sent, and another one of those it has received. The first
+    time a term is sent, it is sent in full and added to the dictionaries.
+    Afterwards, it is sent as its position on the dictionary. Literals are
+    always sent in full, but their datatypes are sent as IRIs.
+
+    To bound their size, the dictionaries are emptied before encoding or
+    decoding a message when they hold `max_terms` terms or more. As both
+    sides see the same messages in the same order, they empty their
+    dictionaries at the same point without exchanging any message.
+
+    The terms are encoded as unsigned LEB128 integers, followed by the
+    data of the terms sent in full. `NONE` encodes `None`, `IRI` and
+    `BLANK_NODE` introduce new IRIs and blank nodes, `LITERAL` introduces
+    a literal, and the values from `REFERENCE` on refer to the terms on
+    the dictionary.
+    """
+
+    NONE = 0
+    IRI = 1
+    BLANK_NODE = 2
+    LITERAL = 3
+    REFERENCE = 4
+
+    max_terms: int = 2**16
+    """Number of terms after which the dictionaries are emptied."""
+
+    def __init__(self):
+        """Initialize the codec with empty dictionaries."""
+        self._sent: Dict[Node, int] = dict()
+        self._received: List[Node] = list()
+
+    def encode(self, groups: TermGroups) -> bytes:
+        """Encode groups of terms.
+
+        The dictionary of sent terms is only updated once all the terms
+        have been encoded, so that it is not altered when encoding fails.
+        """
+        sent = self._sent if len(self._sent) < self.max_terms else dict()
+        data = bytearray()
+        new = dict()
+        self._write_int(data, len(groups))
+        for group in groups:
+            self._write_int(data, len(group))
+            for term in group:
+                self._write_term(data, term, sent, new)
+        sent.update(new)
+        self._sent = sent
+        return bytes(data)
+
+    def decode(self, data: bytes) -> TermGroups:
+        """Decode groups of terms."""
+        if len(self._received) >= self.max_terms:
+            self._received = list()
+        data = memoryview(data)
+        position = 0
+        num_groups, position = self._read_int(data, position)
+        groups = []
+        for _ in range(num_groups):
+            num_terms, position = self._read_int(data, position)
+            group = []
+            for _ in range(num_terms):
+                term, position = self._read_term(data, position)
+                group.append(term)
+            groups.append(group)
+        return groups
+
+    def _write_term(
+        self,
+        data: bytearray,
+        term: Optional[Node],
+        sent: Dict[Node, int],
+        new: Dict[Node, int],
+    ) -> None:
+        """Encode a term and add it to the new terms if needed."""
+        if term is None:
+            self._write_int(data, self.NONE)
+        elif isinstance(term, Literal):
+            self._write_int(data, self.LITERAL)
+            self._write_str(data, str(term))
+            self._write_str(data, term.language or "")
+            self._write_term(data, term.datatype, sent, new)
+        else:
+            index = sent.get(term, new.get(term))
+            if index is not None:
+                self._write_int(data, self.REFERENCE + index)
+                return
+            if isinstance(term, URIRef):
+                self._write_int(data, self.IRI)
+            elif isinstance(term, BNode):
+                self._write_int(data, self.BLANK_NODE)
+            else:
+                raise TypeError(f"Cannot encode term {term!r}.")
+            self._write_str(data, str(term))
+            new[term] = len(sent) + len(new)
+
+    def _read_term(
+        self, data: memoryview, position: int
+    ) -> Tuple[Optional[Node], int]:
+        """Decode a term, adding it to the received terms if needed."""
+        code, position = self._read_int(data, position)
+        if code == self.NONE:
+            return None, position
+        elif code == self.LITERAL:
+            value, position = self._read_str(data, position)
+            language, position = self._read_str(data, position)
+            datatype, position = self._read_term(data, position)
+            return (
+                Literal(value, lang=language or None, datatype=datatype),
+                position,
+            )
+        elif code >= self.REFERENCE:
+            return self._received[code - self.REFERENCE], position
+        value, position = self._read_str(data, position)
+        term = URIRef(value) if code == self.IRI else BNode(value)
+        self._received.append(term)
+        return term, position
+
+    @staticmethod
+    def _write_int(data: bytearray, value: int) -> None:
+        """Encode an unsigned integer (LEB128)."""
+        while value > 0x7F:
+            data.append((value & 0x7F) | 0x80)
+            value >>= 7
+        data.append(value)
+
+    @staticmethod
+    def _read_int(data: memoryview, position: int) -> Tuple[int, int]:
+        """Decode an unsigned integer (LEB128)."""
+        value = shift = 0
+        while True:
+            byte = data[position]
+            position += 1
+            value |= (byte & 0x7F) << shift
+            if byte < 0x80:
+                return value, position
+            shift += 7
+
+    @classmethod
+    def _write_str(cls, data: bytearray, value: str) -> None:
+        """Encode a string as its length followed by its UTF-8 bytes."""
+        value = value.encode("utf-8")
+        cls._write_int(data, len(value))
+        data += value
+
+    @classmethod
+    def _read_str(cls, data: memoryview, position: int) -> Tuple[str, int]:
+        """Decode a string encoded by `_write_str`."""
+        length, position = cls._read_int(data, position)
+        end = position + length
+        return str(data[position:end], "utf-8"), end
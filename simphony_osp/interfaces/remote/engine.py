@@ -1,18 +1,22 @@
 """Utilities used in the communication for the remote stores."""
 
 import asyncio
+import json
 import logging
 import math
 import os
 import tempfile
+import threading
 import uuid
-from itertools import chain
+import zlib
+from itertools import chain, count
 from typing import (
     Any,
     BinaryIO,
     Callable,
     Dict,
     Iterable,
+    Iterator,
     List,
     Optional,
     Tuple,
@@ -22,17 +26,51 @@ from uuid import UUID
 
 import websockets
 import websockets.exceptions as ws_exceptions
+from rdflib import Literal
+from rdflib.term import Node
+from websockets.extensions.base import Extension
+from websockets.extensions.permessage_deflate import (
+    ClientPerMessageDeflateFactory,
+    ServerPerMessageDeflateFactory,
+)
 from websockets.legacy.client import WebSocketClientProtocol as Socket
 from websockets.legacy.server import WebSocketServerProtocol as ServerSocket
 
-from simphony_osp.interfaces.remote.common import COMMAND
+from simphony_osp.interfaces.remote.common import (
+    COMMAND,
+    TermCodec,
+    TermGroups,
+)
+from simphony_osp.utils.other import copy_file
 
 logger = logging.getLogger(__name__)
 
 BLOCK_SIZE = 4096
+PAGE_SIZE = 10000  # triples per page of paged queries
+COMPRESSION_THRESHOLD = 256  # bytes, smaller messages are not compressed
 LEN_FILES_HEADER = [5]  # num_blocks
 LEN_HEADER = [2, 5, 2]  # version, num_blocks, num_files
+LEN_HEADER_BINARY = [2, 5, 2, 1]  # version, num_blocks, num_files, binary
+LEN_HEADER_PIPELINED = [2, 5, 2, 1, 4]  # ..., binary, request_id
 VERSION = 2
+BINARY_VERSION = 3
+"""Version of the protocol exchanging terms using `TermCodec`.
+
+The version is negotiated as a websocket subprotocol when connecting, with
+`VERSION` as fallback. Then, messages may carry either text or groups of
+terms (flagged on the header).
+"""
+PIPELINED_VERSION = 4
+"""Version of the protocol identifying the requests.
+
+Extends `BINARY_VERSION` with a request identifier on the header, which
+the server copies to the header of the response. The server still handles
+the requests in the order they are received.
+"""
+SUBPROTOCOLS = {
+    PIPELINED_VERSION: "simphony-osp-4",
+    BINARY_VERSION: "simphony-osp-3",
+}
 DEBUG_MAX = 1000
 
 
@@ -95,18 +133,19 @@ def encode_header(
     return r
 
 
-def split_message(msg: str, block_size: int = BLOCK_SIZE):
+def split_message(msg: Union[str, bytes], block_size: int = BLOCK_SIZE):
     """Split the message to send in small blocks.
 
     Args:
-        msg: The message to send.
+        msg: The message to send. Text is encoded using utf-8.
         block_size: The size of the blocks.
                                     Defaults to BLOCK_SIZE.
 
     Returns:
         int, Generator: Number of blocks, Generator over blocks.
     """
-    msg = msg.encode("utf-8")
+    if isinstance(msg, str):
+        msg = msg.encode("utf-8")
     num_blocks = int(math.ceil(len(msg) / block_size))
 
     def gen(message, blocks, size):
@@ -118,23 +157,97 @@ def split_message(msg: str, block_size: int = BLOCK_SIZE):
     return num_blocks, gen(msg, num_blocks, block_size)
 
 
-async def join_message(websocket, num_blocks: int) -> str:
+async def join_message(
+    websocket, num_blocks: int, binary: bool = False
+) -> Union[str, bytes]:
     """Get the message that was decomposed in different blocks.
 
     Args:
         websocket: wecksocket object to receive the objects.
         num_blocks: The number of blocks that belong to the message.
+        binary: Whether to return the data as bytes.
 
     Returns:
-        str: The data, decoded using utf-8.
+        The data, decoded using utf-8 unless binary.
     """
-    data = b""
+    data = bytearray()
     for i in range(num_blocks):
         logger.debug(f"Receiving message block {i + 1} of {num_blocks}")
         data += await websocket.recv()
     logger.debug("Done")
-    data = data.decode("utf-8")
-    return data
+    return bytes(data) if binary else data.decode("utf-8")
+
+
+def decode_message_header(
+    bytestring: bytes,
+) -> Tuple[int, int, int, bool, Optional[int], Optional[str]]:
+    """Decode the header of a message of any of the protocol versions.
+
+    Returns:
+        The version, the number of blocks and files, whether the message
+        carries groups of terms, the request identifier (version
+        `PIPELINED_VERSION` only) and the command (requests only).
+    """
+    version = int.from_bytes(bytestring[:2], byteorder="big")
+    request_id = None
+    if version == VERSION:
+        version, num_blocks, num_files, *command = decode_header(
+            bytestring, LEN_HEADER
+        )
+        binary = False
+    elif version == BINARY_VERSION:
+        version, num_blocks, num_files, binary, *command = decode_header(
+            bytestring, LEN_HEADER_BINARY
+        )
+        binary = bool(binary)
+    elif version == PIPELINED_VERSION:
+        (
+            version,
+            num_blocks,
+            num_files,
+            binary,
+            request_id,
+            *command,
+        ) = decode_header(bytestring, LEN_HEADER_PIPELINED)
+        binary = bool(binary)
+    else:
+        raise NotImplementedError(
+            "No decode implemented for " "version %s" % version
+        )
+    return (
+        version,
+        num_blocks,
+        num_files,
+        binary,
+        request_id,
+        next(iter(command), None),
+    )
+
+
+def encode_message_header(
+    version: int,
+    num_blocks: int,
+    num_files: int,
+    binary: bool = False,
+    command: Optional[str] = None,
+    request_id: int = 0,
+) -> bytes:
+    """Encode the header of a message for a protocol version."""
+    if version == VERSION:
+        if binary:
+            raise ValueError(
+                "Groups of terms cannot be sent using version %s." % version
+            )
+        elements, lengths = [version, num_blocks, num_files], LEN_HEADER
+    elif version == BINARY_VERSION:
+        elements = [version, num_blocks, num_files, int(binary)]
+        lengths = LEN_HEADER_BINARY
+    else:
+        elements = [version, num_blocks, num_files, int(binary), request_id]
+        lengths = LEN_HEADER_PIPELINED
+    if command is not None:
+        elements.append(command)
+    return encode_header(elements, lengths)
 
 
 def encode_files(files: List[str]) -> bytes:
@@ -166,6 +279,50 @@ def encode_files(files: List[str]) -> bytes:
             logger.debug("Done")
 
 
+def is_compressible(file: str) -> bool:
+    """Whether compressing a file is worthwhile.
+
+    Samples the first block of the file. Already compressed data (e.g.
+    archives, images or videos) does not shrink when compressed again.
+    """
+    with open(file, "rb") as f:
+        block = f.read(BLOCK_SIZE)
+    return len(zlib.compress(block, 1)) < 0.9 * len(block)
+
+
+async def send_files(
+    websocket: Union[Socket, ServerSocket],
+    files: List[str],
+    compress: bool = True,
+) -> None:
+    """Send files through the websocket.
+
+    Args:
+        websocket: The websocket to send the files through.
+        files: A list of paths to send.
+        compress: Whether to compress the files when compression has been
+            negotiated for the connection. Files that are not compressible
+            (see `is_compressible`) are never compressed.
+    """
+    deflate = next(
+        (
+            extension
+            for extension in websocket.extensions
+            if isinstance(extension, SelectiveDeflate)
+        ),
+        None,
+    )
+    try:
+        for file in files:
+            if deflate is not None:
+                deflate.skip = not (compress and is_compressible(file))
+            for part in encode_files([file]):
+                await websocket.send(part)
+    finally:
+        if deflate is not None:
+            deflate.skip = False
+
+
 async def receive_files(
     num_files: int, websocket: Union[Socket, ServerSocket]
 ) -> List[BinaryIO]:
@@ -183,16 +340,81 @@ async def receive_files(
         )
         file = tempfile.NamedTemporaryFile(delete=False)
         files.append(file)
-        logger.debug("Storing file %s with %s blocks." % file.name)
-        with file:
-            for j in range(num_blocks):
-                logger.debug(f"Receive block {j + 1} of {num_blocks}")
-                data = await websocket.recv()
-                file.write(data)
+        logger.debug(
+            "Storing file %s with %s blocks." % (file.name, num_blocks)
+        )
+        for j in range(num_blocks):
+            logger.debug(f"Receive block {j + 1} of {num_blocks}")
+            data = await websocket.recv()
+            file.write(data)
         file.seek(0)
     return files
 
 
+class SelectiveDeflate(Extension):
+    """Per-message deflate extension that skips some of the messages.
+
+    Wraps the per-message deflate extension (RFC 7692) negotiated for a
+    connection. Messages smaller than the threshold, and all messages while
+    `skip` is set, are sent uncompressed. The receiving end only inflates
+    the messages flagged as compressed.
+
+    The communication engine sends each message in a single frame, so
+    every frame is either compressed or not as a whole.
+    """
+
+    skip: bool = False
+
+    def __init__(self, extension: Extension, threshold: int):
+        """Wrap the negotiated extension.
+
+        Args:
+            extension: The negotiated per-message deflate extension.
+            threshold: Size in bytes from which messages are compressed.
+        """
+        self.name = extension.name
+        self._extension = extension
+        self._threshold = threshold
+
+    def decode(self, frame, *, max_size: Optional[int] = None):
+        """Decode an incoming frame."""
+        return self._extension.decode(frame, max_size=max_size)
+
+    def encode(self, frame):
+        """Encode an outgoing frame."""
+        if self.skip or len(frame.data) < self._threshold:
+            return frame
+        return self._extension.encode(frame)
+
+
+class _ClientDeflateFactory(ClientPerMessageDeflateFactory):
+    """Negotiates `SelectiveDeflate` on the client side."""
+
+    def __init__(self, threshold: int):
+        super().__init__()
+        self.threshold = threshold
+
+    def process_response_params(self, params, accepted_extensions):
+        return SelectiveDeflate(
+            super().process_response_params(params, accepted_extensions),
+            self.threshold,
+        )
+
+
+class _ServerDeflateFactory(ServerPerMessageDeflateFactory):
+    """Negotiates `SelectiveDeflate` on the server side."""
+
+    def __init__(self, threshold: int):
+        super().__init__()
+        self.threshold = threshold
+
+    def process_request_params(self, params, accepted_extensions):
+        params, extension = super().process_request_params(
+            params, accepted_extensions
+        )
+        return params, SelectiveDeflate(extension, self.threshold)
+
+
 class CommunicationEngineServer:
     """Server side of the CommunicationEngine.
 
@@ -209,9 +431,13 @@ class CommunicationEngineServer:
         host: str,
         port: int,
         handle_request: Callable[
-            [COMMAND, str, List[BinaryIO], UUID], Tuple[str, List[str]]
+            [COMMAND, Union[str, TermGroups], List[BinaryIO], UUID],
+            Tuple[Union[str, TermGroups], List[BinaryIO]],
         ],
         handle_disconnect: Callable[[UUID], None],
+        compression: bool = True,
+        compress_files: bool = True,
+        compression_threshold: int = COMPRESSION_THRESHOLD,
     ) -> None:
         """Construct the communication engine's server.
 
@@ -220,18 +446,38 @@ class CommunicationEngineServer:
             port: The port.
             handle_request: Handles the requests of the user.
             handle_disconnect: Gets called when a user disconnects.
+            compression: Whether to accept compressing the messages
+                (per-message deflate). Compression is negotiated with
+                each client when connecting.
+            compress_files: Whether to compress the files sent (see
+                `send_files`).
+            compression_threshold: Size in bytes from which messages are
+                compressed.
         """
         self.host = host
         self.port = port
+        self.compression = compression
+        self.compress_files = compress_files
+        self.compression_threshold = compression_threshold
         self._handle_request = handle_request
         self._handle_disconnect = handle_disconnect
         self._connections = dict()
+        self._codecs = dict()
         self.credentials = dict()
 
     def listen(self) -> None:
         """Start the server on given host and port."""
         event_loop = asyncio.get_event_loop()
-        start_server = websockets.serve(self._serve, self.host, self.port)
+        start_server = websockets.serve(
+            self._serve,
+            self.host,
+            self.port,
+            subprotocols=list(SUBPROTOCOLS.values()) or None,
+            compression=None,
+            extensions=[_ServerDeflateFactory(self.compression_threshold)]
+            if self.compression
+            else None,
+        )
         event_loop.run_until_complete(start_server)
         event_loop.run_forever()
 
@@ -243,11 +489,22 @@ class CommunicationEngineServer:
         """
         self._connections[socket] = self._connections.get(socket, uuid.uuid4())
         connection = self._connections[socket]
+        version = next(
+            (
+                version
+                for version, subprotocol in SUBPROTOCOLS.items()
+                if subprotocol == socket.subprotocol
+            ),
+            VERSION,
+        )
+        codec = self._codecs[socket] = TermCodec()
 
         try:
             while True:
                 # receive the request
-                command, data, files = await self._decode(socket)
+                command, data, files, request_id = await self._decode(
+                    socket, version
+                )
                 command = COMMAND(command)  # Validate command
                 # handle the request and produce a response
                 response, response_files = self._handle_request(
@@ -260,12 +517,26 @@ class CommunicationEngineServer:
                 # send the response
                 logger.debug(
                     "Response: %s with %s files"
-                    % (response[:DEBUG_MAX], len(response_files))
+                    % (str(response)[:DEBUG_MAX], len(response_files))
                 )
+                binary = not isinstance(response, str)
+                if binary:
+                    try:
+                        response = codec.encode(response)
+                    except Exception as e:
+                        logger.error(str(e))
+                        binary, response = False, "ERROR: %s: %s" % (
+                            type(e).__name__,
+                            e,
+                        )
                 num_blocks, response = split_message(response)
                 await socket.send(
-                    encode_header(
-                        [VERSION, num_blocks, len(response_files)], LEN_HEADER
+                    encode_message_header(
+                        version,
+                        num_blocks,
+                        len(response_files),
+                        binary,
+                        request_id=request_id or 0,
                     )
                 )
                 for part in response:
@@ -275,53 +546,64 @@ class CommunicationEngineServer:
                     with tempfile.TemporaryDirectory() as temp_dir:
                         file_names = []
                         for i, file in enumerate(response_files):
-                            file_name = os.path.join(temp_dir.name, str(i))
-                            with open("wb", file_name) as tmp_file:
-                                tmp_file.write(file)
+                            file_name = os.path.join(temp_dir, str(i))
+                            with file:
+                                copy_file(file, file_name)
                             file_names.append(file_name)
-                        for part in encode_files(file_names):
-                            await socket.send(part)
+                        await send_files(
+                            socket, file_names, self.compress_files
+                        )
         except ws_exceptions.ConnectionClosedOK:
             pass
         finally:
             logger.debug("Connection %s closed!" % connection)
             del self._connections[socket]
+            del self._codecs[socket]
             self._handle_disconnect(connection)
 
     async def _decode(
-        self, socket: ServerSocket
-    ) -> Tuple[str, str, List[BinaryIO]]:
+        self, socket: ServerSocket, version: int
+    ) -> Tuple[str, Union[str, TermGroups], List[BinaryIO], Optional[int]]:
         """Get data from the user.
 
         Args:
             socket: The websocket object
+            version: The protocol version negotiated for the connection.
 
         Raises:
             NotImplementedError: Not implemented the protocol version of
                 the message. You might need to update SimPhoNy.
 
         Returns:
-            Tuple of command to execute and data
+            Tuple of command to execute, data, files and request identifier
         """
         connection = self._connections[socket]
 
         bytes_data = await socket.recv()
-        version, num_blocks, num_files, command = decode_header(
-            bytes_data, LEN_HEADER
-        )
-        if version != VERSION:
+        (
+            message_version,
+            num_blocks,
+            num_files,
+            binary,
+            request_id,
+            command,
+        ) = decode_message_header(bytes_data)
+        if message_version != version:
             raise NotImplementedError(
-                "No decode implemented for " "version %s" % version
+                "Version %s was negotiated for the connection, received "
+                "a message of version %s." % (version, message_version)
             )
         logger.debug(
             "Received data from %s.\n\t Protocol version: %s,\n\t "
             "Command: %s,\n\t Number of files: %s."
             % (connection, version, command, num_files)
         )
-        data = await join_message(socket, num_blocks)
-        logger.debug("Received data: %s" % data[:DEBUG_MAX])
+        data = await join_message(socket, num_blocks, binary)
+        if binary:
+            data = self._codecs[socket].decode(data)
+        logger.debug("Received data: %s" % str(data)[:DEBUG_MAX])
         files = await receive_files(num_files, socket)
-        return command, data, files
+        return command, data, files, request_id
 
 
 class CommunicationEngineClient:
@@ -333,46 +615,222 @@ class CommunicationEngineClient:
 
     socket: Optional[Socket] = None
 
-    def __init__(self, uri: str, handle_response: Callable[..., Any]):
+    def __init__(
+        self,
+        uri: str,
+        handle_response: Callable[..., Any],
+        compression: bool = True,
+        compress_files: bool = True,
+        compression_threshold: int = COMPRESSION_THRESHOLD,
+    ):
         """Construct the communication engine's client.
 
         Args:
             uri: WebSocket URI.
             handle_response: Handles the responses of the server.
                 Signature: str(response).
+            compression: Whether to propose compressing the messages
+                (per-message deflate) when connecting to the server.
+            compress_files: Whether to compress the files sent (see
+                `send_files`).
+            compression_threshold: Size in bytes from which messages are
+                compressed.
         """
         self.uri = uri
         self._handle_response = handle_response
+        self.compression = compression
+        self.compress_files = compress_files
+        self.compression_threshold = compression_threshold
+        # The socket is bound to the event loop of the thread that creates
+        # the client. Requests from other threads (e.g. the prefetch worker
+        # of the `InterfaceDriver`) run on the same event loop, one at a time.
+        self._event_loop = asyncio.get_event_loop()
+        self._lock = threading.Lock()
+        self._version = VERSION
+        self._codec = TermCodec()
+        # Requests waiting for a response, in the order they were sent, and
+        # whether to skip `handle_response` for them.
+        self._responses: Dict[int, Tuple[asyncio.Future, bool]] = dict()
+        # Paged queries abandoned before fetching all the pages, closed on
+        # the server along with the next request. Generators may be closed
+        # from any thread (even by the garbage collector while `_lock` is
+        # held), hence the separate reentrant lock.
+        self._closed_streams: List[int] = []
+        self._closed_streams_lock = threading.RLock()
+        # Why the connection was lost, if the receiver stopped unexpectedly.
+        self._error: Optional[Exception] = None
+        self._request_ids = count()
+        self._send_lock: Optional[asyncio.Lock] = None
+        self._receiver: Optional[asyncio.Future] = None
+
+    @property
+    def binary(self) -> bool:
+        """Whether groups of terms can be sent to the server.
+
+        Connects to the server if not connected yet, as the protocol version
+        is negotiated when connecting.
+        """
+        if self.socket is None:
+            with self._lock:
+                self._event_loop.run_until_complete(self._connect())
+        return self._version >= BINARY_VERSION
 
     def send(
         self,
         command: COMMAND,
-        data: str,
+        data: Union[str, TermGroups],
         files: Optional[Iterable[str]] = None,
     ):
         """Send a request to the server.
 
         Args:
             command: The command to execute on the server.
-            data: The data to send to the server.
+            data: The data to send to the server. Either text or, when
+                `binary` is true, groups of terms.
             files: List of file paths.
 
         Returns:
             Future: The Future’s result or raise its exception.
         """
         files = files or []
-        event_loop = asyncio.get_event_loop()
-        return event_loop.run_until_complete(
-            self._request(command, data, files)
-        )
+        with self._lock:
+            return self._event_loop.run_until_complete(
+                self._request(command, data, files)
+            )
+
+    def send_many(
+        self, requests: Iterable[Tuple[COMMAND, Union[str, TermGroups]]]
+    ) -> list:
+        """Send several requests to the server at once.
+
+        All the requests are sent before waiting for any response, so that
+        the latency of the connection is paid once. The server handles them
+        in the order they are given.
+
+        Args:
+            requests: Pairs of command and data (see `send`).
+
+        Returns:
+            The responses to the requests, in the same order.
+        """
+        with self._lock:
+            return self._event_loop.run_until_complete(
+                self._request_many(list(requests))
+            )
+
+    def stream(
+        self,
+        command: COMMAND,
+        data: TermGroups,
+        page_size: int = PAGE_SIZE,
+    ) -> Iterator[List[Optional[Node]]]:
+        """Send a query and receive the results in pages.
+
+        The server answers with the first page of results and, if there may
+        be more, the identifier of a stream from which to fetch the next
+        pages. Each page is requested while the previous one is consumed.
+        When the iterator is closed early, the stream is closed on the
+        server along with the next request.
+
+        A stream never mixes results from before and after a modification:
+        the server closes the open streams before handling any request that
+        may modify the interface, and fetching their next page then raises
+        a `RuntimeError`. The same happens to the oldest stream when too
+        many are open.
+
+        Args:
+            command: The command to execute on the server.
+            data: The groups of terms to send to the server.
+            page_size: The maximum number of triples on each page.
+
+        Yields:
+            The terms of the triples on each page.
+        """
+        with self._lock:
+            page = self._event_loop.run_until_complete(
+                self._request_many(
+                    [(command, data + [[Literal(page_size)]])], raw=True
+                )
+            )[0]
+        stream, future = None, None
+        try:
+            while True:
+                if isinstance(page, str):
+                    raise RuntimeError(page)
+                stream = int(page[1][0]) if len(page) > 1 else None
+                if stream is not None:
+                    with self._lock:
+                        future = self._event_loop.run_until_complete(
+                            self._submit(
+                                COMMAND.TRIPLES_NEXT,
+                                json.dumps({"stream": stream}),
+                                [],
+                                raw=True,
+                            )
+                        )
+                yield page[0]
+                if stream is None:
+                    break
+                with self._lock:
+                    page = self._event_loop.run_until_complete(future)
+                future = None
+        finally:
+            if future is not None:
+                # Nothing awaits the future, cancelling it does not involve
+                # the event loop (the response is discarded on arrival).
+                future.cancel()
+            if stream is not None:
+                with self._closed_streams_lock:
+                    self._closed_streams.append(stream)
 
     def close(self) -> None:
         """Close the connection to the server."""
-        event_loop = asyncio.get_event_loop()
-        event_loop.run_until_complete(self._close())
+        with self._lock:
+            self._event_loop.run_until_complete(self._close())
+
+    async def _connect(self) -> None:
+        """Connect to the server if not connected yet.
+
+        Raises:
+            ConnectionError: The connection to the server was lost. The
+                state of the session on the server is lost with it, so no
+                new connection is made.
+        """
+        if self._error is not None:
+            raise ConnectionError(
+                "The connection to the server was lost."
+            ) from self._error
+        if self.socket is None:
+            logger.debug("uri: %s" % self.uri)
+            socket = await websockets.connect(
+                self.uri,
+                subprotocols=list(SUBPROTOCOLS.values()) or None,
+                compression=None,
+                extensions=[_ClientDeflateFactory(self.compression_threshold)]
+                if self.compression
+                else None,
+            )
+            self._version = next(
+                (
+                    version
+                    for version, subprotocol in SUBPROTOCOLS.items()
+                    if subprotocol == socket.subprotocol
+                ),
+                VERSION,
+            )
+            self._codec = TermCodec()
+            self._responses = dict()
+            with self._closed_streams_lock:
+                self._closed_streams = []
+            self._send_lock = asyncio.Lock()
+            self._receiver = asyncio.ensure_future(self._receive(socket))
+            self.socket = socket
 
     async def _request(
-        self, command: COMMAND, data: str, files: List[str]
+        self,
+        command: COMMAND,
+        data: Union[str, TermGroups],
+        files: List[str],
     ) -> str:
         """Send a request to the server.
 
@@ -383,56 +841,183 @@ class CommunicationEngineClient:
         Returns:
             The response for the client.
         """
-        logger.debug(f"Request {command}: {data[:DEBUG_MAX]}")
-        if self.socket is None:
-            logger.debug("uri: %s" % self.uri)
-            self.socket = await websockets.connect(self.uri)
+        return await (await self._submit(command, data, files))
 
-        # send request to the server
-        message = self._encode(command, data, files)
-        for part in message:
-            await self.socket.send(part)
+    async def _request_many(
+        self,
+        requests: List[Tuple[COMMAND, Union[str, TermGroups]]],
+        raw: bool = False,
+    ) -> list:
+        """Send several requests before waiting for the responses."""
+        await self._connect()
+        futures = [
+            await self._submit(command, data, [], raw)
+            for command, data in requests
+        ]
+        return await asyncio.gather(*futures)
+
+    async def _submit(
+        self,
+        command: COMMAND,
+        data: Union[str, TermGroups],
+        files: List[str],
+        raw: bool = False,
+    ) -> asyncio.Future:
+        """Send a request to the server without waiting for the response.
 
-        # handle response
-        response = await self.socket.recv()
-        version, num_blocks, num_files = decode_header(response, LEN_HEADER)
-        logger.debug(
-            "Response:\n\t Protocol version: %s,\n\t "
-            "Number of blocks: %s,\n\t Number of files: %s"
-            % (version, num_blocks, num_files)
+        The requests are encoded and sent one at a time, as the groups of
+        terms are encoded relative to the previous messages. The paged
+        queries abandoned since the previous request are closed first.
+
+        Args:
+            command: The command to execute on the server.
+            data: The data to send to the server.
+            files: List of file paths.
+            raw: Whether to skip `handle_response` for the response.
+
+        Returns:
+            A future for the response.
+        """
+        logger.debug(f"Request {command}: {str(data)[:DEBUG_MAX]}")
+        await self._connect()
+        async with self._send_lock:
+            with self._closed_streams_lock:
+                closed, self._closed_streams = self._closed_streams, []
+            if closed:
+                # Nothing awaits the response, it is discarded on arrival.
+                (
+                    await self._send(
+                        COMMAND.TRIPLES_CLOSE,
+                        json.dumps({"streams": closed}),
+                        [],
+                        raw=True,
+                    )
+                ).cancel()
+            return await self._send(command, data, files, raw)
+
+    async def _send(
+        self,
+        command: COMMAND,
+        data: Union[str, TermGroups],
+        files: List[str],
+        raw: bool = False,
+    ) -> asyncio.Future:
+        """Send a request while holding the send lock (see `_submit`)."""
+        socket = self.socket
+        if socket is None:
+            # The receiver stopped while waiting for the send lock.
+            await self._connect()
+            socket = self.socket
+        request_id = next(self._request_ids) % 2 ** (
+            8 * LEN_HEADER_PIPELINED[-1]
         )
-        data = await join_message(self.socket, num_blocks)
-        logger.debug("Response data: %s" % data[:DEBUG_MAX])
-        files = await receive_files(num_files, self.socket)
-        return self._handle_response(data=data, files=files)
+        future = self._event_loop.create_future()
+        self._responses[request_id] = future, raw
+        try:
+            for part in self._encode(command, data, files, request_id):
+                await socket.send(part)
+            await send_files(socket, files, self.compress_files)
+        except Exception:
+            self._responses.pop(request_id, None)
+            raise
+        return future
+
+    async def _receive(self, socket: Socket) -> None:
+        """Receive the responses and hand them to the waiting requests.
+
+        Versions of the protocol without request identifiers answer the
+        requests in the order they were sent.
+
+        When receiving fails (e.g. the connection is lost or a response
+        cannot be decoded), the waiting requests fail, and so do the
+        following ones (see `_connect`), unless the connection was being
+        closed.
+        """
+        try:
+            while True:
+                response = await socket.recv()
+                (
+                    version,
+                    num_blocks,
+                    num_files,
+                    binary,
+                    request_id,
+                    _,
+                ) = decode_message_header(response)
+                logger.debug(
+                    "Response:\n\t Protocol version: %s,\n\t "
+                    "Number of blocks: %s,\n\t Number of files: %s"
+                    % (version, num_blocks, num_files)
+                )
+                data = await join_message(socket, num_blocks, binary)
+                if binary:
+                    data = self._codec.decode(data)
+                logger.debug("Response data: %s" % str(data)[:DEBUG_MAX])
+                files = await receive_files(num_files, socket)
+                if request_id is None:
+                    request_id = next(iter(self._responses), None)
+                future, raw = self._responses.pop(request_id, (None, False))
+                if future is None or future.done():
+                    # Nobody is waiting for the response anymore.
+                    for file in files:
+                        file.close()
+                        os.remove(file.name)
+                    continue
+                try:
+                    future.set_result(
+                        data
+                        if raw
+                        else self._handle_response(data=data, files=files)
+                    )
+                except Exception as e:
+                    future.set_exception(e)
+        except Exception as e:
+            for future, _ in self._responses.values():
+                if not future.done():
+                    future.set_exception(e)
+            self._responses.clear()
+            if self.socket is socket:
+                self._error = e
+                self.socket, self._receiver = None, None
+                await socket.close()
 
     async def _close(self):
         """Close the connection to the server."""
-        if self.socket is not None:
-            await self.socket.close()
-            self.socket = None
+        self._error = None
+        socket, receiver = self.socket, self._receiver
+        if socket is not None:
+            self.socket, self._receiver = None, None
+            await socket.close()
+            await receiver
 
     def __del__(self):
         """Close the connection on garbage collection."""
         self.close()
 
-    @staticmethod
-    def _encode(command: COMMAND, data: str, files: List[str]) -> bytes:
+    def _encode(
+        self,
+        command: COMMAND,
+        data: Union[str, TermGroups],
+        files: List[str],
+        request_id: int = 0,
+    ) -> bytes:
         """Encode the data to send to the server to bytes.
 
         Args:
             command: The command to execute.
-            data: The json data to send.
-            files: The binary data to send.
+            data: The json data or groups of terms to send.
+            files: The files to announce on the header (sent afterwards
+                using `send_files`).
+            request_id: The identifier of the request.
 
         Returns:
             bytes: The resulting data encoded
         """
-        files = files
+        binary = not isinstance(data, str)
+        if binary:
+            data = self._codec.encode(data)
         num_blocks, data = split_message(data)
-        version = VERSION
-        yield encode_header(
-            [version, num_blocks, len(files), command], LEN_HEADER
+        yield encode_message_header(
+            self._version, num_blocks, len(files), binary, command, request_id
         )
         yield from data
-        yield from encode_files(files)
@@ -4,27 +4,77 @@ import io
 import json
 import logging
 import tempfile
-from typing import BinaryIO, Callable, Dict, List, Tuple
+from itertools import chain, count, islice
+from typing import (
+    BinaryIO,
+    Callable,
+    Dict,
+    FrozenSet,
+    Iterable,
+    Iterator,
+    List,
+    Optional,
+    Tuple,
+    Union,
+)
 from uuid import UUID
 
-from rdflib import Graph, URIRef
+from rdflib import Graph, Literal, URIRef
 from rdflib.plugins.parsers.jsonld import to_rdf as json_to_rdf
+from rdflib.util import from_n3
 
 from simphony_osp.interfaces.interface import Interface
-from simphony_osp.interfaces.remote.common import COMMAND
+from simphony_osp.interfaces.remote.common import (
+    COMMAND,
+    TermGroups,
+    triples_from_terms,
+)
 from simphony_osp.interfaces.remote.engine import CommunicationEngineServer
+from simphony_osp.utils.datatypes import Pattern, Triple
 
 logger = logging.getLogger(__name__)
 
+Data = Union[str, TermGroups]
+
 
 class InterfaceServer:
     """Receives commands from a client to drive an interface."""
 
+    max_streams: int = 64
+    """Maximum number of paged queries kept open for each connection.
+
+    When exceeded, the oldest query is closed, and fetching its next page
+    fails with an error explaining why.
+    """
+
+    read_commands: FrozenSet[COMMAND] = frozenset(
+        {
+            COMMAND.TRIPLES,
+            COMMAND.TRIPLES_MANY,
+            COMMAND.TRIPLES_NEXT,
+            COMMAND.TRIPLES_CLOSE,
+            COMMAND.COUNT,
+            COMMAND.STORE_TRIPLES,
+            COMMAND.STORE_COUNT,
+            COMMAND.LOAD,
+            COMMAND.HASH,
+            COMMAND.HASATTR,
+        }
+    )
+    """Commands that do not modify the interface.
+
+    Any other command closes the open paged queries of the connection, so
+    that a query never mixes results from before and after a modification.
+    Fetching their next page fails with an error explaining why.
+    """
+
     def __init__(
         self,
         host: str,
         port: int,
         generate_interface: Callable[[str, str], Interface],
+        compression: bool = True,
+        compress_files: bool = True,
     ):
         """Initialize the server."""
         self._engine: CommunicationEngineServer = CommunicationEngineServer(
@@ -32,9 +82,18 @@ class InterfaceServer:
             port=port,
             handle_request=self.handle_request,
             handle_disconnect=self.handle_disconnect,
+            compression=compression,
+            compress_files=compress_files,
         )
         self._interfaces: Dict[UUID, Interface] = dict()
         self._directories: Dict[UUID, tempfile.TemporaryDirectory] = dict()
+        self._streams: Dict[
+            UUID, Dict[int, Tuple[Iterator[Triple], int]]
+        ] = dict()
+        self._stream_ids = count()
+        # Why the paged queries closed by the server were closed, until the
+        # client fetches their next page or closes them.
+        self._closed_streams: Dict[UUID, Dict[int, str]] = dict()
         self._interface_generator: Callable[
             [str, str], Interface
         ] = generate_interface
@@ -49,6 +108,8 @@ class InterfaceServer:
         Args:
             connection_id: The connection that has disconnected.
         """
+        self._streams.pop(connection_id, None)
+        self._closed_streams.pop(connection_id, None)
         if connection_id in self._interfaces:
             self._interfaces[connection_id].close()
             del self._interfaces[connection_id]
@@ -61,12 +122,16 @@ class InterfaceServer:
     def handle_request(
         self,
         command: COMMAND,
-        data: str,
+        data: Data,
         files: List[BinaryIO],
         connection_id: UUID,
-    ) -> Tuple[str, list]:
+    ) -> Tuple[Data, list]:
         """Handle requests from the client."""
         try:
+            if command not in self.read_commands:
+                self._close_streams(
+                    connection_id, "the interface was modified"
+                )
             if command == COMMAND.OPEN:
                 response = self._open(data, connection_id)
             elif command == COMMAND.CLOSE:
@@ -81,6 +146,14 @@ class InterfaceServer:
                 response = self._add(data, connection_id)
             elif command == COMMAND.TRIPLES:
                 response = self._triples(data, connection_id)
+            elif command == COMMAND.TRIPLES_MANY:
+                response = self._triples_many(data, connection_id)
+            elif command == COMMAND.TRIPLES_NEXT:
+                response = self._triples_next(data, connection_id)
+            elif command == COMMAND.TRIPLES_CLOSE:
+                response = self._triples_close(data, connection_id)
+            elif command == COMMAND.COUNT:
+                response = self._count(data, connection_id)
             elif command == COMMAND.REMOVE:
                 response = self._remove(data, connection_id)
             elif command == COMMAND.SAVE:
@@ -101,6 +174,8 @@ class InterfaceServer:
                 response = self._store_add(data, connection_id)
             elif command == COMMAND.STORE_TRIPLES:
                 response = self._store_triples(data, connection_id)
+            elif command == COMMAND.STORE_COUNT:
+                response = self._store_count(data, connection_id)
             elif command == COMMAND.STORE_REMOVE:
                 response = self._store_remove(data, connection_id)
             elif command == COMMAND.STORE_COMMIT:
@@ -111,7 +186,7 @@ class InterfaceServer:
                 response = self._authenticate(data, connection_id)
             else:
                 response = "ERROR: Invalid command", []
-            if isinstance(response, str):
+            if not isinstance(response, tuple):
                 response = response, []
             return response
         except Exception as e:
@@ -148,30 +223,65 @@ class InterfaceServer:
         interface.compute(**kwargs)
         return json.dumps({COMMAND.COMPUTE: None})
 
-    def _add(self, data: str, connection_id: UUID) -> str:
+    def _add(self, data: Data, connection_id: UUID) -> str:
         interface = self._interfaces[connection_id]
+        if not isinstance(data, str):
+            result = self._add_many(interface, triples_from_terms(data[0]))
+            return json.dumps({COMMAND.ADD: result})
         graph = json_to_rdf(json.loads(data), Graph())
-        for triple in graph:
-            interface.add(triple)
+        self._add_many(interface, graph)
         return json.dumps({COMMAND.ADD: None})
 
-    def _remove(self, data: str, connection_id: UUID) -> str:
+    @staticmethod
+    def _add_many(
+        interface: Interface, triples: Iterable[Triple]
+    ) -> List[bool]:
+        triples = list(triples)
+        if hasattr(interface, "add_many"):
+            return list(interface.add_many(triples))
+        return [interface.add(triple) for triple in triples]
+
+    @staticmethod
+    def _remove_many(
+        interface: Interface, patterns: List[Pattern]
+    ) -> Dict[Pattern, Iterable[Triple]]:
+        if hasattr(interface, "remove_many"):
+            return interface.remove_many(patterns)
+        return {pattern: interface.remove(pattern) for pattern in patterns}
+
+    def _remove(self, data: Data, connection_id: UUID) -> Data:
         interface = self._interfaces[connection_id]
+        if not isinstance(data, str):
+            patterns = [tuple(pattern) for pattern in data]
+            result = self._remove_many(interface, patterns)
+            return [
+                list(chain.from_iterable(result.get(pattern, ())))
+                for pattern in patterns
+            ]
         pattern = next(
             tuple(x if x != URIRef("none:None") else None for x in triple)
             for triple in Graph().parse(io.StringIO(data), format="turtle")
         )
         graph = Graph()
-        graph.addN((s, p, o, graph) for s, p, o in interface.remove(pattern))
+        graph.addN(
+            (s, p, o, graph)
+            for s, p, o in self._remove_many(interface, [pattern]).get(
+                pattern, ()
+            )
+        )
         return (
             f"{{"
-            f'"{COMMAND.REMOVE}": '
+            f'"{COMMAND.REMOVE.value}": '
             f'{graph.serialize(format="json-ld")}'
             f"}}"
         )
 
-    def _triples(self, data: str, connection_id: UUID) -> str:
+    def _triples(self, data: Data, connection_id: UUID) -> Data:
         interface = self._interfaces[connection_id]
+        if not isinstance(data, str):
+            return self._page(
+                interface.triples(tuple(data[0])), data, connection_id
+            )
         pattern = next(
             tuple(x if x != URIRef("none:None") else None for x in triple)
             for triple in Graph().parse(io.StringIO(data), format="turtle")
@@ -180,11 +290,142 @@ class InterfaceServer:
         graph.addN((s, p, o, graph) for s, p, o in interface.triples(pattern))
         return (
             f"{{"
-            f'"{COMMAND.TRIPLES}": '
+            f'"{COMMAND.TRIPLES.value}": '
             f'{graph.serialize(format="json-ld")}'
             f"}}"
         )
 
+    def _triples_next(self, data: str, connection_id: UUID) -> TermGroups:
+        data = json.loads(data)
+        return self._next_page(data["stream"], connection_id)
+
+    def _triples_close(self, data: str, connection_id: UUID) -> str:
+        data = json.loads(data)
+        streams = self._streams.get(connection_id, dict())
+        closed = self._closed_streams.get(connection_id, dict())
+        for stream in data["streams"]:
+            streams.pop(stream, None)
+            closed.pop(stream, None)
+        return json.dumps({COMMAND.TRIPLES_CLOSE: None})
+
+    def _page(
+        self, triples: Iterable[Triple], data: TermGroups, connection_id: UUID
+    ) -> TermGroups:
+        """Answer a query, with the first page of results if requested.
+
+        Paged queries carry the page size as an additional group of terms.
+        When there may be more results than fit in the page, the identifier
+        of a stream from which to fetch the next pages (see
+        `COMMAND.TRIPLES_NEXT`) is appended to the response.
+        """
+        if len(data) < 2:
+            return [list(chain.from_iterable(triples))]
+        streams = self._streams.setdefault(connection_id, dict())
+        if len(streams) >= self.max_streams:
+            self._close_streams(
+                connection_id,
+                f"more than {self.max_streams} queries were open",
+                [next(iter(streams))],
+            )
+        stream = next(self._stream_ids)
+        streams[stream] = iter(triples), int(data[1][0])
+        return self._next_page(stream, connection_id)
+
+    def _close_streams(
+        self,
+        connection_id: UUID,
+        reason: str,
+        streams: Optional[Iterable[int]] = None,
+    ) -> None:
+        """Close open paged queries, remembering why they were closed.
+
+        Args:
+            connection_id: The connection the queries belong to.
+            reason: Why the queries are closed.
+            streams: The queries to close. All the open queries of the
+                connection by default.
+        """
+        open_streams = self._streams.get(connection_id)
+        if not open_streams:
+            return
+        closed = self._closed_streams.setdefault(connection_id, dict())
+        for stream in list(open_streams if streams is None else streams):
+            del open_streams[stream]
+            closed[stream] = reason
+
+    def _next_page(self, stream: int, connection_id: UUID) -> TermGroups:
+        streams = self._streams.get(connection_id, dict())
+        if stream not in streams:
+            reason = self._closed_streams.get(connection_id, dict()).pop(
+                stream, None
+            )
+            if reason is not None:
+                raise RuntimeError(
+                    "Query %s was closed because %s." % (stream, reason)
+                )
+            raise KeyError("Query %s is closed." % stream)
+        triples, page_size = streams[stream]
+        page = list(chain.from_iterable(islice(triples, page_size)))
+        if len(page) < 3 * page_size:
+            del streams[stream]
+            return [page]
+        return [page, [Literal(stream)]]
+
+    def _triples_many(self, data: Data, connection_id: UUID) -> Data:
+        interface = self._interfaces[connection_id]
+        if not isinstance(data, str):
+            patterns = [tuple(pattern) for pattern in data]
+        else:
+            patterns = [
+                tuple(from_n3(x) if x is not None else None for x in pattern)
+                for pattern in json.loads(data)
+            ]
+        if hasattr(interface, "triples_many"):
+            result = interface.triples_many(patterns)
+        else:
+            result = {
+                pattern: interface.triples(pattern) for pattern in patterns
+            }
+        if not isinstance(data, str):
+            return [
+                list(chain.from_iterable(result.get(pattern, ())))
+                for pattern in patterns
+            ]
+        graphs = []
+        for pattern in patterns:
+            graph = Graph()
+            graph.addN((s, p, o, graph) for s, p, o in result.get(pattern, ()))
+            graphs.append(graph.serialize(format="json-ld"))
+        return (
+            f"{{"
+            f'"{COMMAND.TRIPLES_MANY.value}": '
+            f'[{", ".join(graphs)}]'
+            f"}}"
+        )
+
+    def _count(self, data: Data, connection_id: UUID) -> str:
+        interface = self._interfaces[connection_id]
+        pattern = self._count_pattern(data)
+        if hasattr(interface, "count"):
+            count = interface.count(pattern)
+        elif hasattr(interface, "triples"):
+            count = sum(1 for _ in interface.triples(pattern))
+        else:
+            count = sum(1 for _ in interface.base.triples(pattern))
+        return json.dumps({COMMAND.COUNT: count})
+
+    @staticmethod
+    def _count_pattern(data: Data) -> Pattern:
+        """Read the pattern to count, matching all triples if missing."""
+        if not isinstance(data, str):
+            return tuple(data[0])
+        if not data:
+            return None, None, None
+        return next(
+            tuple(x if x != URIRef("none:None") else None for x in triple)
+            for triple in Graph().parse(io.StringIO(data), format="turtle")
+        )
+
     def _save(
         self, data: str, files: List[BinaryIO], connection_id: UUID
     ) -> str:
@@ -224,7 +465,7 @@ class InterfaceServer:
 
     def _hash(self, data: str, connection_id: UUID) -> str:
         interface = self._interfaces[connection_id]
-        if hasattr(interface, "delete"):
+        if hasattr(interface, "hash"):
             data = json.loads(data)
             key = data["key"]
             file_hash = interface.hash(key)
@@ -257,24 +498,36 @@ class InterfaceServer:
         interface.base.close(**data)
         return json.dumps({COMMAND.STORE_CLOSE: None})
 
-    def _store_add(self, data: str, connection_id: UUID) -> str:
+    def _store_add(self, data: Data, connection_id: UUID) -> str:
         interface = self._interfaces[connection_id]
-        graph = json_to_rdf(json.loads(data), Graph())
+        graph = (
+            triples_from_terms(data[0])
+            if not isinstance(data, str)
+            else json_to_rdf(json.loads(data), Graph())
+        )
         interface.base.addN((s, p, o, interface.base) for s, p, o in graph)
         return json.dumps({COMMAND.STORE_ADD: None})
 
-    def _store_remove(self, data: str, connection_id: UUID) -> str:
+    def _store_remove(self, data: Data, connection_id: UUID) -> str:
         interface = self._interfaces[connection_id]
         patterns = (
-            tuple(x if x != URIRef("none:None") else None for x in triple)
-            for triple in Graph().parse(io.StringIO(data), format="turtle")
+            triples_from_terms(data[0])
+            if not isinstance(data, str)
+            else (
+                tuple(x if x != URIRef("none:None") else None for x in triple)
+                for triple in Graph().parse(io.StringIO(data), format="turtle")
+            )
         )
         for pattern in patterns:
             interface.base.remove(pattern)
         return json.dumps({COMMAND.REMOVE: None})
 
-    def _store_triples(self, data: str, connection_id: UUID) -> str:
+    def _store_triples(self, data: Data, connection_id: UUID) -> Data:
         interface = self._interfaces[connection_id]
+        if not isinstance(data, str):
+            return self._page(
+                interface.base.triples(tuple(data[0])), data, connection_id
+            )
         pattern = next(
             tuple(x if x != URIRef("none:None") else None for x in triple)
             for triple in Graph().parse(io.StringIO(data), format="turtle")
@@ -285,11 +538,20 @@ class InterfaceServer:
         )
         return (
             f"{{"
-            f'"{COMMAND.STORE_TRIPLES}": '
+            f'"{COMMAND.STORE_TRIPLES.value}": '
             f'{graph.serialize(format="json-ld")}'
             f"}}"
         )
 
+    def _store_count(self, data: Data, connection_id: UUID) -> str:
+        interface = self._interfaces[connection_id]
+        pattern = self._count_pattern(data)
+        if pattern == (None, None, None):
+            count = len(interface.base)
+        else:
+            count = sum(1 for _ in interface.base.triples(pattern))
+        return json.dumps({COMMAND.STORE_COUNT: count})
+
     def _store_commit(self, data: str, connection_id: UUID) -> str:
         interface = self._interfaces[connection_id]
         interface.base.commit()
@@ -1,11 +1,22 @@
 """Interface between the SimPhoNy OSP and SQLAlchemy."""
 
+import logging
 from typing import Dict, Optional
 
 from rdflib import Graph, URIRef
 from rdflib.term import Identifier
 
 from simphony_osp.interfaces.interface import BufferType, Interface
+from simphony_osp.utils.datatypes import Pattern
+
+# Counting with a `COUNT` query relies on internals of `rdflib-sqlalchemy`.
+try:
+    from rdflib_sqlalchemy.constants import COUNT_SELECT
+    from rdflib_sqlalchemy.sql import union_select
+except ImportError:  # pragma: no cover
+    COUNT_SELECT, union_select = None, None
+
+logger = logging.getLogger(__name__)
 
 
 class SQLAlchemy(Interface):
@@ -29,6 +40,8 @@ class SQLAlchemy(Interface):
 
     entity_tracking: bool = False
 
+    partial_commits: bool = True
+
     def open(self, configuration: str, create: bool = False):
         """Open a connection to the database.
 
@@ -64,4 +77,34 @@ class SQLAlchemy(Interface):
         """The base graph does not need to be populated. Nothing to do."""
         pass
 
+    def count(self, pattern: Pattern) -> int:
+        """Count the triples matching a pattern using a `COUNT` query."""
+        return count_triples(self.base, pattern)
+
     # ↑ ----- ↑
+
+
+def count_triples(graph: Graph, pattern: Pattern) -> int:
+    """Count the triples of an `rdflib-sqlalchemy` graph matching a pattern.
+
+    The triples are counted by the database, without retrieving them. The
+    `COUNT` query is built using internals of `rdflib-sqlalchemy`. When
+    they are not available (e.g. they changed on a newer version), the
+    triples are retrieved and counted one by one instead.
+
+    Args:
+        graph: A graph backed by the `rdflib-sqlalchemy` store.
+        pattern: The pattern whose matching triples are counted.
+    """
+    if pattern == (None, None, None):
+        return len(graph)
+    store = graph.store
+    try:
+        query = union_select(
+            store._triples_helper(pattern, graph), select_type=COUNT_SELECT
+        )
+    except (AttributeError, TypeError) as exception:
+        logger.debug(f"Counting the triples one by one: {exception}")
+        return sum(1 for _ in graph.triples(pattern))
+    with store.engine.connect() as connection:
+        return sum(row[0] for row in connection.execute(query))
@@ -7,12 +7,11 @@ from typing import BinaryIO
 from rdflib.term import URIRef
 
 from simphony_osp.ontology.operations import Operations
+from simphony_osp.utils.other import copy_file
 from simphony_osp.utils.simphony_namespace import simphony_namespace
 
 logger = logging.getLogger(__name__)
 
-buf_size = 1024
-
 
 class File(Operations):
     """Actions for ontology individuals representing a file."""
@@ -57,11 +56,7 @@ class File(Operations):
         """Download the file."""
         if self._session.driver is not None:
             with self._session.driver.load(self._identifier) as file:
-                with open(path, "wb") as new_file:
-                    data = True
-                    while data:
-                        data = file.read(buf_size)
-                        new_file.write(data)
+                copy_file(file, path)
         else:
             raise FileNotFoundError(
                 "This session does not support file storage. Unable to "
@@ -79,6 +74,22 @@ class File(Operations):
                 "retrieve the file contents."
             )
 
+    @property
+    def mapped_handle(self) -> BinaryIO:
+        """Get a read-only memory-mapped file handle.
+
+        The contents are read on demand instead of being copied to memory.
+        Falls back to a regular file handle when the file is not stored
+        locally.
+        """
+        if self._session.driver is not None:
+            return self._session.driver.load(self._identifier, memory_map=True)
+        else:
+            raise FileNotFoundError(
+                "This session does not support file storage. Unable to "
+                "retrieve the file contents."
+            )
+
     def overwrite(self, contents: BinaryIO) -> None:
         """Overwrite the file contents with a byte stream."""
         if self._session.driver is not None:
@@ -3,6 +3,7 @@ from __future__ import annotations
 
 import itertools
 import logging
+from concurrent.futures import Future
 from datetime import datetime
 from functools import lru_cache, wraps
 from inspect import isclass
@@ -54,7 +55,12 @@ from simphony_osp.utils.datatypes import (
 logger = logging.getLogger(__name__)
 
 if TYPE_CHECKING:
-    from simphony_osp.interfaces.interface import Interface, InterfaceDriver
+    from simphony_osp.interfaces.interface import (
+        ComputeJob,
+        Interface,
+        InterfaceDriver,
+    )
+    from simphony_osp.interfaces.remote.client import RemoteStoreClient
 
 ENTITY = TypeVar("ENTITY", bound=OntologyEntity)
 
@@ -451,28 +457,72 @@ class Session(Environment):
     Python (string representation of the session). It has no other effect.
     """
 
-    def commit(self) -> None:
-        """Commit pending changes to the session's graph."""
-        self._graph.commit()
+    def commit(self, chunk_size: Optional[int] = None) -> None:
+        """Commit pending changes to the session's graph.
+
+        Args:
+            chunk_size: For sessions attached to a wrapper, commit the
+                changes in chunks of approximately this number of triples,
+                bounding the memory needed to commit large transactions.
+                Only wrappers supporting partial commits honor it. See the
+                docstring of `InterfaceDriver.commit` for details.
+        """
+        if self._driver is not None and chunk_size is not None:
+            self._driver.commit(chunk_size=chunk_size)
+        else:
+            self._graph.commit()
         # if self.ontology is not self:
         #    self.ontology.commit()
         self.creation_set = set()
 
-    def compute(self, **kwargs) -> None:
-        """Run simulations on supported graph stores."""
-        from simphony_osp.interfaces.remote.client import RemoteStoreClient
+    def commit_async(self, chunk_size: Optional[int] = None) -> Future:
+        """Commit pending changes to the session's graph in the background.
+
+        For sessions attached to a wrapper, the changes are committed on a
+        background thread while the session remains usable. See the
+        docstring of `InterfaceDriver.commit_async` for details. Other
+        sessions commit right away.
+
+        Args:
+            chunk_size: See the docstring of `commit`.
 
+        Returns:
+            A future that resolves when the changes are committed.
+        """
         if self._driver is not None:
-            self.commit()
-            self._driver.compute(**kwargs)
-        elif isinstance(self._graph.store, RemoteStoreClient):
-            self._graph.store.execute_method("compute")
+            future = self._driver.commit_async(chunk_size=chunk_size)
         else:
-            raise AttributeError(
-                f"Session {self} is not attached to a "
-                f"simulation engine. Thus, the attribute "
-                f"`compute` is not available."
-            )
+            future = Future()
+            try:
+                self.commit(chunk_size=chunk_size)
+            except Exception as exception:
+                future.set_exception(exception)
+            else:
+                future.set_result(None)
+        self.creation_set = set()
+        return future
+
+    def compute_async(self, **kwargs) -> ComputeJob:
+        """Run simulations on a background thread.
+
+        Only available for sessions attached to a wrapper or to a remote
+        store. The pending changes are committed first. See the docstring
+        of `InterfaceDriver.compute_async` for details.
+
+        Returns:
+            A handle on the simulation, offering its status, progress,
+            cancellation and a way to wait for it to finish.
+        """
+        # The driver commits the pending changes before computing.
+        job = self._compute_store("compute_async").compute_async(**kwargs)
+        self.creation_set = set()
+        return job
+
+    def compute(self, **kwargs) -> None:
+        """Run simulations on supported graph stores."""
+        store = self._compute_store("compute")
+        self.commit()
+        store.compute(**kwargs)
 
     def close(self) -> None:
         """Close the connection to the session's backend.
@@ -1735,6 +1785,49 @@ class Session(Environment):
             if not entity_triples_exist:
                 self.creation_set.add(identifier)
 
+    def _compute_store(
+        self, method: str
+    ) -> Union[InterfaceDriver, RemoteStoreClient]:
+        """Get the store running the simulations of the session.
+
+        Args:
+            method: Name of the method requesting the store, for the error
+                message.
+
+        Raises:
+            AttributeError: The session is not attached to a simulation
+                engine.
+        """
+        from simphony_osp.interfaces.remote.client import RemoteStoreClient
+
+        if self._driver is not None:
+            return self._driver
+        elif isinstance(self._graph.store, RemoteStoreClient):
+            return self._graph.store
+        raise AttributeError(
+            f"Session {self} is not attached to a "
+            f"simulation engine. Thus, the attribute "
+            f"`{method}` is not available."
+        )
+
+    def _rebase(self, base: Graph) -> None:
+        """Point the session to another graph.
+
+        Lets SimPhoNy reuse a session on a different graph (or on the same
+        graph after it changed) instead of creating a new one. The state
+        tied to the previous graph is discarded. Not meant to be used with
+        ontology sessions.
+
+        Args:
+            base: The graph to base the session on. It must be open already.
+        """
+        self._graph_writable = base
+        self._graph = base
+        self._entity_cache = dict()
+        self.entity_cache_timestamp = datetime.now()
+        self.creation_set = set()
+        self._storing = list()
+
 
 class QueryResult(SPARQLResult):
     """SPARQL query result."""
@@ -1,11 +1,17 @@
 """A user-facing class creating a session using a specific interface."""
 
 from abc import ABC, abstractmethod
+from concurrent.futures import Future
 from typing import Iterable, Optional, Type, Union
 
 from rdflib import Graph
 
-from simphony_osp.interfaces.interface import Interface, InterfaceDriver
+from simphony_osp.interfaces.interface import (
+    CachePolicy,
+    ComputeJob,
+    Interface,
+    InterfaceDriver,
+)
 from simphony_osp.ontology.entity import OntologyEntity
 from simphony_osp.ontology.operations.container import Container
 from simphony_osp.session.session import Session
@@ -42,9 +48,26 @@ class Wrapper:
             self._exit_container = False
         self._session.__exit__(*args)
 
-    def commit(self) -> None:
-        """Commit the changes made to the backend."""
-        return self._session.commit()
+    def commit(self, chunk_size: Optional[int] = None) -> None:
+        """Commit the changes made to the backend.
+
+        Args:
+            chunk_size: Commit the changes in chunks of approximately this
+                number of triples (only if the wrapper supports it).
+        """
+        return self._session.commit(chunk_size=chunk_size)
+
+    def commit_async(self, chunk_size: Optional[int] = None) -> Future:
+        """Commit the changes made to the backend in the background.
+
+        Args:
+            chunk_size: Commit the changes in chunks of approximately this
+                number of triples (only if the wrapper supports it).
+
+        Returns:
+            A future that resolves when the changes are committed.
+        """
+        return self._session.commit_async(chunk_size=chunk_size)
 
     def close(self) -> None:
         """Close the connection to the backend."""
@@ -62,6 +85,10 @@ class Wrapper:
         """Instructs the backend to run a simulation if supported."""
         return self._session.compute(*args, **kwargs)
 
+    def compute_async(self, *args, **kwargs) -> ComputeJob:
+        """Instructs the backend to run a simulation in the background."""
+        return self._session.compute_async(*args, **kwargs)
+
 
 class WrapperSpawner(ABC, Session):
     """A user-facing class for spawning a session."""
@@ -77,6 +104,7 @@ class WrapperSpawner(ABC, Session):
         configuration_string: str = "",
         create: bool = False,
         ontology: Optional[Union[Session, bool]] = None,
+        cache_policy: Optional[Union[str, CachePolicy]] = None,
         **kwargs: Union[
             str,
             int,
@@ -90,10 +118,17 @@ class WrapperSpawner(ABC, Session):
 
         Creates an interface and a store using that interface. Then
         initialize the session using such store.
+
+        The `cache_policy` keyword argument selects the policy of the
+        triple cache (only relevant for interfaces with caching enabled).
+        It may be either a `CachePolicy` instance or one of the names
+        `lru`, `lfu` and `ttl`.
         """
         interface_class = cls._get_interface()
         interface_instance = interface_class(**kwargs)
-        store = InterfaceDriver(interface=interface_instance)
+        store = InterfaceDriver(
+            interface=interface_instance, cache_policy=cache_policy
+        )
         graph = Graph(store=store)
         graph.open(configuration_string, create=create)
         session = Session(base=graph, driver=store, ontology=ontology)
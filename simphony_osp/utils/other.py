@@ -1,6 +1,14 @@
 """Utilities that do not fit in the other categories."""
 
-from typing import Any, Iterator
+import hashlib
+import mmap
+import os
+import shutil
+from pathlib import Path
+from typing import Any, BinaryIO, Iterator, Optional, Union
+
+file_chunk_size = 1 << 20
+"""Size of the chunks in which file contents are streamed (in bytes)."""
 
 
 def take(iterator: Iterator, amount: int) -> Any:
@@ -18,3 +26,143 @@ def take(iterator: Iterator, amount: int) -> Any:
             yield next(iterator)
         except StopIteration:
             break
+
+
+def copy_file(
+    source: BinaryIO, destination: Union[str, Path], link: bool = False
+) -> None:
+    """Copy the remaining contents of a file handle to a path.
+
+    When the handle is backed by a local file, the contents are copied by
+    the kernel (`copy_file_range`, which may share the data blocks on
+    filesystems supporting reflinks, or `sendfile`) without passing
+    through Python. Otherwise, they are streamed in chunks of
+    `file_chunk_size` bytes.
+
+    Args:
+        source: The file handle to copy from.
+        destination: The path to copy to.
+        link: Create a hard link to the file backing the handle instead of
+            copying it if possible. Then changes made to either file are
+            visible on both.
+    """
+    fileno = _fileno(source)
+    if fileno is not None:
+        offset = source.tell()
+        name = getattr(source, "name", None)
+        if link and offset == 0 and isinstance(name, (str, Path)):
+            try:
+                if os.path.samestat(os.stat(name), os.fstat(fileno)):
+                    os.link(name, destination)
+                    return
+            except OSError:
+                pass
+        with open(destination, "wb") as target:
+            if _kernel_copy(fileno, target.fileno(), offset):
+                source.seek(0, os.SEEK_END)
+                return
+    with open(destination, "wb") as target:
+        shutil.copyfileobj(source, target, file_chunk_size)
+
+
+def hash_file(file: BinaryIO) -> Optional[str]:
+    """Compute the SHA-256 hash of the remaining contents of a file handle.
+
+    The contents are streamed in chunks of `file_chunk_size` bytes, and the
+    position of the handle is restored afterwards.
+
+    Returns:
+        The hexadecimal digest of the contents, or `None` when the handle
+        is not seekable.
+    """
+    try:
+        if not file.seekable():
+            return None
+        position = file.tell()
+    except (AttributeError, OSError, ValueError):
+        return None
+    result = hashlib.sha256()
+    for chunk in iter(lambda: file.read(file_chunk_size), b""):
+        result.update(chunk)
+    file.seek(position)
+    return result.hexdigest()
+
+
+def copy_hash_file(source: BinaryIO, destination: Union[str, Path]) -> str:
+    """Copy the remaining contents of a file handle to a path, hashing them.
+
+    The contents are streamed in chunks of `file_chunk_size` bytes, which
+    are hashed as they are written, so that they are read only once.
+
+    Returns:
+        The hexadecimal digest of the SHA-256 hash of the contents.
+    """
+    result = hashlib.sha256()
+    with open(destination, "wb") as target:
+        for chunk in iter(lambda: source.read(file_chunk_size), b""):
+            result.update(chunk)
+            target.write(chunk)
+    return result.hexdigest()
+
+
+def map_file(file: BinaryIO) -> BinaryIO:
+    """Memory-map a file handle for reading.
+
+    The contents are then read from the page cache on demand instead of
+    being copied. The handle is returned as is when it is not backed by a
+    local file or the file is empty.
+    """
+    fileno = _fileno(file)
+    if fileno is None:
+        return file
+    try:
+        mapped = mmap.mmap(fileno, 0, access=mmap.ACCESS_READ)
+    except (OSError, ValueError):
+        return file
+    mapped.seek(file.tell())
+    file.close()
+    return mapped
+
+
+def _fileno(file: BinaryIO) -> Optional[int]:
+    """File descriptor backing a file handle, if any."""
+    try:
+        return file.fileno()
+    except (AttributeError, OSError, ValueError):
+        return None
+
+
+def _kernel_copy(source: int, destination: int, offset: int) -> bool:
+    """Copy a file from an offset between file descriptors in the kernel.
+
+    Returns:
+        Whether the file could be copied.
+    """
+    size = os.fstat(source).st_size - offset
+    for method in ("copy_file_range", "sendfile"):
+        if not hasattr(os, method):
+            continue
+        copied = 0
+        try:
+            while copied < size:
+                if method == "copy_file_range":
+                    sent = os.copy_file_range(
+                        source,
+                        destination,
+                        size - copied,
+                        offset + copied,
+                    )
+                else:
+                    sent = os.sendfile(
+                        destination, source, offset + copied, size - copied
+                    )
+                if sent == 0:
+                    break
+                copied += sent
+        except OSError:
+            if copied:
+                os.lseek(destination, 0, os.SEEK_SET)
+                os.ftruncate(destination, 0)
+            continue
+        return True
+    return False
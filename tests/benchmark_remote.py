@@ -0,0 +1,205 @@
+"""Test the throughput of the remote wrapper on a local loopback server."""
+
+import multiprocessing
+import os
+import socket
+import time
+from tempfile import NamedTemporaryFile, TemporaryDirectory
+from unittest import mock
+
+from simphony_osp.interfaces.remote.client import RemoteInterface
+from simphony_osp.ontology.namespace import OntologyNamespace
+from simphony_osp.ontology.parser import OntologyParser
+from simphony_osp.session import Session
+from simphony_osp.session.wrapper import Wrapper
+from simphony_osp.tools import host
+from simphony_osp.wrappers import Dataspace, Remote
+
+from .benchmark import Benchmark
+
+DEFAULT_SIZE = 50
+HOSTNAME = "127.0.0.1"
+PORT = 4746
+FILE_SIZE = 2**20
+
+
+class RemoteBenchmark(Benchmark):
+    """Base class for the benchmarks of the remote wrapper.
+
+    Hosts a dataspace wrapper on a local loopback server and connects to it.
+    """
+
+    compression: bool = True
+
+    ontology: Session
+    prev_default_ontology: Session
+    city: OntologyNamespace
+    directory: TemporaryDirectory
+    server: multiprocessing.Process
+    wrapper: Wrapper
+
+    def _benchmark_set_up(self):
+        """Create a TBox, start the server and connect to it.
+
+        The new TBox contains SIMPHONY, OWL, RDFS and City.
+        """
+        self.ontology = Session(identifier="test-tbox", ontology=True)
+        self.ontology.load_parser(OntologyParser.get_parser("city"))
+        self.prev_default_ontology = Session.default_ontology
+        Session.default_ontology = self.ontology
+
+        from simphony_osp.namespaces import city
+
+        self.city = city
+
+        self.directory = TemporaryDirectory()
+        self.server = multiprocessing.Process(
+            target=host,
+            args=(Dataspace, self.directory.name, True),
+            kwargs={"hostname": HOSTNAME, "port": PORT},
+        )
+        self.server.start()
+        for _ in range(1000):
+            with socket.socket() as s:
+                if s.connect_ex((HOSTNAME, PORT)) == 0:
+                    break
+            time.sleep(0.1)
+        with mock.patch.object(
+            RemoteInterface, "compression", self.compression
+        ):
+            self.wrapper = Remote(f"ws://{HOSTNAME}:{PORT}")
+
+    def _benchmark_tear_down(self):
+        """Disconnect, stop the server and restore the previous TBox."""
+        self.wrapper.close()
+        self.server.terminate()
+        self.server.join()
+        self.directory.cleanup()
+        Session.default_ontology = self.prev_default_ontology
+
+
+class RemoteCommit(RemoteBenchmark):
+    """Benchmark committing new individuals to the remote side."""
+
+    def _benchmark_iterate(self, iteration: int = None):
+        for i in range(100):
+            self.city.Citizen(
+                session=self.wrapper, name=f"citizen {iteration} {i}", age=i
+            )
+        self.wrapper.commit()
+
+
+class RemoteCommitUncompressed(RemoteCommit):
+    """Benchmark committing new individuals without compression."""
+
+    compression = False
+
+
+def benchmark_remote_commit(benchmark):
+    """Wrapper function for the RemoteCommit benchmark."""
+    return RemoteCommit.iterate_pytest_benchmark(benchmark, size=DEFAULT_SIZE)
+
+
+def benchmark_remote_commit_uncompressed(benchmark):
+    """Wrapper function for the RemoteCommitUncompressed benchmark."""
+    return RemoteCommitUncompressed.iterate_pytest_benchmark(
+        benchmark, size=DEFAULT_SIZE
+    )
+
+
+class RemoteTriples(RemoteBenchmark):
+    """Benchmark fetching all the triples from the remote side."""
+
+    def _benchmark_set_up(self):
+        """Commit some individuals to the remote side."""
+        super()._benchmark_set_up()
+        for i in range(2000):
+            self.city.Citizen(session=self.wrapper, name=f"citizen {i}", age=i)
+        self.wrapper.commit()
+
+    def _benchmark_iterate(self, iteration: int = None):
+        self.wrapper.driver.cache_clear()
+        for _ in self.wrapper.graph:
+            pass
+
+
+class RemoteTriplesUncompressed(RemoteTriples):
+    """Benchmark fetching all the triples without compression."""
+
+    compression = False
+
+
+def benchmark_remote_triples(benchmark):
+    """Wrapper function for the RemoteTriples benchmark."""
+    return RemoteTriples.iterate_pytest_benchmark(benchmark, size=DEFAULT_SIZE)
+
+
+def benchmark_remote_triples_uncompressed(benchmark):
+    """Wrapper function for the RemoteTriplesUncompressed benchmark."""
+    return RemoteTriplesUncompressed.iterate_pytest_benchmark(
+        benchmark, size=DEFAULT_SIZE
+    )
+
+
+class RemoteFiles(RemoteBenchmark):
+    """Benchmark sending a text file to the remote side and back."""
+
+    def _content(self) -> bytes:
+        line = b"<http://example.org/s> <http://example.org/p> %d .\n"
+        content = b"".join(line % i for i in range(FILE_SIZE // len(line)))
+        return content.ljust(FILE_SIZE, b"\n")
+
+    def _benchmark_set_up(self):
+        """Write the file to send."""
+        super()._benchmark_set_up()
+        with NamedTemporaryFile("wb", delete=False) as file:
+            file.write(self._content())
+        self.file = file.name
+
+    def _benchmark_iterate(self, iteration: int = None):
+        interface = self.wrapper.driver.interface
+        with open(self.file, "rb") as file:
+            interface.save(f"file-{iteration}", file)
+        with interface.load(f"file-{iteration}") as file:
+            file.read()
+
+    def _benchmark_tear_down(self):
+        """Remove the file to send."""
+        super()._benchmark_tear_down()
+        os.remove(self.file)
+
+
+class RemoteFilesUncompressed(RemoteFiles):
+    """Benchmark sending a text file without compression."""
+
+    compression = False
+
+
+class RemoteFilesIncompressible(RemoteFiles):
+    """Benchmark sending a file that does not compress (random bytes)."""
+
+    def _content(self) -> bytes:
+        return os.urandom(FILE_SIZE)
+
+
+def benchmark_remote_files(benchmark):
+    """Wrapper function for the RemoteFiles benchmark."""
+    return RemoteFiles.iterate_pytest_benchmark(benchmark, size=DEFAULT_SIZE)
+
+
+def benchmark_remote_files_uncompressed(benchmark):
+    """Wrapper function for the RemoteFilesUncompressed benchmark."""
+    return RemoteFilesUncompressed.iterate_pytest_benchmark(
+        benchmark, size=DEFAULT_SIZE
+    )
+
+
+def benchmark_remote_files_incompressible(benchmark):
+    """Wrapper function for the RemoteFilesIncompressible benchmark."""
+    return RemoteFilesIncompressible.iterate_pytest_benchmark(
+        benchmark, size=DEFAULT_SIZE
+    )
+
+
+if __name__ == "__main__":
+    pass
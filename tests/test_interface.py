@@ -0,0 +1,1717 @@
+"""Tests the `InterfaceDriver`, the intermediary between sessions and wrappers.
+
+The tests use minimal interfaces defined in this module that keep their data
+on the in-memory base graph created by the driver.
+"""
+
+import mmap
+import os
+import time
+import unittest
+from concurrent.futures import CancelledError
+from datetime import timedelta
+from io import BytesIO
+from tempfile import NamedTemporaryFile
+from threading import Event, Thread
+from typing import (
+    BinaryIO,
+    Dict,
+    Iterable,
+    Iterator,
+    List,
+    Optional,
+    Set,
+    Type,
+)
+from unittest import mock
+
+from rdflib import OWL, RDF, RDFS, BNode, Graph, Literal, URIRef
+from rdflib.collection import Collection
+
+from simphony_osp.interfaces.interface import (
+    BufferType,
+    CachePolicy,
+    DeltaOverlay,
+    FileCommitError,
+    Interface,
+    InterfaceDriver,
+    JobStatus,
+    LFUCachePolicy,
+    LRUCachePolicy,
+    PatternIndex,
+    TripleIndex,
+    TTLCachePolicy,
+)
+from simphony_osp.session.session import Session
+from simphony_osp.session.wrapper import WrapperSpawner
+from simphony_osp.utils import simphony_namespace
+from simphony_osp.utils.datatypes import Pattern, Triple
+
+EX = "http://example.org/"
+
+
+class InMemory(Interface):
+    """Interface keeping its data on the base graph created by the driver."""
+
+    entity_tracking: bool = False
+
+    def open(self, configuration: str, create: bool = False) -> None:
+        """Nothing to open, the driver creates the base graph."""
+        pass
+
+    def close(self) -> None:
+        """Nothing to close."""
+        pass
+
+    def populate(self) -> None:
+        """Nothing to populate."""
+        pass
+
+    def commit(self) -> None:
+        """The driver updates the base graph. Nothing to do."""
+        pass
+
+
+class CachedBaseInMemory(InMemory):
+    """Cached interface without a `triples` method.
+
+    The driver fetches the triples from the base graph, and prefetches the
+    neighborhood of the requested subjects using SPARQL.
+    """
+
+    cache: bool = True
+
+    thread_safe_reads: bool = True
+
+
+class CachedInMemory(InMemory):
+    """Cached interface that records the patterns it is asked for."""
+
+    cache: bool = True
+
+    requests: List[Pattern]
+
+    def __init__(self, **kwargs):
+        """Initialize the list of recorded requests."""
+        super().__init__(**kwargs)
+        self.requests = []
+
+    def triples(self, pattern: Pattern) -> Iterator[Triple]:
+        """Record the requested pattern and fetch it from the base graph."""
+        self.requests.append(pattern)
+        yield from self.base.triples(pattern)
+
+
+class CountedInMemory(CachedInMemory):
+    """Cached interface that counts triples natively."""
+
+    counts: List[Pattern]
+
+    def __init__(self, **kwargs):
+        """Initialize the list of recorded counts."""
+        super().__init__(**kwargs)
+        self.counts = []
+
+    def count(self, pattern: Pattern) -> int:
+        """Record the counted pattern and count it on the base graph."""
+        self.counts.append(pattern)
+        return sum(1 for _ in self.base.triples(pattern))
+
+
+class BatchedInMemory(CachedInMemory):
+    """Cached interface that also answers batches of patterns."""
+
+    batches: List[List[Pattern]]
+
+    def __init__(self, **kwargs):
+        """Initialize the list of recorded batches."""
+        super().__init__(**kwargs)
+        self.batches = []
+
+    def triples_many(
+        self, patterns: Iterable[Pattern]
+    ) -> Dict[Pattern, Iterable[Triple]]:
+        """Record the batch and fetch each pattern from the base graph."""
+        patterns = list(patterns)
+        self.batches.append(patterns)
+        return {
+            pattern: set(self.base.triples(pattern)) for pattern in patterns
+        }
+
+
+class TrackingInMemory(InMemory):
+    """Interface that records the modified entities on each commit."""
+
+    entity_tracking: bool = True
+
+    commits: List[tuple]
+
+    def __init__(self, **kwargs):
+        """Initialize the list of recorded commits."""
+        super().__init__(**kwargs)
+        self.commits = []
+
+    def commit(self) -> None:
+        """Record the identifiers of the added, updated and deleted ones."""
+        self.commits.append(
+            tuple(
+                {entity.identifier for entity in entities}
+                for entities in (self.added, self.updated, self.deleted)
+            )
+        )
+
+
+class InterceptingInMemory(InMemory):
+    """Interface that decides on batches of additions and removals."""
+
+    additions: List[List[Triple]]
+    removals: List[List[Pattern]]
+
+    def __init__(self, **kwargs):
+        """Initialize the lists of recorded batches."""
+        super().__init__(**kwargs)
+        self.additions = []
+        self.removals = []
+
+    def add_many(self, triples: Iterable[Triple]) -> Iterable[bool]:
+        """Record the batch and catch the triples with literal objects."""
+        triples = list(triples)
+        self.additions.append(triples)
+        return [not isinstance(o, Literal) for _, _, o in triples]
+
+    def remove_many(
+        self, patterns: Iterable[Pattern]
+    ) -> Dict[Pattern, Iterable[Triple]]:
+        """Record the batch and let the driver remove the triples."""
+        patterns = list(patterns)
+        self.removals.append(patterns)
+        return {pattern: self.base.triples(pattern) for pattern in patterns}
+
+
+def spawner(interface: Type[Interface]) -> Type[WrapperSpawner]:
+    """Produce a wrapper class for one of the interfaces above."""
+
+    class Spawner(WrapperSpawner):
+        @classmethod
+        def _get_interface(cls) -> Type[Interface]:
+            return interface
+
+    return Spawner
+
+
+class TestPatternIndex(unittest.TestCase):
+    """Test the index of cached triple patterns."""
+
+    def test_covers(self):
+        """Test the lookups of patterns contained in the indexed ones."""
+        s, p, o = (URIRef(EX + x) for x in "spo")
+        index = PatternIndex()
+        self.assertFalse(index.covers((s, p, o)))
+
+        index.add((s, None, None))
+        self.assertTrue(index.covers((s, p, o)))
+        self.assertTrue(index.covers((s, p, None)))
+        self.assertTrue(index.covers((s, None, None)))
+        self.assertFalse(index.covers((None, p, o)))
+        self.assertFalse(index.covers((None, None, None)))
+        self.assertSetEqual({(s, None, None)}, index.covering((s, p, o)))
+
+        index.add((None, p, None))
+        self.assertTrue(index.covers((None, p, o)))
+        self.assertSetEqual(
+            {(s, None, None), (None, p, None)}, index.covering((s, p, o))
+        )
+
+        index.discard((s, None, None))
+        self.assertFalse(index.covers((s, None, None)))
+        self.assertTrue(index.covers((s, p, None)))
+
+    def test_sub_patterns(self):
+        """Test finding indexed patterns contained in another one."""
+        s, p, o = (URIRef(EX + x) for x in "spo")
+        index = PatternIndex()
+        for pattern in (
+            (s, None, None),
+            (s, p, None),
+            (s, p, o),
+            (None, p, o),
+        ):
+            index.add(pattern)
+
+        self.assertSetEqual(
+            {(s, None, None), (s, p, None), (s, p, o)},
+            index.sub_patterns((s, None, None)),
+        )
+        self.assertSetEqual(
+            {(s, p, o), (None, p, o)}, index.sub_patterns((None, p, o))
+        )
+        self.assertSetEqual(set(index), index.sub_patterns((None,) * 3))
+
+    def test_order(self):
+        """Test that the index keeps the patterns sorted by insertion."""
+        a, b, c = ((URIRef(EX + x), None, None) for x in ("a", "b", "c"))
+        index = PatternIndex()
+        index.add(a)
+        index.add(b)
+        index.add(c)
+        self.assertListEqual([a, b, c], list(index))
+
+        index.add(a)
+        self.assertListEqual([b, c, a], list(index))
+        self.assertListEqual(
+            [b, c], list(index.older_than(dict(index.items())[a]))
+        )
+
+
+class TestDeltaOverlay(unittest.TestCase):
+    """Test the structure holding the uncommitted changes."""
+
+    def test_triple_index(self):
+        """Test adding, removing and finding triples on a triple index."""
+        s, p, o = (URIRef(EX + x) for x in "spo")
+        index = TripleIndex()
+        index.add((s, p, o))
+        index.add((s, p, o))
+        index.add((s, p, Literal(1)))
+        index.add((o, p, s))
+        self.assertEqual(3, len(index))
+        self.assertIn((s, p, o), index)
+        self.assertSetEqual(
+            {(s, p, o), (s, p, Literal(1))}, set(index.triples((s, p, None)))
+        )
+        self.assertSetEqual(
+            {(s, p, o), (o, p, s)},
+            set(index.triples((None, None, o)))
+            | set(index.triples((None, None, s))),
+        )
+        self.assertListEqual([o, s, s], sorted(index.subjects()))
+
+        index.remove((s, p, None))
+        self.assertEqual(1, len(index))
+        self.assertFalse(index.has_subject(s))
+        self.assertSetEqual({(o, p, s)}, set(index.graph()))
+
+    def test_apply(self):
+        """Test applying the changes to triples read from an interface."""
+        s, p, o = (URIRef(EX + x) for x in "spo")
+        delta = DeltaOverlay()
+        base = [(s, p, Literal(1)), (s, p, Literal(2)), (o, p, Literal(1))]
+
+        self.assertIs(base, delta.apply(base, (None, None, None)))
+        delta.uncaught[BufferType.DELETED].add((s, p, Literal(1)))
+        delta.caught[BufferType.ADDED].add((s, p, Literal(3)))
+        delta.uncaught[BufferType.ADDED].add((s, p, Literal(2)))
+        self.assertEqual(3, len(delta))
+
+        # Untouched subjects are not filtered.
+        pattern = (o, None, None)
+        self.assertIs(base, delta.apply(base, pattern))
+        self.assertListEqual(
+            [(s, p, Literal(2)), (s, p, Literal(3))],
+            sorted(delta.apply(base[:2], (s, None, None))),
+        )
+
+        delta.uncaught[BufferType.DELETED].remove((None, None, None))
+        delta.caught[BufferType.ADDED].remove((None, None, None))
+        delta.uncaught[BufferType.ADDED].remove((None, None, None))
+        self.assertFalse(delta.touches((s, None, None)))
+
+    def test_split(self):
+        """Test splitting the changes into chunks and merging them back."""
+        s, p, o = (URIRef(EX + x) for x in "spo")
+        delta = DeltaOverlay()
+        subjects = [URIRef(EX + str(i)) for i in range(5)]
+        for subject in subjects:
+            delta.uncaught[BufferType.ADDED].add((subject, p, Literal(1)))
+            delta.caught[BufferType.ADDED].add((subject, p, Literal(2)))
+            delta.uncaught[BufferType.DELETED].add((subject, p, o))
+            delta.track(subject, True)
+        delta.removed |= {(subjects[0], None, None), (None, p, o)}
+
+        chunks = list(delta.split(3))
+        self.assertEqual(0, len(delta))
+        self.assertListEqual([3, 3, 3, 3, 3], [len(x) for x in chunks])
+        self.assertSetEqual({(subjects[0], None, None)}, chunks[0].removed)
+        self.assertSetEqual({(subjects[1], p, o)}, chunks[1].removed)
+        self.assertDictEqual({subjects[2]: True}, chunks[2].touched)
+
+        for chunk in chunks[1:]:
+            chunks[0].merge(chunk)
+            self.assertEqual(0, len(chunk))
+        self.assertEqual(15, len(chunks[0]))
+        self.assertEqual(5, len(chunks[0].touched))
+
+    def test_removals(self):
+        """Test that removed patterns covered by others are omitted."""
+        s, p, o = (URIRef(EX + x) for x in "spo")
+        delta = DeltaOverlay()
+        delta.removed |= {(s, p, o), (s, p, None), (None, p, o), (o, p, s)}
+        self.assertSetEqual(
+            {(s, p, None), (None, p, o), (o, p, s)}, delta.removals()
+        )
+        delta.removed.add((None, None, None))
+        self.assertSetEqual({(None, None, None)}, delta.removals())
+
+
+class TestInterfaceDriverSPARQL(unittest.TestCase):
+    """Test SPARQL queries on sessions with uncommitted changes."""
+
+    def setUp(self) -> None:
+        """Open a session with committed and uncommitted triples."""
+        self.session = spawner(InMemory)()
+        self.graph: Graph = self.session.graph
+        self.s, self.p, self.q = (URIRef(EX + x) for x in "spq")
+        self.graph.add((self.s, self.p, Literal(1)))
+        self.graph.add((self.s, self.q, Literal(1)))
+        self.graph.commit()
+        self.graph.add((self.s, self.p, Literal(2)))
+        self.graph.remove((self.s, self.p, Literal(1)))
+
+        # Record the queries that reach the base graph.
+        self.base_queries = []
+        base = self.session.driver.interface.base
+        base_query = base.query
+
+        def query(*args, **kwargs):
+            self.base_queries.append(args[0])
+            return base_query(*args, **kwargs)
+
+        base.query = query
+
+    def tearDown(self) -> None:
+        """Close the session."""
+        self.session.close()
+
+    def test_query(self):
+        """Test queries reading the uncommitted changes."""
+        result = self.session.sparql(
+            f"SELECT ?o WHERE {{ <{self.s}> <{self.p}> ?o }}"
+        )
+        self.assertSetEqual({Literal(2)}, {row[0] for row in result})
+        result = self.session.sparql(f"SELECT ?o WHERE {{ <{self.s}> ?x ?o }}")
+        self.assertSetEqual(
+            {Literal(1), Literal(2)}, {row[0] for row in result}
+        )
+        self.assertListEqual([], self.base_queries)
+
+    def test_query_unchanged(self):
+        """Test that queries not reading the changes reach the base graph."""
+        result = self.session.sparql(
+            f"SELECT ?o WHERE {{ <{self.s}> <{self.q}> ?o }}"
+        )
+        self.assertSetEqual({Literal(1)}, {row[0] for row in result})
+        self.assertEqual(1, len(self.base_queries))
+
+    def test_query_during_commit(self):
+        """Test queries on the graphs offered to the interface on commit."""
+        interface = self.session.driver.interface
+        query = f"SELECT ?o WHERE {{ <{self.s}> <{self.p}> ?o }}"
+        results = dict()
+
+        def commit():
+            results["old"] = {
+                row[0] for row in interface.old_graph.query(query)
+            }
+            results["new"] = {
+                row[0] for row in interface.new_graph.query(query)
+            }
+            results["session"] = {
+                row[0] for row in interface.session_new.sparql(query)
+            }
+
+        with mock.patch.object(interface, "commit", commit):
+            self.graph.commit()
+        self.assertSetEqual({Literal(1)}, results["old"])
+        self.assertSetEqual({Literal(2)}, results["new"])
+        self.assertSetEqual({Literal(2)}, results["session"])
+
+    def test_update(self):
+        """Test that updates are buffered until the next commit."""
+        self.graph.update(
+            f"DELETE {{ <{self.s}> <{self.p}> ?o }} "
+            f"INSERT {{ <{self.s}> <{self.p}> 3 }} "
+            f"WHERE {{ <{self.s}> <{self.p}> ?o }}"
+        )
+        self.assertSetEqual(
+            {Literal(3)}, set(self.graph.objects(self.s, self.p))
+        )
+        self.assertSetEqual(
+            {Literal(1)},
+            set(self.session.driver.interface.base.objects(self.s, self.p)),
+        )
+        self.graph.commit()
+        self.assertSetEqual(
+            {Literal(3)},
+            set(self.session.driver.interface.base.objects(self.s, self.p)),
+        )
+
+
+class TestInterfaceDriverCount(unittest.TestCase):
+    """Test counting triples with uncommitted changes."""
+
+    def setUp(self) -> None:
+        """Define the committed and uncommitted triples."""
+        self.s, self.p, self.q = (URIRef(EX + x) for x in "spq")
+        self.committed = [(self.s, self.p, Literal(i)) for i in range(5)] + [
+            (self.p, self.q, Literal(0))
+        ]
+        self.patterns = [
+            (None, None, None),
+            (self.s, None, None),
+            (None, self.p, None),
+            (self.p, None, None),
+            (None, None, Literal(0)),
+            (self.s, self.q, None),
+        ]
+
+    def change(self, graph: Graph) -> None:
+        """Commit some triples and then add and remove a few of them."""
+        for triple in self.committed:
+            graph.add(triple)
+        graph.commit()
+        graph.add((self.s, self.p, Literal(0)))  # Already exists.
+        graph.add((self.s, self.p, Literal(5)))
+        graph.add((self.s, self.q, Literal(5)))
+        graph.remove((self.s, self.p, Literal(1)))
+        graph.remove((self.s, self.p, Literal(5)))
+        graph.remove((self.p, None, None))
+
+    def test_count(self):
+        """Test that the count hook of the interface is used."""
+        session = spawner(CountedInMemory)()
+        try:
+            driver = session.driver
+            self.change(session.graph)
+            for pattern in self.patterns:
+                self.assertEqual(
+                    sum(1 for _ in driver.triples(pattern)),
+                    driver.count(pattern),
+                )
+            driver.cache_clear()
+            driver.interface.requests.clear()
+            self.assertEqual(5, len(session.graph))
+            self.assertEqual(6, len(driver.interface.base))
+            self.assertIn((None, None, None), driver.interface.counts)
+            self.assertNotIn((None, None, None), driver.interface.requests)
+        finally:
+            session.close()
+
+    def test_count_probes(self):
+        """Test that the changed triples are looked up at once."""
+
+        class Interface(BatchedInMemory, CountedInMemory):
+            pass
+
+        session = spawner(Interface)()
+        try:
+            driver = session.driver
+            self.change(session.graph)
+            driver.cache_clear()
+            driver.interface.batches.clear()
+            driver.interface.counts.clear()
+            self.assertEqual(5, len(session.graph))
+            self.assertEqual(1, len(driver.interface.batches))
+            self.assertListEqual([(None, None, None)], driver.interface.counts)
+            # The probes are not cached.
+            self.assertEqual(0, driver._cache_length)
+
+            # Too many changes, the triples are counted one by one.
+            driver.cache_clear()
+            driver.interface.counts.clear()
+            driver.count_probes = 1
+            self.assertEqual(5, len(session.graph))
+            self.assertListEqual([], driver.interface.counts)
+        finally:
+            session.close()
+
+    def test_count_fallback(self):
+        """Test counting triples on interfaces without a count hook."""
+        for interface in (InMemory, CachedInMemory):
+            session = spawner(interface)()
+            try:
+                driver = session.driver
+                self.change(session.graph)
+                for pattern in self.patterns:
+                    self.assertEqual(
+                        sum(1 for _ in driver.triples(pattern)),
+                        driver.count(pattern),
+                    )
+                    self.assertEqual(
+                        sum(
+                            1
+                            for _ in driver.triples(
+                                pattern, ignore_buffers=True
+                            )
+                        ),
+                        driver.count(pattern, ignore_buffers=True),
+                    )
+                self.assertEqual(5, len(session.graph))
+            finally:
+                session.close()
+
+
+class TestInterfaceDriverCommit(unittest.TestCase):
+    """Test the application of the changes to the base graph on commit."""
+
+    def test_removals(self):
+        """Test that removals are grouped by the removed patterns."""
+        session = spawner(InMemory)()
+        try:
+            graph, base = session.graph, session.driver.interface.base
+            s, p, q = (URIRef(EX + x) for x in "spq")
+            for i in range(100):
+                graph.add((s, p, Literal(i)))
+            graph.add((s, q, Literal(0)))
+            graph.add((p, q, Literal(0)))
+            graph.commit()
+
+            removed = []
+            base_remove = base.remove
+
+            def remove(pattern):
+                removed.append(pattern)
+                return base_remove(pattern)
+
+            base.remove = remove
+
+            graph.remove((s, p, Literal(0)))
+            graph.remove((s, p, None))
+            graph.remove((s, q, Literal(1)))  # Does not exist.
+            graph.add((s, p, Literal(5)))
+            graph.remove((p, q, Literal(0)))
+            graph.commit()
+
+            self.assertListEqual(
+                sorted([(s, p, None), (p, q, Literal(0))]), sorted(removed)
+            )
+            self.assertSetEqual(
+                {(s, p, Literal(5)), (s, q, Literal(0))}, set(base)
+            )
+            stats = session.driver.commit_stats()
+            self.assertEqual(2, stats["removals"])
+            self.assertEqual(1, stats["added"])
+            self.assertEqual(100, stats["deleted"])
+            for stage in (
+                "snapshot",
+                "entities",
+                "interface",
+                "apply",
+                "files",
+                "cache",
+            ):
+                self.assertLessEqual(stats[stage], stats["total"])
+        finally:
+            session.close()
+
+
+class TestInterfaceDriverChangeBatches(unittest.TestCase):
+    """Test batching additions and removals for the interface."""
+
+    def test_batches(self):
+        """Test that changes are decided in batches before being read."""
+        session = spawner(InterceptingInMemory)()
+        try:
+            graph, interface = session.graph, session.driver.interface
+            s, p, q = (URIRef(EX + x) for x in "spq")
+            for i in range(10):
+                graph.add((s, p, Literal(i)))
+                graph.add((s, q, URIRef(EX + str(i))))
+            graph.remove((s, p, Literal(0)))
+            graph.remove((s, q, None))
+            graph.add((s, q, URIRef(EX + "0")))
+            self.assertListEqual([], interface.additions)
+            self.assertListEqual([], interface.removals)
+
+            self.assertSetEqual(
+                {(s, p, Literal(i)) for i in range(1, 10)}
+                | {(s, q, URIRef(EX + "0"))},
+                set(graph),
+            )
+            self.assertListEqual(
+                [20, 1], [len(batch) for batch in interface.additions]
+            )
+            self.assertListEqual(
+                [[(s, p, Literal(0)), (s, q, None)]], interface.removals
+            )
+
+            graph.commit()
+            self.assertSetEqual(
+                {(s, q, URIRef(EX + "0"))}, set(interface.base)
+            )
+            self.assertEqual(2, len(interface.additions))
+        finally:
+            session.close()
+
+    def test_batch_size(self):
+        """Test that batches are flushed when they reach the batch size."""
+        session = spawner(InterceptingInMemory)()
+        try:
+            graph, interface = session.graph, session.driver.interface
+            interface.batch_size = 4
+            s, p = (URIRef(EX + x) for x in "sp")
+            for i in range(10):
+                graph.add((s, p, URIRef(EX + str(i))))
+            self.assertListEqual(
+                [4, 4], [len(batch) for batch in interface.additions]
+            )
+            graph.commit()
+            self.assertListEqual(
+                [4, 4, 2], [len(batch) for batch in interface.additions]
+            )
+            self.assertEqual(10, len(interface.base))
+        finally:
+            session.close()
+
+
+class TestInterfaceDriverSessionViews(unittest.TestCase):
+    """Test the sessions offered to the interface."""
+
+    def test_reuse(self):
+        """Test that the sessions are created lazily and reused."""
+
+        class Interface(InMemory):
+            sessions: List[Session]
+            names: List[Set[str]]
+
+            def __init__(self, **kwargs):
+                super().__init__(**kwargs)
+                self.sessions, self.names = [], []
+
+            def commit(self) -> None:
+                self.sessions.append(self.session_new)
+                self.names.append(
+                    {
+                        str(o)
+                        for o in self.session_new.graph.objects(
+                            None, RDFS.label
+                        )
+                    }
+                )
+
+        with mock.patch(
+            "simphony_osp.interfaces.interface.Session", wraps=Session
+        ) as constructor:
+            session = spawner(Interface)()
+            try:
+                interface = session.driver.interface
+                constructor.reset_mock()
+                for i in range(3):
+                    session.graph.add(
+                        (URIRef(EX + str(i)), RDFS.label, Literal(str(i)))
+                    )
+                    session.graph.commit()
+                self.assertEqual(1, constructor.call_count)
+                self.assertEqual(1, len(set(map(id, interface.sessions))))
+                self.assertListEqual(
+                    [{"0"}, {"0", "1"}, {"0", "1", "2"}], interface.names
+                )
+                self.assertIsNone(interface.session_new)
+            finally:
+                session.close()
+
+    def test_reset(self):
+        """Test that no state of a commit reaches the next one."""
+
+        class Interface(InMemory):
+            created: List[int]
+
+            def __init__(self, **kwargs):
+                super().__init__(**kwargs)
+                self.created = []
+
+            def commit(self) -> None:
+                session = self.session_base
+                self.created.append(len(session.creation_set))
+                session.creation_set.add(URIRef(EX + "created"))
+
+        session = spawner(Interface)()
+        try:
+            for i in range(3):
+                session.graph.add(
+                    (URIRef(EX + str(i)), RDFS.label, Literal(str(i)))
+                )
+                session.graph.commit()
+            self.assertListEqual([0, 0, 0], session.driver.interface.created)
+        finally:
+            session.close()
+
+
+class TestInterfaceDriverChunks(unittest.TestCase):
+    """Test committing large transactions in chunks."""
+
+    def populate(self, graph: Graph) -> List[Triple]:
+        """Commit some triples and change them afterwards."""
+        p = URIRef(EX + "p")
+        subjects = [URIRef(EX + str(i)) for i in range(10)]
+        for subject in subjects:
+            graph.add((subject, RDF.type, OWL.Thing))
+            graph.add((subject, p, Literal(0)))
+        graph.commit()
+        for subject in subjects[:5]:
+            graph.remove((subject, None, None))
+        for subject in subjects[5:]:
+            graph.add((subject, p, Literal(1)))
+        graph.add((URIRef(EX + "new"), RDF.type, OWL.Thing))
+        return sorted(graph)
+
+    def test_chunks(self):
+        """Test that each chunk is committed separately."""
+
+        class Interface(TrackingInMemory):
+            partial_commits = True
+
+        session = spawner(Interface)()
+        try:
+            graph, driver = session.graph, session.driver
+            expected = self.populate(graph)
+            graph.store.commit(chunk_size=6)
+            self.assertListEqual(expected, sorted(driver.interface.base))
+            self.assertListEqual(expected, sorted(graph))
+            stats = driver.commit_stats()
+            self.assertEqual(3, stats["chunks"])
+            self.assertEqual(5, stats["removals"])
+            commits = driver.interface.commits[1:]
+            self.assertEqual(3, len(commits))
+            added, updated, deleted = (
+                set().union(*(commit[i] for commit in commits))
+                for i in range(3)
+            )
+            self.assertSetEqual({URIRef(EX + "new")}, added)
+            self.assertEqual(5, len(updated))
+            self.assertEqual(5, len(deleted))
+        finally:
+            session.close()
+
+    def test_no_partial_commits(self):
+        """Test that other interfaces get all the changes at once."""
+        session = spawner(TrackingInMemory)()
+        try:
+            graph, driver = session.graph, session.driver
+            expected = self.populate(graph)
+            with self.assertLogs(level="WARNING"):
+                session.commit(chunk_size=6)
+            self.assertListEqual(expected, sorted(driver.interface.base))
+            self.assertEqual(1, driver.commit_stats()["chunks"])
+            self.assertEqual(2, len(driver.interface.commits))
+        finally:
+            session.close()
+
+    def test_failure(self):
+        """Test that the changes not committed remain pending."""
+
+        class Interface(TrackingInMemory):
+            partial_commits = True
+
+            def commit(self) -> None:
+                super().commit()
+                if len(self.commits) == 3:
+                    raise RuntimeError
+
+        session = spawner(Interface)()
+        try:
+            graph, driver = session.graph, session.driver
+            expected = self.populate(graph)
+            self.assertRaises(RuntimeError, driver.commit, chunk_size=6)
+            self.assertListEqual(expected, sorted(graph))
+            self.assertNotEqual(expected, sorted(driver.interface.base))
+            graph.commit()
+            self.assertListEqual(expected, sorted(driver.interface.base))
+        finally:
+            session.close()
+
+
+class TestInterfaceDriverAsyncCommit(unittest.TestCase):
+    """Test committing changes on a background thread."""
+
+    def setUp(self) -> None:
+        """Spawn a session whose commits wait for a signal."""
+        started, proceed = Event(), Event()
+
+        class Interface(TrackingInMemory):
+            def commit(self) -> None:
+                started.set()
+                proceed.wait(timeout=10)
+                super().commit()
+                if self.fail:
+                    raise RuntimeError
+
+            fail = False
+
+        self.started, self.proceed = started, proceed
+        self.session = spawner(Interface)()
+        self.graph, self.driver = self.session.graph, self.session.driver
+
+    def tearDown(self) -> None:
+        """Close the session."""
+        self.proceed.set()
+        self.session.close()
+
+    def test_commit_async(self):
+        """Test that frozen changes are readable while being committed."""
+        graph, driver = self.graph, self.driver
+        a, b = URIRef(EX + "a"), URIRef(EX + "b")
+        graph.add((a, RDF.type, OWL.Thing))
+        future = driver.commit_async()
+        self.assertTrue(self.started.wait(timeout=10))
+        graph.add((b, RDF.type, OWL.Thing))
+        second = driver.commit_async()
+        self.assertFalse(future.done())
+        self.assertSetEqual(
+            {(a, RDF.type, OWL.Thing), (b, RDF.type, OWL.Thing)}, set(graph)
+        )
+        self.proceed.set()
+        self.assertIsNone(future.result(timeout=10))
+        self.assertIsNone(second.result(timeout=10))
+        self.assertSetEqual(set(graph), set(driver.interface.base))
+        added = [commit[0] for commit in driver.interface.commits]
+        self.assertListEqual([{a}, {b}], added)
+
+    def test_commit_drains(self):
+        """Test that a synchronous commit waits for the asynchronous ones."""
+        graph, driver = self.graph, self.driver
+        a, b = URIRef(EX + "a"), URIRef(EX + "b")
+        graph.add((a, RDF.type, OWL.Thing))
+        future = driver.commit_async()
+        graph.add((b, RDF.type, OWL.Thing))
+        self.proceed.set()
+        graph.commit()
+        self.assertTrue(future.done())
+        self.assertEqual(2, len(driver.interface.base))
+        self.assertEqual(2, len(driver.interface.commits))
+
+    def test_failure(self):
+        """Test that the changes become pending again if a commit fails."""
+        graph, driver = self.graph, self.driver
+        a, b = URIRef(EX + "a"), URIRef(EX + "b")
+        graph.add((a, RDF.type, OWL.Thing))
+        driver.interface.fail = True
+        future = driver.commit_async()
+        self.assertTrue(self.started.wait(timeout=10))
+        graph.add((b, RDF.type, OWL.Thing))
+        second = driver.commit_async()
+        self.proceed.set()
+        graph.remove((a, None, None))
+        self.assertRaises(RuntimeError, future.result, timeout=10)
+        self.assertRaises(RuntimeError, second.result, timeout=10)
+        self.assertSetEqual({(b, RDF.type, OWL.Thing)}, set(graph))
+        driver.interface.fail = False
+        self.assertRaises(RuntimeError, graph.commit)
+        self.assertSetEqual({(b, RDF.type, OWL.Thing)}, set(graph))
+        graph.commit()
+        self.assertSetEqual(
+            {(b, RDF.type, OWL.Thing)}, set(driver.interface.base)
+        )
+
+
+class TestInterfaceDriverComputeJobs(unittest.TestCase):
+    """Test running computations in the background."""
+
+    def setUp(self) -> None:
+        """Spawn a session whose computations wait for a signal."""
+        started, proceed = Event(), Event()
+
+        class Interface(InMemory):
+            computed: List[dict] = []
+
+            def compute(self, **kwargs) -> None:
+                started.set()
+                self.job.report(0.5)
+                while not proceed.wait(timeout=0.01):
+                    if self.job.cancel_requested:
+                        raise CancelledError
+                if kwargs.get("fail"):
+                    raise ValueError
+                self.computed.append(kwargs)
+                self.base.add((URIRef(EX + "result"), RDF.type, OWL.Thing))
+
+        self.started, self.proceed = started, proceed
+        self.session = spawner(Interface)()
+        self.graph, self.driver = self.session.graph, self.session.driver
+
+    def tearDown(self) -> None:
+        """Close the session."""
+        self.proceed.set()
+        self.session.close()
+
+    def test_compute_async(self):
+        """Test the status, progress and results of a job."""
+        a = URIRef(EX + "a")
+        self.graph.add((a, RDF.type, OWL.Thing))
+        with mock.patch.object(
+            self.driver, "commit_async", wraps=self.driver.commit_async
+        ) as commit_async:
+            job = self.session.compute_async(steps=3)
+        commit_async.assert_called_once()
+        self.assertTrue(self.started.wait(timeout=10))
+        self.assertEqual(JobStatus.RUNNING, job.status)
+        self.assertEqual(0.5, job.progress)
+        self.assertIn((a, RDF.type, OWL.Thing), self.driver.interface.base)
+        self.proceed.set()
+        job.wait(timeout=10)
+        self.assertEqual(JobStatus.DONE, job.status)
+        self.assertListEqual([{"steps": 3}], self.driver.interface.computed)
+        self.assertIn((URIRef(EX + "result"), RDF.type, OWL.Thing), self.graph)
+
+    def test_cancel(self):
+        """Test cancelling running and pending jobs."""
+        running = self.session.compute_async()
+        pending = self.session.compute_async()
+        self.assertTrue(self.started.wait(timeout=10))
+        self.assertEqual(JobStatus.PENDING, pending.status)
+        self.assertTrue(pending.cancel())
+        self.assertFalse(running.cancel())
+        self.assertRaises(CancelledError, running.wait, timeout=10)
+        self.assertRaises(CancelledError, pending.wait, timeout=10)
+        self.assertEqual(JobStatus.CANCELLED, running.status)
+        self.assertEqual(JobStatus.CANCELLED, pending.status)
+        self.assertListEqual([], self.driver.interface.computed)
+        self.assertFalse(running.cancel())
+
+    def test_commit_order(self):
+        """Test that a synchronous commit waits for the queued jobs."""
+        a = URIRef(EX + "a")
+        job = self.session.compute_async()
+        self.assertTrue(self.started.wait(timeout=10))
+        self.graph.add((a, RDF.type, OWL.Thing))
+        commit = Thread(target=self.graph.commit)
+        commit.start()
+        commit.join(timeout=0.1)
+        self.assertTrue(commit.is_alive())
+        self.assertNotIn((a, RDF.type, OWL.Thing), self.driver.interface.base)
+        self.proceed.set()
+        commit.join(timeout=10)
+        self.assertTrue(job.done())
+        self.assertIn((a, RDF.type, OWL.Thing), self.driver.interface.base)
+
+    def test_failure(self):
+        """Test that the exception of the computation is raised."""
+        self.proceed.set()
+        job = self.session.compute_async(fail=True)
+        self.assertRaises(ValueError, job.wait, timeout=10)
+        self.assertEqual(JobStatus.FAILED, job.status)
+        self.assertNotIn(
+            (URIRef(EX + "result"), RDF.type, OWL.Thing), self.graph
+        )
+
+
+class TestInterfaceDriverFiles(unittest.TestCase):
+    """Test reading queued files."""
+
+    def setUp(self) -> None:
+        """Spawn a session."""
+        self.session = spawner(InMemory)()
+        self.driver = self.session.driver
+        self.key = URIRef(EX + "file")
+
+    def tearDown(self) -> None:
+        """Close the session."""
+        self.session.close()
+
+    def test_local_file(self):
+        """Test that queued local files are linked, not copied."""
+        with NamedTemporaryFile() as os_file:
+            os_file.write(b"text")
+            os_file.flush()
+            with self.assertLogs(level="WARNING"):
+                self.driver.queue(self.key, open(os_file.name, "rb"))
+            with self.driver.load(self.key) as file:
+                self.assertEqual(b"text", file.read())
+                self.assertTrue(
+                    os.path.samestat(
+                        os.fstat(file.fileno()), os.stat(os_file.name)
+                    )
+                )
+            with self.driver.load(self.key, memory_map=True) as file:
+                self.assertIsInstance(file, mmap.mmap)
+                self.assertEqual(b"text", file.read())
+
+    def test_stream(self):
+        """Test queueing a byte stream."""
+        contents = os.urandom(3 * 2**20 + 1)
+        with self.assertLogs(level="WARNING"):
+            self.driver.queue(self.key, BytesIO(contents))
+        with self.driver.load(self.key) as file:
+            self.assertEqual(contents, file.read())
+        with self.driver.load(self.key, memory_map=True) as file:
+            self.assertEqual(contents, file[:])
+
+
+class TestInterfaceDriverFileCommits(unittest.TestCase):
+    """Test committing the queued files."""
+
+    def setUp(self) -> None:
+        """Spawn a session whose interface stores files in a dictionary."""
+
+        class Interface(InMemory):
+            thread_safe_files = True
+            file_workers = 4
+            files: Dict[str, bytes]
+            fail: Set[str]
+            renamed: List[str]
+
+            def __init__(self, **kwargs):
+                super().__init__(**kwargs)
+                self.files, self.fail, self.renamed = dict(), set(), []
+
+            def save(self, key: str, file: BinaryIO) -> None:
+                if key in self.fail:
+                    raise OSError(key)
+                time.sleep(0.05)
+                self.files[key] = file.read()
+
+            def load(self, key: str) -> BinaryIO:
+                return BytesIO(self.files[key])
+
+            def delete(self, key: str) -> None:
+                del self.files[key]
+
+            def rename(self, key: str, new_key: str) -> None:
+                self.renamed.append(key)
+                self.files[new_key] = self.files.pop(key)
+
+        self.session = spawner(Interface)()
+        self.graph, self.driver = self.session.graph, self.session.driver
+        self.interface = self.driver.interface
+
+    def tearDown(self) -> None:
+        """Close the session."""
+        self.session.close()
+
+    def queue(self, keys: List[URIRef], contents: bytes) -> None:
+        """Queue the contents for some file objects."""
+        for key in keys:
+            self.graph.add((key, RDF.type, simphony_namespace.File))
+            self.driver.queue(key, BytesIO(contents))
+
+    def test_parallel(self):
+        """Test that the files are committed in parallel."""
+        keys = [URIRef(EX + str(i)) for i in range(8)]
+        self.queue(keys, b"new")
+        start = time.perf_counter()
+        self.graph.commit()
+        self.assertLess(time.perf_counter() - start, 8 * 0.05)
+        self.assertDictEqual(
+            {key: b"new" for key in keys}, self.interface.files
+        )
+
+        self.graph.remove((keys[0], None, None))
+        self.graph.commit()
+        self.assertSetEqual(set(keys[1:]), set(self.interface.files))
+
+    def test_load_async(self):
+        """Test loading a file while it is committed asynchronously."""
+        key = URIRef(EX + "file")
+        self.queue([key], b"new")
+        future = self.driver.commit_async()
+        with self.driver.load(key) as file:
+            self.assertEqual(b"new", file.read())
+        self.assertIsNone(future.result(timeout=10))
+        self.assertDictEqual({key: b"new"}, self.interface.files)
+
+    def test_rollback(self):
+        """Test that the files are restored when a file cannot be saved."""
+        old, new = URIRef(EX + "old"), URIRef(EX + "new")
+        deleted, failing = URIRef(EX + "deleted"), URIRef(EX + "failing")
+        self.queue([old, deleted], b"old")
+        self.graph.commit()
+
+        self.queue([old, new, failing], b"new")
+        self.graph.remove((deleted, None, None))
+        self.interface.fail.add(failing)
+        self.interface.renamed.clear()
+        with self.assertRaises(FileCommitError) as context:
+            self.graph.commit()
+        self.assertSetEqual({failing}, set(context.exception.errors))
+        self.assertDictEqual(
+            {old: b"old", deleted: b"old"}, self.interface.files
+        )
+        # Only the stored files are moved aside.
+        self.assertIn(old, self.interface.renamed)
+        self.assertNotIn(new, self.interface.renamed)
+        self.assertNotIn(failing, self.interface.renamed)
+
+        # The triples are committed, and the files remain pending.
+        self.assertIn(
+            (new, RDF.type, simphony_namespace.File), self.interface.base
+        )
+        self.assertEqual(0, len(self.driver._delta))
+        self.interface.fail.clear()
+        self.graph.commit()
+        self.assertDictEqual(
+            {old: b"new", new: b"new", failing: b"new"}, self.interface.files
+        )
+
+
+class TestInterfaceDriverEntityTracking(unittest.TestCase):
+    """Test tracking the added, updated and deleted entities."""
+
+    def test_tracking(self):
+        """Test that the existence of the subjects is probed in batch."""
+        session = spawner(TrackingInMemory)()
+        try:
+            graph, interface = session.graph, session.driver.interface
+            a, b, c, d, p = (URIRef(EX + x) for x in "abcdp")
+            for x in (a, b, c):
+                graph.add((x, RDF.type, OWL.Thing))
+                graph.add((x, p, Literal(1)))
+            graph.commit()
+
+            queries = []
+            base_query = interface.base.query
+
+            def query(*args, **kwargs):
+                queries.append(args[0])
+                return base_query(*args, **kwargs)
+
+            interface.base.query = query
+
+            graph.add((a, p, Literal(2)))
+            graph.remove((b, None, None))
+            graph.remove((c, p, None))
+            graph.add((d, RDF.type, OWL.Thing))
+            graph.add((d, p, Literal(1)))
+            graph.remove((d, p, None))
+            graph.add((c, p, Literal(1)))
+            graph.remove((c, p, None))
+            graph.commit()
+
+            self.assertListEqual(
+                [({a, b, c}, set(), set()), ({d}, {a, c}, {b})],
+                interface.commits,
+            )
+            # Only `a` and `d` are probed, with a single query.
+            self.assertEqual(1, len(queries))
+        finally:
+            session.close()
+
+
+class TestInterfaceDriverBatches(unittest.TestCase):
+    """Test querying several triple patterns at once."""
+
+    def setUp(self) -> None:
+        """Spawn a session with an interface that answers batches."""
+        self.session = spawner(BatchedInMemory)()
+        self.graph, self.driver = self.session.graph, self.session.driver
+        self.interface = self.driver.interface
+
+    def tearDown(self) -> None:
+        """Close the session."""
+        self.session.close()
+
+    def test_triples_many(self):
+        """Test that the patterns are fetched and cached together."""
+        p = URIRef(EX + "p")
+        subjects = [URIRef(EX + str(i)) for i in range(3)]
+        for subject in subjects:
+            self.graph.add((subject, p, Literal(0)))
+        self.graph.commit()
+        self.driver.cache_clear()
+        self.interface.batches.clear()
+        self.graph.add((subjects[0], p, Literal(1)))
+        self.graph.remove((subjects[1], None, None))
+
+        patterns = [(subject, None, None) for subject in subjects]
+        expected = {
+            patterns[0]: {
+                (subjects[0], p, Literal(0)),
+                (subjects[0], p, Literal(1)),
+            },
+            patterns[1]: set(),
+            patterns[2]: {(subjects[2], p, Literal(0))},
+        }
+        self.assertDictEqual(expected, self.driver.triples_many(patterns))
+        self.assertEqual(1, len(self.interface.batches))
+        self.assertDictEqual(expected, self.driver.triples_many(patterns))
+        self.assertEqual(1, len(self.interface.batches))
+        self.assertListEqual([], self.interface.requests)
+
+    def test_prefetch_cbd(self):
+        """Test that each level of blank nodes is fetched at once."""
+        s, p = URIRef(EX + "s"), URIRef(EX + "p")
+        for i in range(2):
+            head = BNode()
+            Collection(self.graph, head, [Literal(j) for j in range(3)])
+            self.graph.add((s, p, head))
+        self.graph.commit()
+        self.driver.cache_clear()
+        self.interface.requests.clear()
+        self.interface.batches.clear()
+
+        self.interface.thread_safe_reads = True
+        self.assertEqual(2, len(set(self.graph.objects(s, p))))
+        worker = self.driver._prefetch_worker
+        if worker is not None:
+            worker.join()
+        self.assertListEqual([(s, None, None)], self.interface.requests)
+        self.assertListEqual(
+            [2, 2, 2], [len(batch) for batch in self.interface.batches]
+        )
+
+    def test_tracking(self):
+        """Test that the existence of the subjects is probed at once."""
+
+        class Interface(BatchedInMemory, TrackingInMemory):
+            pass
+
+        session = spawner(Interface)()
+        try:
+            graph, driver = session.graph, session.driver
+            subjects = [URIRef(EX + str(i)) for i in range(3)]
+            graph.add((subjects[0], RDF.type, OWL.Thing))
+            graph.commit()
+            driver.cache_clear()
+            for subject in subjects:
+                graph.add((subject, RDF.type, OWL.Thing))
+                graph.add((subject, RDFS.label, Literal("label")))
+            driver.interface.batches.clear()
+            graph.commit()
+            self.assertListEqual(
+                [{(subject, None, None) for subject in subjects}],
+                [set(batch) for batch in driver.interface.batches],
+            )
+            self.assertListEqual([], driver.interface.requests)
+            self.assertListEqual(
+                [(set(subjects[1:]), {subjects[0]}, set())],
+                driver.interface.commits[1:],
+            )
+        finally:
+            session.close()
+
+
+class TestInterfaceDriverCache(unittest.TestCase):
+    """Test the triple cache of the `InterfaceDriver`."""
+
+    def setUp(self) -> None:
+        """Open a session using a cached in-memory interface."""
+        self.open()
+
+    def tearDown(self) -> None:
+        """Close the session."""
+        self.session.close()
+
+    def open(self, cache_policy: Optional[CachePolicy] = None) -> None:
+        """Open a session using the given cache policy."""
+        self.session = spawner(CachedInMemory)(cache_policy=cache_policy)
+        self.driver: InterfaceDriver = self.session.driver
+        self.interface: CachedInMemory = self.driver.interface
+        self.graph: Graph = self.session.graph
+
+    def test_cache_hit(self):
+        """Test that cached patterns are not requested again."""
+        s, p = URIRef(EX + "s"), URIRef(EX + "p")
+        self.graph.add((s, p, Literal(1)))
+        self.graph.commit()
+        self.interface.requests.clear()
+
+        self.assertSetEqual({Literal(1)}, set(self.graph.objects(s, p)))
+        self.assertListEqual([(s, None, None)], self.interface.requests)
+        self.assertSetEqual({Literal(1)}, set(self.graph.objects(s, None)))
+        self.assertListEqual([(s, None, None)], self.interface.requests)
+
+        # Committed changes are reflected on the cache.
+        self.graph.add((s, p, Literal(2)))
+        self.graph.remove((s, p, Literal(1)))
+        self.graph.commit()
+        self.assertSetEqual({Literal(2)}, set(self.graph.objects(s, p)))
+        self.assertListEqual([(s, None, None)], self.interface.requests)
+        self.assertBookkeeping()
+
+    def test_eviction(self):
+        """Test that the oldest patterns are evicted when the cache is full."""
+        self.session.close()
+        self.open(LRUCachePolicy(size=4))
+        subjects = self.populate(3)
+
+        for subject in subjects:
+            set(self.graph.triples((subject, None, None)))
+        self.assertNotIn(
+            (subjects[0], None, None), self.driver._cached_patterns
+        )
+        self.assertIn((subjects[1], None, None), self.driver._cached_patterns)
+        self.assertIn((subjects[2], None, None), self.driver._cached_patterns)
+
+        self.interface.requests.clear()
+        self.assertEqual(
+            2, len(set(self.graph.triples((subjects[0], None, None))))
+        )
+        self.assertListEqual(
+            [(subjects[0], None, None)], self.interface.requests
+        )
+        self.assertNotIn(
+            (subjects[1], None, None), self.driver._cached_patterns
+        )
+        self.assertBookkeeping()
+
+    def test_eviction_lru(self):
+        """Test that cache hits protect patterns from eviction."""
+        self.session.close()
+        self.open("lru")
+        self.driver._cache_policy.size = 4
+        subjects = self.populate(3)
+
+        set(self.graph.triples((subjects[0], None, None)))
+        set(self.graph.triples((subjects[1], None, None)))
+        set(self.graph.triples((subjects[0], None, None)))
+        set(self.graph.triples((subjects[2], None, None)))
+        self.assertIn((subjects[0], None, None), self.driver._cached_patterns)
+        self.assertNotIn(
+            (subjects[1], None, None), self.driver._cached_patterns
+        )
+        self.assertBookkeeping()
+
+    def test_eviction_lfu(self):
+        """Test that the least frequently used patterns are evicted first."""
+        self.session.close()
+        self.open(LFUCachePolicy(size=4))
+        subjects = self.populate(3)
+
+        for _ in range(0, 3):
+            set(self.graph.triples((subjects[1], None, None)))
+        set(self.graph.triples((subjects[0], None, None)))
+        set(self.graph.triples((subjects[2], None, None)))
+        self.assertIn((subjects[1], None, None), self.driver._cached_patterns)
+        self.assertNotIn(
+            (subjects[0], None, None), self.driver._cached_patterns
+        )
+        self.assertBookkeeping()
+
+    def test_eviction_bytes(self):
+        """Test limiting the size of the cache in bytes."""
+        subjects = self.populate(3)
+        size_bytes = sum(
+            self.driver._triple_bytes(triple)
+            for triple in self.graph.triples((subjects[0], None, None))
+        )
+        self.session.close()
+        self.open(LRUCachePolicy(size_bytes=2 * size_bytes))
+        subjects = self.populate(3)
+
+        for subject in subjects:
+            set(self.graph.triples((subject, None, None)))
+        self.assertNotIn(
+            (subjects[0], None, None), self.driver._cached_patterns
+        )
+        self.assertEqual(2 * size_bytes, self.driver._cache_bytes)
+        self.assertBookkeeping()
+
+    def test_expiration(self):
+        """Test that expired patterns are requested again."""
+        self.session.close()
+        self.open(TTLCachePolicy(ttl=0.05))
+        (subject,) = self.populate(1)
+        self.interface.requests.clear()
+
+        set(self.graph.triples((subject, None, None)))
+        set(self.graph.triples((subject, None, None)))
+        self.assertEqual(1, len(self.interface.requests))
+        time.sleep(0.1)
+        set(self.graph.triples((subject, None, None)))
+        self.assertEqual(2, len(self.interface.requests))
+        self.assertEqual(1, self.driver.cache_stats()["expirations"])
+        self.assertBookkeeping()
+
+    def test_cache_stats(self):
+        """Test the statistics of the cache."""
+        s, p = URIRef(EX + "s"), URIRef(EX + "p")
+        self.graph.add((s, p, Literal(1)))
+        self.graph.commit()
+
+        set(self.graph.triples((s, p, None)))
+        set(self.graph.triples((s, None, None)))
+        set(self.graph.triples((None, None, None)))
+        stats = self.driver.cache_stats()
+        self.assertEqual(1, stats["hits"])
+        self.assertEqual(2, stats["misses"])
+        self.assertEqual(1, stats["partial_hits"])
+        self.assertEqual(1, stats["triples"])
+        self.assertEqual(2, stats["patterns"])
+        self.assertEqual(
+            self.driver._triple_bytes((s, p, Literal(1))), stats["bytes"]
+        )
+
+        self.session.close()
+        self.open()
+        self.assertEqual(0, self.driver.cache_stats()["misses"])
+
+    def test_empty_patterns(self):
+        """Test that patterns matching no triples are cached."""
+        s, p = URIRef(EX + "s"), URIRef(EX + "p")
+        self.interface.requests.clear()
+
+        self.assertNotIn((s, None, None), self.graph)
+        self.assertNotIn((s, p, None), self.graph)
+        self.assertListEqual([(s, None, None)], self.interface.requests)
+        self.assertEqual(1, self.driver.cache_stats()["empty_hits"])
+
+        # Committing a matching triple invalidates the empty pattern.
+        self.graph.add((s, p, Literal(1)))
+        self.graph.commit()
+        self.assertIn((s, p, None), self.graph)
+        self.assertListEqual([(s, None, None)], self.interface.requests)
+        self.assertEqual(0, self.driver._cached_patterns.count_empty())
+
+        # Removing it makes the pattern known to be empty again.
+        self.graph.remove((s, p, Literal(1)))
+        self.graph.commit()
+        self.assertNotIn((s, p, None), self.graph)
+        self.assertListEqual([(s, None, None)], self.interface.requests)
+        self.assertBookkeeping()
+
+    def test_empty_patterns_limit(self):
+        """Test bounding the number of patterns matching no triples."""
+        self.session.close()
+        self.open(LRUCachePolicy(size=2, empty_size=2))
+        subjects = self.populate(1)
+        missing = [URIRef(EX + f"missing_{i}") for i in range(0, 3)]
+
+        set(self.graph.triples((subjects[0], None, None)))
+        for subject in missing:
+            set(self.graph.triples((subject, None, None)))
+        self.assertNotIn(
+            (missing[0], None, None), self.driver._cached_patterns
+        )
+        self.assertIn((missing[1], None, None), self.driver._cached_patterns)
+
+        # Empty patterns are not evicted to make room for triples.
+        self.graph.add((URIRef(EX + "other"), RDF.type, URIRef(EX + "Class")))
+        self.graph.commit()
+        set(self.graph.triples((URIRef(EX + "other"), None, None)))
+        self.assertNotIn(
+            (subjects[0], None, None), self.driver._cached_patterns
+        )
+        self.assertIn((missing[1], None, None), self.driver._cached_patterns)
+        self.assertIn((missing[2], None, None), self.driver._cached_patterns)
+        self.assertBookkeeping()
+
+    def test_disk_cache(self):
+        """Test moving evicted patterns to the disk cache and back."""
+        self.session.close()
+        self.open(LRUCachePolicy(size=4, disk_size=4))
+        subjects = self.populate(3)
+
+        for subject in subjects:
+            set(self.graph.triples((subject, None, None)))
+        self.assertEqual(2, self.driver.cache_stats()["disk_triples"])
+
+        # Committed changes are reflected on the disk cache.
+        self.graph.remove((subjects[0], RDF.type, None))
+        self.graph.add((subjects[0], URIRef(EX + "p"), Literal(2)))
+        self.graph.commit()
+        self.interface.requests.clear()
+        self.assertSetEqual(
+            {Literal(1), Literal(2)},
+            set(self.graph.objects(subjects[0], URIRef(EX + "p"))),
+        )
+        self.assertNotIn((subjects[0], RDF.type, None), self.graph)
+        self.assertListEqual([], self.interface.requests)
+        self.assertEqual(1, self.driver.cache_stats()["disk_hits"])
+
+        # The pattern evicted to make room for it went to disk.
+        self.assertIn((subjects[0], None, None), self.driver._cached_patterns)
+        self.assertNotIn(
+            (subjects[1], None, None), self.driver._cached_patterns
+        )
+        set(self.graph.triples((subjects[1], None, None)))
+        self.assertListEqual([], self.interface.requests)
+        self.assertBookkeeping()
+
+    def test_prefetch_cbd(self):
+        """Test caching the blank nodes described by a subject."""
+        s, p = URIRef(EX + "s"), URIRef(EX + "p")
+        items = [Literal(i) for i in range(0, 3)]
+        head = BNode()
+        Collection(self.graph, head, items)
+        self.graph.add((s, p, head))
+        self.graph.commit()
+        self.driver.cache_clear()
+        self.interface.requests.clear()
+
+        # The blank nodes are fetched in the background.
+        self.interface.thread_safe_reads = True
+        node = self.graph.value(s, p)
+        worker = self.driver._prefetch_worker
+        if worker is not None:
+            worker.join()
+        self.assertEqual(len(items) + 1, len(self.interface.requests))
+        self.interface.requests.clear()
+
+        # The blank nodes are already cached.
+        self.assertListEqual(items, list(Collection(self.graph, node)))
+        self.assertFalse(
+            any(isinstance(x[0], BNode) for x in self.interface.requests)
+        )
+        self.assertEqual(
+            2 * len(items), self.driver.cache_stats()["prefetched_triples"]
+        )
+        self.assertBookkeeping()
+
+    def test_prefetch_cbd_caller(self):
+        """Test caching blank nodes on the caller's thread."""
+        s, p = URIRef(EX + "s"), URIRef(EX + "p")
+        head = BNode()
+        Collection(self.graph, head, [Literal(i) for i in range(0, 3)])
+        self.graph.add((s, p, head))
+        self.graph.commit()
+        self.driver.cache_clear()
+        self.interface.requests.clear()
+
+        # Only the blank nodes referenced by the subject are fetched.
+        self.graph.value(s, p)
+        self.assertIsNone(self.driver._prefetch_worker)
+        self.assertListEqual(
+            [(s, None, None), (head, None, None)], self.interface.requests
+        )
+        self.assertIn((head, None, None), self.driver._cached_patterns)
+        self.assertBookkeeping()
+
+    def test_overlapping_patterns(self):
+        """Test caching patterns that share triples."""
+        s, p = URIRef(EX + "s"), URIRef(EX + "p")
+        self.graph.add((s, p, Literal(1)))
+        self.graph.add((URIRef(EX + "t"), p, Literal(2)))
+        self.graph.commit()
+
+        set(self.graph.triples((s, None, None)))
+        set(self.graph.triples((None, p, None)))
+        self.assertEqual(2, self.driver._cache_length)
+        self.assertEqual(1, self.driver._cached_patterns.size((s, None, None)))
+        self.assertEqual(2, self.driver._cached_patterns.size((None, p, None)))
+
+        # Evicting a pattern keeps the triples of the other one.
+        self.driver._evict((s, None, None))
+        self.assertSetEqual(
+            {Literal(1), Literal(2)}, set(self.graph.objects(None, p))
+        )
+        self.assertBookkeeping()
+
+        # Committed additions do not discard the already cached triples.
+        self.graph.add((s, p, Literal(3)))
+        self.graph.commit()
+        self.assertSetEqual(
+            {Literal(1), Literal(2), Literal(3)},
+            set(self.graph.objects(None, p)),
+        )
+        self.assertBookkeeping()
+
+    def populate(self, n: int) -> List[URIRef]:
+        """Commit two triples for each of `n` new subjects."""
+        subjects = [URIRef(EX + str(i)) for i in range(0, n)]
+        for subject in subjects:
+            self.graph.add((subject, RDF.type, URIRef(EX + "Class")))
+            self.graph.add((subject, URIRef(EX + "p"), Literal(1)))
+        self.graph.commit()
+        return subjects
+
+    def assertBookkeeping(self):
+        """Check that the cache bookkeeping matches the cached triples."""
+        self.assertEqual(len(self.driver._cache), self.driver._cache_length)
+        self.assertEqual(
+            sum(map(self.driver._triple_bytes, self.driver._cache)),
+            self.driver._cache_bytes,
+        )
+        for pattern in self.driver._cached_patterns:
+            triples = list(self.driver._cache.triples(pattern))
+            self.assertEqual(
+                len(triples), self.driver._cached_patterns.size(pattern)
+            )
+            self.assertEqual(
+                sum(map(self.driver._triple_bytes, triples)),
+                self.driver._cached_patterns.size_bytes(pattern),
+            )
+
+
+class TestInterfaceDriverPrefetch(unittest.TestCase):
+    """Test the SPARQL-based prefetching of the `InterfaceDriver` cache."""
+
+    def setUp(self) -> None:
+        """Open a session and fill it with a parent and its children."""
+        self.session = spawner(CachedBaseInMemory)(
+            cache_policy=LRUCachePolicy(prefetch_time=30)
+        )
+        self.driver: InterfaceDriver = self.session.driver
+        self.graph: Graph = self.session.graph
+
+        self.parent = URIRef(EX + "parent")
+        self.children = [URIRef(EX + f"child_{i}") for i in range(0, 3)]
+        for child in self.children:
+            self.graph.add((self.parent, URIRef(EX + "hasPart"), child))
+            self.graph.add((child, URIRef(EX + "name"), Literal(str(child))))
+        self.graph.commit()
+
+    def tearDown(self) -> None:
+        """Close the session."""
+        self.session.close()
+
+    def wait(self) -> None:
+        """Wait until the prefetch worker finishes."""
+        worker = self.driver._prefetch_worker
+        if worker is not None:
+            worker.join()
+
+    def test_background(self):
+        """Test prefetching the children of a subject in the background."""
+        self.assertSetEqual(
+            set(self.children),
+            set(self.graph.objects(self.parent, URIRef(EX + "hasPart"))),
+        )
+        self.wait()
+        for child in self.children:
+            self.assertIn((child, None, None), self.driver._cached_patterns)
+        self.assertIsNone(self.driver._prefetch_worker)
+        self.assertGreater(self.driver.cache_stats()["prefetched_triples"], 0)
+
+    def test_synchronous(self):
+        """Test prefetching on the caller's thread."""
+        self.driver._cache_policy.prefetch_background = False
+        set(self.graph.triples((self.parent, None, None)))
+        self.assertIsNone(self.driver._prefetch_worker)
+        for child in self.children:
+            self.assertIn((child, None, None), self.driver._cached_patterns)
+
+    def test_thread_bound(self):
+        """Test prefetching for interfaces bound to their thread."""
+        with mock.patch.object(CachedBaseInMemory, "thread_safe_reads", False):
+            set(self.graph.triples((self.parent, None, None)))
+        self.assertIsNone(self.driver._prefetch_worker)
+        for child in self.children:
+            self.assertIn((child, None, None), self.driver._cached_patterns)
+
+    def test_pinned(self):
+        """Test that prefetches only evict patterns older than the request."""
+        self.driver._cache_policy.prefetch_background = False
+        with mock.patch.object(
+            self.driver, "_fill", wraps=self.driver._fill
+        ) as fill:
+            set(self.graph.triples((self.parent, None, None)))
+        prefetched = [
+            call
+            for call in fill.call_args_list
+            if call.args[0] != (self.parent, None, None)
+        ]
+        self.assertEqual(len(self.children), len(prefetched))
+        for call in prefetched:
+            self.assertIsNotNone(call.kwargs.get("older_than"))
+
+    def test_deadline(self):
+        """Test that prefetches are interrupted after the deadline."""
+        self.driver._cache_policy.prefetch_time = timedelta(seconds=0)
+        set(self.graph.triples((self.parent, None, None)))
+        self.wait()
+        self.assertIn((self.parent, None, None), self.driver._cached_patterns)
+        for child in self.children:
+            self.assertNotIn((child, None, None), self.driver._cached_patterns)
+
+    def test_cancel(self):
+        """Test that committing cancels the scheduled prefetches."""
+        with self.driver._lock:
+            set(self.graph.triples((self.parent, None, None)))
+            self.assertEqual(1, len(self.driver._prefetch_queue))
+            self.graph.commit()
+            self.assertEqual(0, len(self.driver._prefetch_queue))
+        self.wait()
+        for child in self.children:
+            self.assertNotIn((child, None, None), self.driver._cached_patterns)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -7,12 +7,26 @@ import socket
 import time
 import unittest
 from base64 import b64encode
+from itertools import chain
 from pathlib import Path
 from tempfile import NamedTemporaryFile, TemporaryDirectory
 from typing import Optional
-
-from rdflib import XSD, Literal
-
+from unittest import mock
+
+from rdflib import XSD, BNode, Literal, URIRef
+
+from simphony_osp.interfaces.interface import JobStatus
+from simphony_osp.interfaces.remote import engine
+from simphony_osp.interfaces.remote.client import (
+    RemoteInterface,
+    RemoteStoreClient,
+)
+from simphony_osp.interfaces.remote.common import (
+    COMMAND,
+    TermCodec,
+    triples_from_terms,
+)
+from simphony_osp.interfaces.remote.server import InterfaceServer
 from simphony_osp.ontology.parser import OntologyParser
 from simphony_osp.session.session import Session
 from simphony_osp.session.wrapper import Wrapper
@@ -125,6 +139,59 @@ class TestWrapper(unittest.TestCase):
             paris = set(wrapper).pop()
             self.assertEqual(paris.name, "Paris")
 
+    def test_wrapper_count(self) -> None:
+        """Test counting triples on the database."""
+        from simphony_osp.namespaces import city
+
+        with SQLite(self.file_name, create=True) as wrapper:
+            graph, driver = wrapper.graph, wrapper.driver
+            freiburg = city.City(name="Freiburg", coordinates=[20, 58])
+            marco = city.Citizen(name="Marco", age=50)
+            freiburg[city.hasInhabitant] = marco
+            wrapper.commit()
+            driver.cache_clear()
+
+            pattern = (freiburg.identifier, None, None)
+            self.assertEqual(sum(1 for _ in graph), len(graph))
+            self.assertEqual(
+                sum(1 for _ in graph.triples(pattern)), driver.count(pattern)
+            )
+
+            matthias = city.Citizen(name="Matthias", age=37)
+            freiburg[city.hasInhabitant] |= {matthias}
+            wrapper.delete(marco)
+            self.assertEqual(sum(1 for _ in graph), len(graph))
+            self.assertEqual(
+                sum(1 for _ in graph.triples(pattern)), driver.count(pattern)
+            )
+
+            # Without the internals of rdflib-sqlalchemy.
+            driver.cache_clear()
+            with mock.patch(
+                "simphony_osp.interfaces.sqlalchemy.interface.union_select",
+                None,
+            ):
+                self.assertEqual(
+                    sum(1 for _ in graph.triples(pattern)),
+                    driver.count(pattern),
+                )
+
+    def test_wrapper_chunks(self) -> None:
+        """Test committing changes in chunks."""
+        from simphony_osp.namespaces import city
+
+        with SQLite(self.file_name, create=True) as wrapper:
+            citizens = {
+                city.Citizen(name=str(i), age=i).identifier for i in range(50)
+            }
+            wrapper.commit(chunk_size=20)
+            self.assertLess(1, wrapper.driver.commit_stats()["chunks"])
+
+        with SQLite(self.file_name) as wrapper:
+            self.assertSetEqual(
+                citizens, {citizen.identifier for citizen in wrapper}
+            )
+
     def test_wrapper_sparql(self) -> None:
         """Test SPARQL queries on wrappers."""
         from simphony_osp.namespaces import city
@@ -349,6 +416,55 @@ class TestDataspaceWrapper(unittest.TestCase):
                     KeyError, wrapper.from_identifier, file_identifier
                 )
 
+    def test_file_deduplication(self):
+        """Test that files with the same contents are stored only once."""
+        from simphony_osp.namespaces import simphony
+
+        files_path = Path(self.dataspace_directory.name) / "files"
+        hashes_path = Path(self.dataspace_directory.name) / "hashes"
+        digests_path = Path(self.dataspace_directory.name) / "digests"
+
+        with NamedTemporaryFile("w", suffix=".txt") as os_file:
+            os_file.write("text")
+            os_file.flush()
+            os.fsync(os_file)
+
+            with Dataspace(self.dataspace_directory.name, True) as wrapper:
+                file_1 = simphony.File()
+                file_1.operations.upload(os_file.name)
+                wrapper.commit()
+
+                file_2 = simphony.File()
+                file_2.operations.upload(os_file.name)
+                wrapper.commit()
+                self.assertEqual(b"text", file_2.operations.handle.read())
+
+                stored = list(files_path.iterdir())
+                self.assertEqual(2, len(stored))
+                self.assertEqual(
+                    stored[0].stat().st_ino, stored[1].stat().st_ino
+                )
+                self.assertEqual(1, len(list(hashes_path.iterdir())))
+
+                # The hashes of the files are not computed again.
+                with mock.patch(
+                    "simphony_osp.interfaces.dataspace.interface.get_hash"
+                ) as get_hash:
+                    wrapper.delete(file_1)
+                    wrapper.commit()
+                    get_hash.assert_not_called()
+                self.assertEqual(1, len(list(hashes_path.iterdir())))
+
+                # Files with the same contents deleted in parallel.
+                file_3 = simphony.File()
+                file_3.operations.upload(os_file.name)
+                wrapper.commit()
+                wrapper.delete(file_2, file_3)
+                wrapper.commit()
+                self.assertFalse(any(files_path.iterdir()))
+                self.assertFalse(any(hashes_path.iterdir()))
+                self.assertFalse(any(digests_path.iterdir()))
+
 
 class TestRemoteSQLite(unittest.TestCase):
     """Test the Remote wrapper.
@@ -475,6 +591,261 @@ class TestRemoteSQLite(unittest.TestCase):
             freiburg = wrapper.from_identifier(freiburg_identifier)
             self.assertIsNone(freiburg[city.hasInhabitant].any())
 
+    def test_city_text(self):
+        """Test the city example using the text-only protocol version."""
+        with mock.patch.dict(engine.SUBPROTOCOLS, clear=True):
+            with self.wrapper_generator() as wrapper:
+                self.assertFalse(wrapper.driver.interface._engine.binary)
+            self.test_city()
+
+    def test_binary(self):
+        """Test that the binary protocol version is negotiated."""
+        from simphony_osp.namespaces import city
+
+        with self.wrapper_generator() as wrapper:
+            self.assertTrue(wrapper.driver.interface._engine.binary)
+            freiburg = city.City(name="Freiburg", coordinates=[0, 0])
+            freiburg[city.hasInhabitant] = city.Citizen(name="Klaus", age=30)
+            wrapper.commit()
+            triples = set(wrapper.graph)
+            wrapper.driver.cache_clear()
+            self.assertSetEqual(triples, set(wrapper.graph))
+
+    def test_pipelining(self):
+        """Test sending several requests before waiting for responses."""
+        from simphony_osp.namespaces import city
+
+        for subprotocols in (
+            engine.SUBPROTOCOLS,
+            {engine.BINARY_VERSION: "simphony-osp-3"},
+            {},
+        ):
+            with mock.patch.dict(
+                engine.SUBPROTOCOLS, subprotocols, clear=True
+            ), self.wrapper_generator() as wrapper:
+                store = wrapper.driver.interface.base.store
+                citizens = [
+                    city.Citizen(name=name, age=age)
+                    for name, age in (("Klaus", 30), ("Peter", 40))
+                ]
+                wrapper.commit()
+                patterns = [
+                    (citizen.identifier, None, None) for citizen in citizens
+                ] + [(None, city.age.identifier, None)]
+                lookups = store._engine.send_many(
+                    store._triples_request(pattern) for pattern in patterns
+                )
+                for pattern, lookup in zip(patterns, lookups):
+                    self.assertSetEqual(
+                        set(store._remote_triples(pattern)),
+                        set(store._triples_response(lookup)),
+                    )
+                store.remove((citizens[0].identifier, None, None))
+                store.add(
+                    (citizens[1].identifier, city.age.identifier, Literal(41)),
+                    None,
+                )
+                self.assertEqual(
+                    sum(1 for _ in store.triples((None,) * 3)), len(store)
+                )
+                store.rollback()
+
+    def test_paging(self):
+        """Test receiving the triples matching a pattern in pages."""
+        from simphony_osp.namespaces import city
+
+        with self.wrapper_generator() as wrapper:
+            for i in range(10):
+                city.Citizen(name=f"Citizen {i}", age=i)
+            wrapper.commit()
+            store = wrapper.driver.interface.base.store
+            pattern = [[None, city.age.identifier, None]]
+
+            pages = list(
+                store._engine.stream(
+                    COMMAND.STORE_TRIPLES, pattern, page_size=3
+                )
+            )
+            self.assertListEqual([9, 9, 9, 3], [len(page) for page in pages])
+            self.assertSetEqual(
+                set(store._remote_triples(tuple(pattern[0]))),
+                set(triples_from_terms(chain.from_iterable(pages))),
+            )
+
+            # Cancel early and close the stream with the next query.
+            pages = store._engine.stream(
+                COMMAND.STORE_TRIPLES, pattern, page_size=3
+            )
+            next(pages)
+            pages.close()
+            self.assertEqual(1, len(store._engine._closed_streams))
+            self.assertEqual(
+                10, sum(1 for _ in store._remote_triples(tuple(pattern[0])))
+            )
+            self.assertListEqual([], store._engine._closed_streams)
+
+            # Modifications close the open streams.
+            pages = store._engine.stream(
+                COMMAND.STORE_TRIPLES, pattern, page_size=3
+            )
+            next(pages)
+            store.remove((None, city.age.identifier, None))
+            store.commit()
+            with self.assertRaises(RuntimeError):
+                list(pages)
+            self.assertEqual(
+                0, sum(1 for _ in store._remote_triples(tuple(pattern[0])))
+            )
+
+            # Beyond the maximum number of open streams, the oldest one is
+            # closed.
+            wrapper.driver.cache_clear()
+            for i in range(10):
+                city.Citizen(name=f"Citizen {i}", age=i)
+            wrapper.commit()
+            streams = [
+                store._engine.stream(
+                    COMMAND.STORE_TRIPLES, pattern, page_size=3
+                )
+                for _ in range(InterfaceServer.max_streams + 1)
+            ]
+            self.assertListEqual(
+                [9] * (InterfaceServer.max_streams + 1),
+                [len(next(pages)) for pages in streams],
+            )
+            with self.assertRaises(RuntimeError):
+                list(streams[0])
+            self.assertListEqual(
+                [21] * InterfaceServer.max_streams,
+                [
+                    len(list(chain.from_iterable(pages)))
+                    for pages in streams[1:]
+                ],
+            )
+
+    def test_store_count(self):
+        """Test counting the triples matching a pattern on the server."""
+        from simphony_osp.namespaces import city
+
+        with self.wrapper_generator() as wrapper:
+            for i in range(3):
+                city.Citizen(name=f"Citizen {i}", age=i)
+            wrapper.commit()
+            store = wrapper.driver.interface.base.store
+            response, _ = store._engine.send(
+                COMMAND.STORE_COUNT, [[None, city.age.identifier, None]]
+            )
+            self.assertEqual(3, response[COMMAND.STORE_COUNT])
+            response, _ = store._engine.send(COMMAND.STORE_COUNT, "")
+            self.assertEqual(len(store), response[COMMAND.STORE_COUNT])
+
+    def test_compute_async(self):
+        """Test computing in the background on sessions on the store."""
+        with self.wrapper_generator() as wrapper:
+            session = Session(base=wrapper.driver.interface.base)
+            with mock.patch.object(
+                RemoteStoreClient, "compute", return_value=None
+            ) as compute:
+                job = session.compute_async(steps=3)
+                job.wait(timeout=10)
+            compute.assert_called_once_with(steps=3)
+            self.assertEqual(JobStatus.DONE, job.status)
+
+    def test_connection_lost(self):
+        """Test that requests fail once the responses cannot be received."""
+        from simphony_osp.namespaces import city
+
+        wrapper = self.wrapper_generator()
+        client = wrapper.driver.interface._engine
+        city.Citizen(session=wrapper, name="Klaus", age=30)
+        wrapper.commit()
+        with mock.patch.object(
+            TermCodec, "decode", side_effect=ValueError("Broken response.")
+        ):
+            with self.assertRaises(ValueError):
+                wrapper.driver.cache_clear()
+                set(wrapper.graph)
+        self.assertIsNone(client.socket)
+        with self.assertRaises(ConnectionError):
+            client.send(COMMAND.COUNT, [[None, None, None]])
+        client.close()
+
+    def test_term_codec(self):
+        """Test that the dictionaries of the term codec stay bounded."""
+        sender, receiver = TermCodec(), TermCodec()
+        groups = [
+            [URIRef(f"http://example.org/{i}"), BNode(), Literal(i), None]
+            for i in range(5)
+        ]
+        with mock.patch.object(TermCodec, "max_terms", 8):
+            for _ in range(4):
+                self.assertListEqual(
+                    groups, receiver.decode(sender.encode(groups))
+                )
+                self.assertEqual(len(sender._sent), len(receiver._received))
+                self.assertLessEqual(len(sender._sent), 16)
+
+    def test_compression(self):
+        """Test negotiating the compression of the messages."""
+        from simphony_osp.namespaces import city
+
+        for compression in (True, False):
+            with mock.patch.object(
+                RemoteInterface, "compression", compression
+            ), self.wrapper_generator() as wrapper:
+                client = wrapper.driver.interface._engine
+                self.assertTrue(client.binary)
+                self.assertEqual(
+                    compression,
+                    any(
+                        isinstance(extension, engine.SelectiveDeflate)
+                        for extension in client.socket.extensions
+                    ),
+                )
+                freiburg = city.City(name="Freiburg", coordinates=[0, 0])
+                freiburg[city.hasInhabitant] = city.Citizen(
+                    name="Klaus", age=30
+                )
+                wrapper.commit()
+                triples = set(wrapper.graph)
+                wrapper.driver.cache_clear()
+                self.assertSetEqual(triples, set(wrapper.graph))
+
+        with NamedTemporaryFile(
+            "wb", delete=False
+        ) as text, NamedTemporaryFile("wb", delete=False) as noise:
+            text.write(
+                b"<http://example.org/s> <http://example.org/p> 0 .\n" * 100
+            )
+            noise.write(os.urandom(engine.BLOCK_SIZE))
+        try:
+            self.assertTrue(engine.is_compressible(text.name))
+            self.assertFalse(engine.is_compressible(noise.name))
+        finally:
+            os.remove(text.name)
+            os.remove(noise.name)
+
+    def test_count(self):
+        """Test counting the triples on the remote side."""
+        from simphony_osp.namespaces import city
+
+        with self.wrapper_generator() as wrapper:
+            graph, driver = wrapper.graph, wrapper.driver
+            freiburg = city.City(name="Freiburg", coordinates=[0, 0])
+            freiburg[city.hasInhabitant] = city.Citizen(name="Klaus", age=30)
+            wrapper.commit()
+            driver.cache_clear()
+
+            pattern = (freiburg.identifier, None, None)
+            self.assertEqual(sum(1 for _ in graph), len(graph))
+            self.assertEqual(
+                sum(1 for _ in graph.triples(pattern)), driver.count(pattern)
+            )
+            freiburg.name = "Paris"
+            self.assertEqual(
+                sum(1 for _ in graph.triples(pattern)), driver.count(pattern)
+            )
+
 
 if __name__ == "__main__":
     unittest.main()